@@ -7,14 +7,12 @@ down.
 The ROS namespace and node names are hard-coded in :mod:`.constants`, and the
 static node entrypoints are defined here in the package root namespace.
 """
-import cProfile
-import io
-import pstats
 from typing import Optional
 
 import rclpy
 from rclpy.node import Node
 
+from ._profiler import ProfilerService
 from .constants import (
     BBOX_NODE_NAME,
     GIS_NODE_NAME,
@@ -23,9 +21,10 @@ from .constants import (
     QGIS_NODE_NAME,
     ROS_NAMESPACE,
     STEREO_NODE_NAME,
+    TRACE_NODE_NAME,
     UORB_NODE_NAME,
 )
-from .core import BBoxNode, GISNode, PoseNode, StereoNode
+from .core import BBoxNode, GISNode, PoseNode, StereoNode, TraceNode
 
 try:
     from .extensions.qgis_node import QGISNode
@@ -91,34 +90,30 @@ except ModuleNotFoundError as e:
 def _run(constructor: rclpy.node.Node, *args, **kwargs):
     """Spins up a ROS 2 node
 
+    The node is not profiled by default. Profiling can be started and stopped at
+    runtime with the :class:`.ProfilerService` of the node.
+
     :param constructor: Node constructor
     :param *args: Node constructor args
     :param **kwargs: Node constructor kwargs
     :return:
     """
-    if __debug__:
-        profile = cProfile.Profile()
-        profile.enable()
-    else:
-        profile = None
-
     node: Optional[Node] = None
+    profiler_service: Optional[ProfilerService] = None
     try:
         rclpy.init()
         node = constructor(*args, **kwargs)
+        profiler_service = ProfilerService(node)
         rclpy.spin(node)
     except KeyboardInterrupt as e:
         print(f"Keyboard interrupt received:\n{e}")
-        if profile is not None:
-            assert __debug__
-            # Print out cProfile stats
-            profile.disable()
-            s = io.StringIO()
-            stats = pstats.Stats(profile, stream=s).sort_stats(pstats.SortKey.TIME)
-            stats.print_stats(20)
-            if node is not None:
-                node.get_logger().info(s.getvalue())
     finally:
+        if node is not None and profiler_service is not None:
+            # Write the profile if profiling was not stopped before shutdown
+            try:
+                profiler_service.stop()
+            except OSError as e:
+                node.get_logger().error(f"Could not write profile: {e}")
         if node is not None:
             node.destroy_node()
         rclpy.shutdown()
@@ -149,3 +144,8 @@ def run_stereo_node():
 def run_pose_node():
     """Spins up a :class:`.PoseNode`"""
     _run(PoseNode, POSE_NODE_NAME, **_rclpy_node_kwargs)
+
+
+def run_trace_node():
+    """Spins up a :class:`.TraceNode`"""
+    _run(TraceNode, TRACE_NODE_NAME, **_rclpy_node_kwargs)
@@ -0,0 +1,169 @@
+"""Adaptive deep matching operating point controller that targets an inference
+latency
+
+Deep matching latency depends on the number of keypoints, the input resolution and
+the number of LightGlue layers that are run, and it varies with scene texture and
+CPU load. :class:`.LatencyController` measures the per-frame inference latency and
+moves along a ladder of operating points (see :class:`.OperatingPoint`) ordered
+from the most accurate to the fastest: a slower than target latency steps down
+the ladder and a faster than target latency steps back up. The pose rate then
+stays approximately constant instead of following the scene and the load.
+
+The ladder first enables LightGlue's early exit (depth confidence) and point
+pruning (width confidence), then alternately reduces the keypoint budget and
+increases the input downscale factor until both reach their configured bounds.
+"""
+import threading
+from typing import Dict, Final, List, NamedTuple, Optional, Tuple
+
+
+class OperatingPoint(NamedTuple):
+    """Deep matching operating point, see :meth:`.DeepMatcher.match`"""
+
+    max_keypoints: int
+    """Maximum number of keypoints extracted from an image"""
+
+    downscale: float
+    """Factor by which the input images are downscaled before feature extraction"""
+
+    depth_confidence: float
+    """LightGlue early exit confidence threshold, -1 to disable"""
+
+    width_confidence: float
+    """LightGlue point pruning confidence threshold, -1 to disable"""
+
+
+EARLY_EXIT_THRESHOLDS: Final[Tuple[Tuple[float, float], ...]] = (
+    (0.95, 0.99),
+    (0.9, 0.95),
+)
+"""LightGlue depth and width confidence thresholds in order of increasing speed,
+the first pair is the LightGlue default"""
+
+
+def operating_points(
+    max_keypoints: int, min_keypoints: int, max_downscale: float, step: float = 1.25
+) -> List[OperatingPoint]:
+    """Returns the operating points ordered from the most accurate to the fastest
+
+    :param max_keypoints: Keypoint budget of the most accurate operating point
+    :param min_keypoints: Lower bound for the keypoint budget
+    :param max_downscale: Upper bound for the input downscale factor
+    :param step: Factor by which the keypoint budget is reduced or the downscale
+        factor is increased between consecutive operating points
+    :return: List of operating points, the first one runs at full resolution
+        with the full keypoint budget and without early exit
+    """
+    assert 0 < min_keypoints <= max_keypoints and max_downscale >= 1 and step > 1
+    keypoints, downscale = max_keypoints, 1.0
+    points = [OperatingPoint(keypoints, downscale, -1.0, -1.0)]
+    for depth_confidence, width_confidence in EARLY_EXIT_THRESHOLDS:
+        points.append(
+            OperatingPoint(keypoints, downscale, depth_confidence, width_confidence)
+        )
+
+    while True:
+        next_keypoints = max(min_keypoints, int(keypoints / step))
+        next_downscale = min(max_downscale, round(downscale * step, 3))
+        if next_keypoints == keypoints and next_downscale == downscale:
+            return points
+        if next_keypoints < keypoints:
+            keypoints = next_keypoints
+            points.append(points[-1]._replace(max_keypoints=keypoints))
+        if next_downscale > downscale:
+            downscale = next_downscale
+            points.append(points[-1]._replace(downscale=downscale))
+
+
+class LatencyController:
+    """Selects the deep matching operating point that keeps the measured
+    inference latency near the target
+
+    The latency is smoothed with an exponential moving average. The operating
+    point is changed only when the smoothed latency is outside a hysteresis band
+    around the target, and only after enough frames have been measured at the
+    current operating point. The controller is thread-safe.
+    """
+
+    SMOOTHING: Final = 0.3
+    """Weight of the latest latency in the exponential moving average"""
+
+    HYSTERESIS: Final = 0.15
+    """Relative latency deviation from the target that changes the operating
+    point"""
+
+    SETTLING_FRAMES: Final = 5
+    """Number of frames measured at an operating point before it can be changed"""
+
+    def __init__(self, target: float, points: List[OperatingPoint]) -> None:
+        """Class initializer
+
+        :param target: Target inference latency in seconds, 0 to disable the
+            controller and stay at the first operating point
+        :param points: Operating points ordered from the most accurate to the
+            fastest, see :func:`.operating_points`
+        """
+        assert points
+        self._target = target
+        self._points = points
+        self._level = 0
+        self._latency: Optional[float] = None
+        self._frames = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """True if the controller adjusts the operating point"""
+        return self._target > 0
+
+    @property
+    def operating_point(self) -> OperatingPoint:
+        """Current operating point"""
+        return self._points[self._level]
+
+    def update(self, latency: float) -> bool:
+        """Updates the controller with the measured latency of a frame
+
+        :param latency: Inference latency of the frame in seconds, measured at the
+            current operating point
+        :return: True if the operating point changed
+        """
+        if not self.enabled:
+            return False
+
+        with self._lock:
+            self._latency = (
+                latency
+                if self._latency is None
+                else self.SMOOTHING * latency + (1 - self.SMOOTHING) * self._latency
+            )
+            self._frames += 1
+            if self._frames < self.SETTLING_FRAMES:
+                return False
+
+            level = self._level
+            if self._latency > self._target * (1 + self.HYSTERESIS):
+                level = min(level + 1, len(self._points) - 1)
+            elif self._latency < self._target * (1 - self.HYSTERESIS):
+                level = max(level - 1, 0)
+            if level == self._level:
+                return False
+
+            # Latencies measured at the previous operating point are discarded
+            self._level = level
+            self._latency = None
+            self._frames = 0
+            return True
+
+    def statistics(self) -> Dict[str, float]:
+        """Returns the current operating point, its index on the ladder, and the
+        target and smoothed latency in seconds
+        """
+        with self._lock:
+            return {
+                **self.operating_point._asdict(),
+                "level": self._level,
+                "levels": len(self._points),
+                "latency_target": self._target,
+                "latency": self._latency if self._latency is not None else 0.0,
+            }
@@ -0,0 +1,342 @@
+"""Mission corridor tile store for preloading orthoimagery and DEM rasters
+
+The waypoints of a QGroundControl mission plan are buffered into a corridor polygon
+that is covered by a regular grid of tiles. All tiles are fetched up front from a
+:class:`.RasterSource` and stored in a persistent :class:`.TileCache`.
+:class:`.GISNode` then assembles the rasters for its requests from the local tiles,
+so that in-flight requests do not depend on the availability or latency of the
+GIS server.
+
+Tiles are stored in the request spatial reference system, which must be
+:term:`WGS 84` (``EPSG:4326``) because the grid is defined in degrees.
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from shapely.geometry import LineString, Point, Polygon, box
+from shapely.ops import transform
+
+from ._raster_source import RasterSource
+from ._tile_cache import TileCache
+from ._transformations import BBox
+
+_METERS_IN_DEGREE: float = 111045.0
+"""Approximate length of one degree of latitude in meters"""
+
+SUPPORTED_SRS = "EPSG:4326"
+"""Spatial reference system of the corridor tile grid"""
+
+
+def load_plan_waypoints(path: str) -> List[Tuple[float, float]]:
+    """Returns the waypoints of a QGroundControl mission plan
+
+    The planned home position and the coordinates of all simple mission items that
+    have a position are included, as well as the visual transect points of complex
+    survey items.
+
+    :param path: Path to the QGroundControl ``.plan`` file
+    :return: List of (latitude, longitude) tuples in mission order
+    :raise OSError: If the plan file cannot be read
+    :raise ValueError: If the plan file is not a valid mission plan
+    """
+    with open(path) as f:
+        plan = json.load(f)
+
+    try:
+        mission = plan["mission"]
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Not a valid mission plan: {path}") from e
+
+    waypoints: List[Tuple[float, float]] = []
+    home = mission.get("plannedHomePosition")
+    if home:
+        waypoints.append((float(home[0]), float(home[1])))
+
+    for item in mission.get("items", []):
+        if item.get("type") == "SimpleItem":
+            params = item.get("params", [])
+            if len(params) < 6 or not params[4] or not params[5]:
+                # Command without a position, e.g. DO_CHANGE_SPEED or RTL
+                continue
+            waypoints.append((float(params[4]), float(params[5])))
+        elif item.get("type") == "ComplexItem":
+            transect = item.get("TransectStyleComplexItem", {})
+            for latitude, longitude in transect.get("VisualTransectPoints", []):
+                waypoints.append((float(latitude), float(longitude)))
+
+    if not waypoints:
+        raise ValueError(f"Mission plan has no waypoints: {path}")
+
+    return waypoints
+
+
+def corridor_polygon(waypoints: List[Tuple[float, float]], buffer: float) -> Polygon:
+    """Returns the corridor polygon around the waypoints
+
+    The buffer is applied in a local equirectangular projection centered on the
+    waypoints, which is accurate enough for mission-scale corridors.
+
+    :param waypoints: List of (latitude, longitude) tuples
+    :param buffer: Corridor half-width in meters
+    :return: Corridor polygon in (longitude, latitude) coordinates
+    """
+    latitude0 = np.radians(np.mean([latitude for latitude, _ in waypoints]))
+    scale_x = _METERS_IN_DEGREE * np.cos(latitude0)
+    scale_y = _METERS_IN_DEGREE
+
+    points = [
+        (longitude * scale_x, latitude * scale_y) for latitude, longitude in waypoints
+    ]
+    geometry = LineString(points) if len(points) > 1 else Point(points[0])
+    corridor = geometry.buffer(buffer)
+    return transform(lambda x, y: (x / scale_x, y / scale_y), corridor)
+
+
+def grid_tile_bbox(column: int, row: int, step: float) -> BBox:
+    """Returns the bounding box of the tile at the grid index
+
+    :param column: Tile grid column index
+    :param row: Tile grid row index
+    :param step: Tile grid step in degrees
+    :return: Tile bounding box
+    """
+    return BBox(column * step, row * step, (column + 1) * step, (row + 1) * step)
+
+
+def grid_tile_indices(polygon: Polygon, step: float) -> List[Tuple[int, int]]:
+    """Returns the grid indices of the tiles that intersect the polygon
+
+    :param polygon: Polygon in (longitude, latitude) coordinates
+    :param step: Tile grid step in degrees
+    :return: List of (column, row) tuples
+    """
+    left, bottom, right, top = polygon.bounds
+    return [
+        (column, row)
+        for column in range(int(np.floor(left / step)), int(np.ceil(right / step)))
+        for row in range(int(np.floor(bottom / step)), int(np.ceil(top / step)))
+        if polygon.intersects(box(*grid_tile_bbox(column, row, step)))
+    ]
+
+
+class CorridorTileStore:
+    """Persistent store of mission corridor tiles
+
+    The tile grid step and tile size are stored alongside the tiles so that the
+    store can be opened without knowing how it was created.
+    """
+
+    _METADATA_FILENAME = "corridor.json"
+    """Name of the tile grid metadata file inside the store directory"""
+
+    def __init__(
+        self,
+        path: str,
+        step: float,
+        tile_size: int,
+        max_bytes: int,
+    ) -> None:
+        """Class initializer
+
+        If the store already exists, its tile grid step and tile size override
+        the provided values.
+
+        :param path: Store directory, created if it does not exist
+        :param step: Tile grid step in degrees
+        :param tile_size: Tile width and height in pixels
+        :param max_bytes: Maximum total size of the stored tiles in bytes
+        :raise OSError: If the store directory cannot be created
+        :raise sqlite3.Error: If the tile index cannot be opened
+        """
+        self._path = os.path.expanduser(path)
+        self._tiles = TileCache(self._path, max_bytes)
+
+        metadata_path = os.path.join(self._path, self._METADATA_FILENAME)
+        if os.path.isfile(metadata_path):
+            with open(metadata_path) as f:
+                metadata = json.load(f)
+            step, tile_size = metadata["step"], metadata["tile_size"]
+        else:
+            with open(metadata_path, "w") as f:
+                json.dump({"step": step, "tile_size": tile_size}, f)
+
+        assert step > 0, f"Tile grid step must be positive ({step} provided)."
+        self.step = float(step)
+        self.tile_size = int(tile_size)
+
+    @classmethod
+    def exists(cls, path: str) -> bool:
+        """Returns True if a tile store has been created in the directory"""
+        return os.path.isfile(
+            os.path.join(os.path.expanduser(path), cls._METADATA_FILENAME)
+        )
+
+    def tile_bbox(self, column: int, row: int) -> BBox:
+        """Returns the bounding box of the tile at the grid index"""
+        return grid_tile_bbox(column, row, self.step)
+
+    def tile_indices(self, polygon: Polygon) -> List[Tuple[int, int]]:
+        """Returns the grid indices of the tiles that intersect the polygon
+
+        :param polygon: Polygon in (longitude, latitude) coordinates
+        :return: List of (column, row) tuples
+        """
+        return grid_tile_indices(polygon, self.step)
+
+    def _key(
+        self,
+        layers: List[str],
+        styles: List[str],
+        column: int,
+        row: int,
+        format_: str,
+        grayscale: bool,
+    ) -> str:
+        """Returns the tile cache key for the tile"""
+        return TileCache.key(
+            layers,
+            styles,
+            SUPPORTED_SRS,
+            self.tile_bbox(column, row),
+            (self.tile_size, self.tile_size),
+            format_,
+            grayscale,
+        )
+
+    def preload(
+        self,
+        raster_source: RasterSource,
+        polygon: Polygon,
+        layers: List[str],
+        styles: List[str],
+        format_: str,
+        transparency: bool,
+        grayscale: bool = False,
+        max_workers: int = 4,
+    ) -> Dict[str, int]:
+        """Fetches all missing tiles that intersect the polygon in parallel
+
+        :param raster_source: Raster source to fetch the tiles from
+        :param polygon: Corridor polygon in (longitude, latitude) coordinates
+        :param layers: Requested layers
+        :param styles: Requested styles
+        :param format_: Requested image format
+        :param transparency: Requested transparency
+        :param grayscale: True to fetch single channel grayscale tiles
+        :param max_workers: Maximum number of parallel requests
+        :return: Number of fetched, already stored, and failed tiles
+        """
+        counts = {"fetched": 0, "stored": 0, "failed": 0}
+        missing = []
+        for column, row in self.tile_indices(polygon):
+            key = self._key(layers, styles, column, row, format_, grayscale)
+            if self._tiles.get(key) is not None:
+                counts["stored"] += 1
+            else:
+                missing.append((key, self.tile_bbox(column, row)))
+
+        def _fetch(key: str, bbox: BBox) -> bool:
+            try:
+                raster = raster_source.get_map(
+                    layers,
+                    styles,
+                    SUPPORTED_SRS,
+                    bbox,
+                    (self.tile_size, self.tile_size),
+                    format_,
+                    transparency,
+                    grayscale,
+                )
+            except Exception:
+                return False
+            if raster is None:
+                return False
+            self._tiles.put(key, raster)
+            return True
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for success in executor.map(lambda args: _fetch(*args), missing):
+                counts["fetched" if success else "failed"] += 1
+
+        return counts
+
+    def get_map(
+        self,
+        layers: List[str],
+        styles: List[str],
+        srs: str,
+        bbox: BBox,
+        size: Tuple[int, int],
+        format_: str,
+        grayscale: bool = False,
+    ) -> Optional[np.ndarray]:
+        """Returns the raster for the bounding box assembled from the stored tiles
+
+        The arguments match those of :meth:`.RasterSource.get_map`.
+
+        :return: Raster in OpenCV layout, or None if the bounding box is not
+            completely covered by stored tiles
+        """
+        if srs != SUPPORTED_SRS:
+            return None
+
+        width, height = size
+        scale_x = width / (bbox.right - bbox.left)
+        scale_y = height / (bbox.top - bbox.bottom)
+        pixel_size = self.step / self.tile_size
+
+        raster: Optional[np.ndarray] = None
+        for column in range(
+            int(np.floor(bbox.left / self.step)), int(np.ceil(bbox.right / self.step))
+        ):
+            for row in range(
+                int(np.floor(bbox.bottom / self.step)),
+                int(np.ceil(bbox.top / self.step)),
+            ):
+                tile = self._tiles.get(
+                    self._key(layers, styles, column, row, format_, grayscale)
+                )
+                if tile is None:
+                    return None
+
+                if raster is None:
+                    raster = np.zeros((height, width, *tile.shape[2:]), tile.dtype)
+
+                # Affine transformation from tile pixels to raster pixels
+                tile_bbox = self.tile_bbox(column, row)
+                M = np.array(
+                    [
+                        [
+                            pixel_size * scale_x,
+                            0,
+                            (tile_bbox.left - bbox.left) * scale_x,
+                        ],
+                        [
+                            0,
+                            pixel_size * scale_y,
+                            (bbox.top - tile_bbox.top) * scale_y,
+                        ],
+                    ]
+                )
+                cv2.warpAffine(
+                    np.ascontiguousarray(tile),
+                    M,
+                    (width, height),
+                    dst=raster,
+                    flags=cv2.INTER_LINEAR,
+                    borderMode=cv2.BORDER_TRANSPARENT,
+                )
+
+        return raster
+
+    def statistics(self) -> Dict[str, int]:
+        """Returns tile store hit and miss counters and current store size"""
+        return self._tiles.statistics()
+
+    def close(self) -> None:
+        """Closes the tile store"""
+        self._tiles.close()
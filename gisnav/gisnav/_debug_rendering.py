@@ -0,0 +1,134 @@
+"""Rate-limited rendering of debug images off the pose estimation hot path
+
+Drawing the keypoint matches and the estimated camera position takes a copy of
+the query and reference images and several OpenCV drawing calls per frame, which
+is wasted work on a headless computer. :class:`.DebugRenderer` instead renders
+the debug images in its own thread at a limited rate, and only the latest frame
+of each kind is rendered if rendering falls behind. The caller passes a render
+callable instead of the rendered image, so a frame that is skipped because of the
+rate limit costs nothing beyond the rate check.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import cv2
+import numpy as np
+
+from ._work_queue import LatestWorkQueue
+
+
+def draw_matches(
+    qry: np.ndarray,
+    ref: np.ndarray,
+    mkp_qry: np.ndarray,
+    mkp_ref: np.ndarray,
+    k: np.ndarray,
+    r: np.ndarray,
+    t: np.ndarray,
+) -> np.ndarray:
+    """Returns the reference and query images side by side with the keypoint
+    matches, the camera field of view projected on the reference image, and the
+    camera position in the reference image
+
+    The input images are not modified.
+
+    :param qry: Grayscale query image
+    :param ref: Grayscale reference image
+    :param mkp_qry: Matched query image keypoints
+    :param mkp_ref: Matched reference image keypoints
+    :param k: Camera intrinsic matrix
+    :param r: Rotation matrix from the reference (world) frame to the camera frame
+    :param t: Translation vector from the reference (world) frame to the camera
+        frame
+    :return: BGR debug image
+    """
+    height, width = qry.shape[0:2]
+    corners = np.float32(
+        [[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]]
+    ).reshape(-1, 1, 2)
+    h_matrix = k @ np.delete(np.hstack((r, t)), 2, 1)
+    try:
+        fov = cv2.perspectiveTransform(corners, np.linalg.inv(h_matrix))
+    except np.linalg.LinAlgError:
+        fov = corners
+
+    ref = cv2.cvtColor(ref, cv2.COLOR_GRAY2BGR)
+    cv2.polylines(ref, [np.int32(fov)], True, (255, 0, 0), 3, cv2.LINE_AA)
+    x, y = (-r.T @ t)[0:2].squeeze().tolist()
+    cv2.circle(ref, (int(x), int(y)), 5, (0, 0, 255), -1)
+
+    kp_qry = [cv2.KeyPoint(x[0], x[1], 1) for x in mkp_qry]
+    kp_ref = [cv2.KeyPoint(x[0], x[1], 1) for x in mkp_ref]
+    matches = [cv2.DMatch(i, i, 0) for i in range(len(kp_qry))]
+    return cv2.drawMatches(
+        ref,
+        kp_ref,
+        cv2.cvtColor(qry, cv2.COLOR_GRAY2BGR),
+        kp_qry,
+        matches,
+        None,
+        matchColor=(0, 255, 0),
+        flags=cv2.DrawMatchesFlags_NOT_DRAW_SINGLE_POINTS,
+    )
+
+
+class DebugRenderer:
+    """Renders debug images in a dedicated thread at a limited rate per kind of
+    image and passes them to a publish callable
+
+    The render callables may return e.g. the image message, so that also the
+    conversion into a message is done in the rendering thread.
+    """
+
+    def __init__(
+        self,
+        publish: Callable[[Hashable, Any], None],
+        rate: float,
+        on_error: Optional[Callable[[Hashable, Exception], None]] = None,
+        name: str = "debug_renderer",
+    ) -> None:
+        """Class initializer
+
+        :param publish: Callable that is called with the kind and the return
+            value of the render callable from the rendering thread
+        :param rate: Maximum number of images of each kind rendered per second
+        :param on_error: Optional callable that is called with the kind and the
+            exception if rendering or publishing raises
+        :param name: Rendering thread name
+        """
+        assert rate > 0
+        self._publish = publish
+        self._period = 1.0 / rate
+        self._submitted: Dict[Hashable, float] = {}
+        self._lock = threading.Lock()
+        self._queue = LatestWorkQueue(self._render, on_error=on_error, name=name)
+
+    def start(self) -> None:
+        """Starts the rendering thread"""
+        self._queue.start()
+
+    def stop(self, timeout: Optional[float] = 1.0) -> None:
+        """Stops the rendering thread, pending images are discarded"""
+        self._queue.stop(timeout)
+
+    def submit(self, kind: Hashable, render: Callable[[], Any]) -> bool:
+        """Submits a debug image for rendering unless the rate limit of its kind
+        has been reached
+
+        :param kind: Kind of debug image, the rate is limited per kind
+        :param render: Callable that returns the debug image, called from the
+            rendering thread. It must not modify the arrays it captures.
+        :return: True if the image was submitted, False if it was skipped
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now - self._submitted.get(kind, -self._period) < self._period:
+                return False
+            self._submitted[kind] = now
+        self._queue.put(kind, render)
+        return True
+
+    def _render(self, kind: Hashable, render: Callable[[], Any]) -> None:
+        """Renders and publishes a debug image, called from the rendering thread"""
+        self._publish(kind, render())
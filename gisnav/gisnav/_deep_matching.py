@@ -0,0 +1,584 @@
+"""Deep keypoint matching engine and its multi-process worker pool
+
+:class:`.DeepMatcher` extracts DISK features and matches them with LightGlue. It
+is used by :class:`.PoseNode` to match camera frames against orthoimagery.
+
+A single inference uses only part of the cores of a many-core CPU. On CPU-only
+computers, :class:`.DeepMatchingPool` runs a :class:`.DeepMatcher` in each of
+several worker processes that are pinned to disjoint subsets of the available
+cores. Frames are dispatched to the workers round-robin, and
+:class:`.ReorderBuffer` releases the results in the order in which the frames
+were submitted. Pose throughput then scales with the number of workers, at the
+cost of one model instance per worker.
+
+The models run in eager mode by default. On the CPU, the DISK backbone can instead
+run as a traced TorchScript module, as a :func:`torch.compile` compiled module, or
+with ONNX Runtime, and LightGlue can run compiled or dynamically quantized to INT8
+(see :data:`.EXTRACTOR_RUNTIMES` and :data:`.MATCHER_RUNTIMES`). The TorchScript
+and ONNX models are exported ahead of time with
+:mod:`.tools.export_deep_matching_models`.
+"""
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Final, Generic, List, Optional, Tuple, TypeVar
+
+import cv2
+import numpy as np
+import torch
+from kornia.feature import DISK, LightGlueMatcher, laf_from_center_scale_ori
+
+try:
+    import onnxruntime
+except ModuleNotFoundError:
+    onnxruntime = None
+
+from ._adaptive import OperatingPoint
+
+_T = TypeVar("_T")
+
+EXTRACTOR_RUNTIMES: Final = ("eager", "torchscript", "compile", "onnx")
+"""Supported DISK backbone runtimes"""
+
+MATCHER_RUNTIMES: Final = ("eager", "compile", "int8")
+"""Supported LightGlue runtimes"""
+
+TORCHSCRIPT_FILENAME: Final = "disk_backbone.pt"
+"""Name of the traced TorchScript DISK backbone file inside the model directory"""
+
+ONNX_FILENAME: Final = "disk_backbone.onnx"
+"""Name of the ONNX DISK backbone file inside the model directory"""
+
+_Features = Tuple[torch.Tensor, torch.Tensor]
+"""Tuple of keypoints as an (N, 2) tensor of pixel coordinates and their
+descriptors as an (N, D) tensor"""
+
+_ArrayFeatures = Tuple[np.ndarray, np.ndarray]
+"""Tuple of keypoints as an (N, 2) array of pixel coordinates and their
+descriptors as an (N, D) array"""
+
+_Matches = Tuple[np.ndarray, np.ndarray]
+"""Tuple of matched query image keypoints and matched reference image keypoints
+as (N, 2) arrays of pixel coordinates"""
+
+
+def _model_path(model_dir: Optional[str], filename: str) -> str:
+    """Returns the path of an exported model file
+
+    :raise FileNotFoundError: If the model has not been exported
+    """
+    path = os.path.join(os.path.expanduser(model_dir or ""), filename)
+    if not os.path.isfile(path):
+        raise FileNotFoundError(
+            f"Exported model {path} not found, export it with the "
+            f"export_deep_matching_models tool."
+        )
+    return path
+
+
+class _ONNXModule(torch.nn.Module):
+    """Runs an exported ONNX model with ONNX Runtime on the CPU in place of the
+    torch module it was exported from
+    """
+
+    def __init__(self, path: str) -> None:
+        """Class initializer
+
+        :param path: ONNX model file
+        """
+        super().__init__()
+        options = onnxruntime.SessionOptions()
+        # Use the same number of threads as torch, e.g. in pinned pool workers
+        options.intra_op_num_threads = torch.get_num_threads()
+        self._session = onnxruntime.InferenceSession(
+            path, options, providers=["CPUExecutionProvider"]
+        )
+        self._input_name = self._session.get_inputs()[0].name
+
+    def forward(self, x: torch.Tensor) -> torch.Tensor:
+        """Returns the model output for the input tensor"""
+        output = self._session.run(None, {self._input_name: x.cpu().numpy()})[0]
+        return torch.from_numpy(output).to(x.device)
+
+
+def export_extractor_backbone(
+    model_dir: str, runtime: str, height: int = 480, width: int = 640
+) -> str:
+    """Exports the DISK backbone for a runtime that runs an exported model
+
+    The backbone is traced with an example input of the given size. The exported
+    models accept any input size that is divisible by 16.
+
+    :param model_dir: Model directory, created if it does not exist
+    :param runtime: Either ``torchscript`` or ``onnx``
+    :param height: Example input height in pixels
+    :param width: Example input width in pixels
+    :return: Path of the exported model file
+    :raise ValueError: If the runtime does not use an exported model
+    """
+    backbone = DISK.from_pretrained("depth").eval().unet
+    example = torch.rand(1, 3, height, width)
+    model_dir = os.path.expanduser(model_dir)
+    os.makedirs(model_dir, exist_ok=True)
+
+    with torch.no_grad():
+        if runtime == "torchscript":
+            path = os.path.join(model_dir, TORCHSCRIPT_FILENAME)
+            torch.jit.trace(backbone, example).save(path)
+        elif runtime == "onnx":
+            path = os.path.join(model_dir, ONNX_FILENAME)
+            torch.onnx.export(
+                backbone,
+                example,
+                path,
+                input_names=["images"],
+                output_names=["output"],
+                dynamic_axes={
+                    "images": {0: "batch", 2: "height", 3: "width"},
+                    "output": {0: "batch", 2: "height", 3: "width"},
+                },
+                opset_version=17,
+            )
+        else:
+            raise ValueError(f"Runtime {runtime} does not use an exported model.")
+    return path
+
+
+def load_extractor_backbone(
+    model_dir: Optional[str], runtime: str, device: torch.device
+) -> torch.nn.Module:
+    """Loads an exported DISK backbone
+
+    :param model_dir: Model directory
+    :param runtime: Either ``torchscript`` or ``onnx``
+    :param device: Device to run inference on, must be the CPU for ``onnx``
+    :return: Module that runs the exported backbone
+    :raise ValueError: If the runtime does not use an exported model
+    :raise FileNotFoundError: If the model has not been exported
+    """
+    if runtime == "torchscript":
+        return torch.jit.load(
+            _model_path(model_dir, TORCHSCRIPT_FILENAME), map_location=device
+        )
+    elif runtime == "onnx":
+        return _ONNXModule(_model_path(model_dir, ONNX_FILENAME))
+    else:
+        raise ValueError(f"Runtime {runtime} does not use an exported model.")
+
+
+class DeepMatcher:
+    """Extracts DISK features and matches them with LightGlue
+
+    Only the DISK backbone network is replaced by the extractor runtime. Keypoint
+    detection from the backbone output is always run by kornia.
+    """
+
+    def __init__(
+        self,
+        device: torch.device,
+        filter_threshold: float,
+        max_keypoints: int,
+        extractor_runtime: str = "eager",
+        matcher_runtime: str = "eager",
+        model_dir: Optional[str] = None,
+    ) -> None:
+        """Class initializer
+
+        :param device: Device to run inference on
+        :param filter_threshold: LightGlue match confidence threshold
+        :param max_keypoints: Maximum number of keypoints extracted from an image
+        :param extractor_runtime: DISK backbone runtime, one of
+            :data:`.EXTRACTOR_RUNTIMES`
+        :param matcher_runtime: LightGlue runtime, one of :data:`.MATCHER_RUNTIMES`
+        :param model_dir: Directory of the exported models, required for the
+            ``torchscript`` and ``onnx`` extractor runtimes
+        :raise ValueError: If a runtime is not supported on the device
+        :raise FileNotFoundError: If the exported model has not been found
+        :raise ModuleNotFoundError: If ``onnxruntime`` is not installed for the
+            ``onnx`` extractor runtime
+        """
+        cpu_only = ("onnx", "int8")
+        if extractor_runtime not in EXTRACTOR_RUNTIMES:
+            raise ValueError(f"Unsupported extractor runtime {extractor_runtime}.")
+        if matcher_runtime not in MATCHER_RUNTIMES:
+            raise ValueError(f"Unsupported matcher runtime {matcher_runtime}.")
+        if device.type != "cpu" and (
+            extractor_runtime in cpu_only or matcher_runtime in cpu_only
+        ):
+            raise ValueError(
+                f"The {extractor_runtime} extractor and {matcher_runtime} matcher "
+                f"runtimes are not both supported on {device}."
+            )
+        if extractor_runtime == "onnx" and onnxruntime is None:
+            raise ModuleNotFoundError(
+                "onnxruntime is required for the ONNX Runtime extractor."
+            )
+
+        self._device = device
+        self._max_keypoints = max_keypoints
+        self._matcher_lock = threading.Lock()
+        self._matcher = (
+            LightGlueMatcher(
+                "disk",
+                params={
+                    "filter_threshold": filter_threshold,
+                    "depth_confidence": -1,
+                    "width_confidence": -1,
+                },
+            )
+            .to(device)
+            .eval()
+        )
+        self._extractor = DISK.from_pretrained("depth").to(device).eval()
+
+        if extractor_runtime in ("torchscript", "onnx"):
+            self._extractor.unet = load_extractor_backbone(
+                model_dir, extractor_runtime, device
+            )
+        elif extractor_runtime == "compile":
+            self._extractor.unet = torch.compile(self._extractor.unet, dynamic=True)
+
+        if matcher_runtime == "compile":
+            self._matcher.matcher = torch.compile(self._matcher.matcher, dynamic=True)
+        elif matcher_runtime == "int8":
+            # LightGlue is a transformer, most of its compute is in linear layers
+            self._matcher = torch.ao.quantization.quantize_dynamic(
+                self._matcher, {torch.nn.Linear}, dtype=torch.qint8
+            )
+
+    @staticmethod
+    def _input_size(shape: Tuple[int, ...], downscale: float) -> Tuple[int, int]:
+        """Returns the (width, height) of the downscaled feature extractor input"""
+        height, width = shape[:2]
+        return (
+            max(1, round(width / downscale)),
+            max(1, round(height / downscale)),
+        )
+
+    def _to_tensor(self, img: np.ndarray, downscale: float) -> torch.Tensor:
+        """Converts a grayscale image into a downscaled and normalized 3-channel
+        input tensor for the feature extractor
+        """
+        if downscale > 1:
+            img = cv2.resize(
+                img,
+                self._input_size(img.shape, downscale),
+                interpolation=cv2.INTER_AREA,
+            )
+        tensor = torch.Tensor(img[None, None]).to(self._device) / 255.0
+        return tensor.expand(-1, 3, -1, -1)
+
+    def _to_image_pixels(
+        self, keypoints: torch.Tensor, shape: Tuple[int, ...], downscale: float
+    ) -> torch.Tensor:
+        """Scales keypoints extracted from the downscaled input back to the pixel
+        coordinates of the image
+        """
+        if downscale == 1:
+            return keypoints
+        width, height = self._input_size(shape, downscale)
+        scale = torch.tensor(
+            [shape[1] / width, shape[0] / height],
+            dtype=keypoints.dtype,
+            device=keypoints.device,
+        )
+        return keypoints * scale
+
+    def extract(
+        self,
+        img: np.ndarray,
+        max_keypoints: Optional[int] = None,
+        downscale: float = 1.0,
+    ) -> _Features:
+        """Returns the keypoints and descriptors of a grayscale image
+
+        :param img: Grayscale image
+        :param max_keypoints: Maximum number of keypoints, defaults to the
+            maximum given to the initializer
+        :param downscale: Factor by which the image is downscaled before feature
+            extraction, the keypoints are returned in the original image pixel
+            coordinates
+        :return: Tuple of keypoints and descriptors
+        """
+        with torch.inference_mode():
+            features = self._extractor(
+                self._to_tensor(img, downscale),
+                max_keypoints or self._max_keypoints,
+                pad_if_not_divisible=True,
+            )[0]
+        return (
+            self._to_image_pixels(features.keypoints, img.shape, downscale),
+            features.descriptors,
+        )
+
+    def match(
+        self,
+        qry: np.ndarray,
+        ref: np.ndarray,
+        qry_features: Optional[_Features] = None,
+        ref_features: Optional[_Features] = None,
+        operating_point: Optional[OperatingPoint] = None,
+    ) -> _Matches:
+        """Returns keypoint matches between the query and reference images
+
+        :param qry: Grayscale query image
+        :param ref: Grayscale reference image
+        :param qry_features: Optional precomputed query keypoints and descriptors,
+            extracted from the query image if not provided
+        :param ref_features: Optional precomputed reference keypoints and
+            descriptors, extracted from the reference image if not provided
+        :param operating_point: Optional operating point of the features that are
+            not provided and of LightGlue, defaults to the maximum keypoints given
+            to the initializer at full resolution without early exit
+        :return: Tuple of matched query image keypoints, and matched reference
+            image keypoints, in order of decreasing match confidence
+        """
+        if operating_point is None:
+            operating_point = OperatingPoint(self._max_keypoints, 1.0, -1.0, -1.0)
+        max_keypoints, downscale, depth_confidence, width_confidence = operating_point
+
+        with torch.inference_mode():
+            if qry_features is None and ref_features is None:
+                # Extract both in a single batch
+                input = torch.cat(
+                    [self._to_tensor(qry, downscale), self._to_tensor(ref, downscale)],
+                    dim=0,
+                )
+                feat_qry, feat_ref = self._extractor(
+                    input, max_keypoints, pad_if_not_divisible=True
+                )
+                kp_qry = self._to_image_pixels(feat_qry.keypoints, qry.shape, downscale)
+                kp_ref = self._to_image_pixels(feat_ref.keypoints, ref.shape, downscale)
+                desc_qry, desc_ref = feat_qry.descriptors, feat_ref.descriptors
+            else:
+                kp_qry, desc_qry = (
+                    self.extract(qry, max_keypoints, downscale)
+                    if qry_features is None
+                    else qry_features
+                )
+                kp_ref, desc_ref = (
+                    self.extract(ref, max_keypoints, downscale)
+                    if ref_features is None
+                    else ref_features
+                )
+
+            lafs_qry = laf_from_center_scale_ori(
+                kp_qry[None], torch.ones(1, len(kp_qry), 1, 1, device=self._device)
+            )
+            lafs_ref = laf_from_center_scale_ori(
+                kp_ref[None], torch.ones(1, len(kp_ref), 1, 1, device=self._device)
+            )
+            # The LightGlue thresholds are module state, so they are set and used
+            # under the lock in case several threads match concurrently
+            with self._matcher_lock:
+                conf = self._matcher.matcher.conf
+                conf.depth_confidence = depth_confidence
+                conf.width_confidence = width_confidence
+                scores, match_indices = self._matcher(
+                    desc_qry, desc_ref, lafs_qry, lafs_ref
+                )
+            # Most confident matches first, see :func:`.bucket_select`
+            match_indices = match_indices[
+                torch.argsort(scores.reshape(-1), descending=True)
+            ]
+
+        mkp_qry = kp_qry[match_indices[:, 0]].cpu().numpy()
+        mkp_ref = kp_ref[match_indices[:, 1]].cpu().numpy()
+        return mkp_qry, mkp_ref
+
+
+_worker_matcher: Optional[DeepMatcher] = None
+"""Deep matcher of the current worker process"""
+
+
+def _init_worker(
+    cores: List[int],
+    filter_threshold: float,
+    max_keypoints: int,
+    extractor_runtime: str,
+    matcher_runtime: str,
+    model_dir: Optional[str],
+) -> None:
+    """Pins the worker process to its cores and loads the models"""
+    global _worker_matcher
+    if cores:
+        os.sched_setaffinity(0, cores)
+        torch.set_num_threads(len(cores))
+    _worker_matcher = DeepMatcher(
+        torch.device("cpu"),
+        filter_threshold,
+        max_keypoints,
+        extractor_runtime=extractor_runtime,
+        matcher_runtime=matcher_runtime,
+        model_dir=model_dir,
+    )
+
+
+def _match_in_worker(
+    qry: np.ndarray,
+    ref: np.ndarray,
+    ref_features: Optional[_ArrayFeatures],
+    operating_point: Optional[OperatingPoint],
+) -> _Matches:
+    """Returns keypoint matches computed by the deep matcher of the worker process"""
+    assert _worker_matcher is not None
+    return _worker_matcher.match(
+        qry,
+        ref,
+        ref_features=None
+        if ref_features is None
+        else (torch.from_numpy(ref_features[0]), torch.from_numpy(ref_features[1])),
+        operating_point=operating_point,
+    )
+
+
+class DeepMatchingPool:
+    """Pool of worker processes that each run their own :class:`.DeepMatcher` on
+    the CPU
+
+    The available cores are split into contiguous disjoint subsets, one per
+    worker. Each worker has its own single process executor, so that frames can
+    be dispatched round-robin.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        filter_threshold: float,
+        max_keypoints: int,
+        extractor_runtime: str = "eager",
+        matcher_runtime: str = "eager",
+        model_dir: Optional[str] = None,
+    ) -> None:
+        """Class initializer
+
+        The worker processes are started and load their models in the background.
+
+        :param workers: Number of worker processes
+        :param filter_threshold: LightGlue match confidence threshold
+        :param max_keypoints: Maximum number of keypoints extracted from an image
+        :param extractor_runtime: DISK backbone runtime of the workers
+        :param matcher_runtime: LightGlue runtime of the workers
+        :param model_dir: Directory of the exported models
+        """
+        assert workers > 0
+        cores = (
+            sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else []
+        )
+        if len(cores) < workers:
+            # Not enough cores to pin the workers, let the OS schedule them
+            core_subsets: List[List[int]] = [[] for _ in range(workers)]
+        else:
+            core_subsets = [
+                subset.tolist() for subset in np.array_split(cores, workers)
+            ]
+
+        # Forking a process with an initialized torch runtime is not safe
+        context = multiprocessing.get_context("spawn")
+        self._executors = [
+            ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(
+                    subset,
+                    filter_threshold,
+                    max_keypoints,
+                    extractor_runtime,
+                    matcher_runtime,
+                    model_dir,
+                ),
+            )
+            for subset in core_subsets
+        ]
+        self._next = 0
+
+        # Start the worker processes now instead of on the first frame
+        for executor in self._executors:
+            executor.submit(int)
+
+    def __len__(self) -> int:
+        """Returns the number of worker processes"""
+        return len(self._executors)
+
+    def submit(
+        self,
+        qry: np.ndarray,
+        ref: np.ndarray,
+        ref_features: Optional[_ArrayFeatures] = None,
+        operating_point: Optional[OperatingPoint] = None,
+    ) -> "Future[_Matches]":
+        """Submits an image pair to the next worker
+
+        :param qry: Grayscale query image
+        :param ref: Grayscale reference image
+        :param ref_features: Optional precomputed reference keypoints and
+            descriptors, extracted from the reference image if not provided
+        :param operating_point: Optional operating point that the worker matches
+            at, see :meth:`.DeepMatcher.match`
+        :return: Future of the tuple of matched query image keypoints, and matched
+            reference image keypoints
+        """
+        executor = self._executors[self._next]
+        self._next = (self._next + 1) % len(self._executors)
+        return executor.submit(
+            _match_in_worker, qry, ref, ref_features, operating_point
+        )
+
+    def close(self) -> None:
+        """Shuts down the worker processes without waiting for pending frames"""
+        for executor in self._executors:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+class ReorderBuffer(Generic[_T]):
+    """Bounded buffer of in-flight futures that releases them in submission order
+
+    A future is released only when it and all futures submitted before it are
+    done, so results are consumed in submission order even if they complete out
+    of order.
+
+    > [!NOTE]
+    > Not thread safe, the buffer must only be used from one thread.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """Class initializer
+
+        :param capacity: Maximum number of in-flight futures
+        """
+        assert capacity > 0
+        self._capacity = capacity
+        self._futures: Deque[Tuple[Future, _T]] = deque()
+
+    def __len__(self) -> int:
+        """Returns the number of in-flight futures"""
+        return len(self._futures)
+
+    def full(self) -> bool:
+        """Returns True if the buffer holds its maximum number of futures"""
+        return len(self._futures) >= self._capacity
+
+    def push(self, future: Future, context: _T) -> None:
+        """Adds an in-flight future
+
+        :param future: Future to add
+        :param context: Context that is released together with the future
+        :raise ValueError: If the buffer is full
+        """
+        if self.full():
+            raise ValueError("Reorder buffer is full.")
+        self._futures.append((future, context))
+
+    def pop_ready(self) -> List[Tuple[Future, _T]]:
+        """Removes and returns the done futures that are not preceded by an
+        unfinished future
+
+        :return: List of done futures and their contexts in submission order
+        """
+        ready = []
+        while self._futures and self._futures[0][0].done():
+            ready.append(self._futures.popleft())
+        return ready
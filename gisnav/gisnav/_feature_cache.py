@@ -0,0 +1,131 @@
+"""Cache of reference image features extracted once per orthoimage
+
+:class:`.GISNode` publishes a new orthoimage much less frequently than the camera
+publishes new frames, but :class:`.StereoNode` rotates and crops the orthoimage
+separately for every frame. Instead of extracting features from every rotated and
+cropped reference image, :class:`.PoseNode` extracts them from the orthoimage once,
+and transforms the keypoint coordinates with the same matrix that was used to
+rotate and crop the reference image.
+
+Learned descriptors such as DISK are not rotation invariant, so the orthoimage is
+rotated to the nearest multiple of a fixed rotation step before extraction (see
+:func:`.rotation_matrix`). The remaining rotation is small enough for the
+descriptors to still match, and features only need to be re-extracted when the
+vehicle heading moves to another rotation step.
+"""
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+import cv2
+import numpy as np
+
+_T = TypeVar("_T")
+
+
+class FeatureCache(Generic[_T]):
+    """Least recently used cache of extracted features
+
+    The cache is safe to use from multiple threads. Features are extracted outside
+    the lock, so concurrent misses for the same key may extract the features more
+    than once.
+    """
+
+    def __init__(self, max_entries: int = 4) -> None:
+        """Class initializer
+
+        :param max_entries: Maximum number of cached entries
+        """
+        assert max_entries > 0
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, _T]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, extract: Callable[[], Optional[_T]]) -> Optional[_T]:
+        """Returns the cached features for the key, extracting them on a miss
+
+        :param key: Cache key, e.g. orthoimage identity and rotation step
+        :param extract: Callable that extracts the features on a cache miss, or
+            returns None if they cannot be extracted
+        :return: Cached or newly extracted features, or None if not available
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        features = extract()
+
+        with self._lock:
+            self.misses += 1
+            if features is None:
+                return None
+            self._entries[key] = features
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+        return features
+
+    def statistics(self) -> Dict[str, float]:
+        """Returns cache hit and miss counters and hit rate"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+def similarity_angle_and_scale(matrix: np.ndarray) -> Tuple[float, float]:
+    """Returns the rotation angle and isotropic scale of a similarity transform
+
+    :param matrix: 2x3 or 3x3 similarity transform matrix as returned by
+        :func:`cv2.getRotationMatrix2D`
+    :return: Tuple of counter-clockwise rotation angle in degrees and scale
+    """
+    angle = np.degrees(np.arctan2(matrix[0, 1], matrix[0, 0]))
+    scale = np.sqrt(np.abs(np.linalg.det(matrix[:2, :2])))
+    return float(angle), float(scale)
+
+
+def quantize_angle(angle: float, step: float) -> float:
+    """Returns the angle rounded to the nearest multiple of the step
+
+    :param angle: Angle in degrees
+    :param step: Rotation step in degrees
+    :return: Quantized angle in degrees in the range [0, 360)
+    """
+    return float((round(angle / step) * step) % 360)
+
+
+def rotation_matrix(
+    shape: Tuple[int, int], angle: float, scale: float
+) -> Tuple[np.ndarray, Tuple[int, int]]:
+    """Returns the matrix that rotates and scales an image around its center
+
+    The output image has the scaled size of the input image so that no pixels
+    inside the inscribed circle of the input image are lost.
+
+    :param shape: Input image shape (height, width)
+    :param angle: Counter-clockwise rotation angle in degrees
+    :param scale: Isotropic scale factor
+    :return: Tuple of 2x3 matrix, and output image size (width, height) for
+        :func:`cv2.warpAffine`
+    """
+    height, width = shape
+    size = int(np.ceil(width * scale)), int(np.ceil(height * scale))
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, scale)
+    matrix[:, 2] += (size[0] / 2 - width / 2, size[1] / 2 - height / 2)
+    return matrix, size
+
+
+def compose(second: np.ndarray, first: np.ndarray) -> np.ndarray:
+    """Returns the 2x3 affine matrix that applies the first and then the second
+    2x3 affine matrix
+    """
+    return (np.vstack([second, [0, 0, 1]]) @ np.vstack([first, [0, 0, 1]]))[:2]
@@ -0,0 +1,268 @@
+"""Offline feature database of the mission area for deep matching
+
+:mod:`.tools.build_feature_db` covers the mission corridor with the same tile grid
+as :class:`.CorridorTileStore`, and extracts reference features from every tile
+once per rotation step (see :mod:`._feature_cache`) before the flight.
+:class:`.PoseNode` then looks up the reference features for the current reference
+image from the database with a spatial index query instead of running the feature
+extractor on the reference image.
+
+The database directory contains flat binary files that are memory-mapped when the
+database is opened, so that only the features that are actually queried are read
+from disk:
+
+* ``features.json``: Metadata including tile grid step, ground sampling distance,
+  number of rotation steps, descriptor dimension and number of features
+* ``index.bin``: Grid index of ``int64`` rows (column, row, rotation, start, stop)
+  that give the range of features extracted from each tile at each rotation step
+* ``offsets.bin``: ``float32`` (longitude, latitude) offsets of the keypoints from
+  the bottom left corner of their tile in degrees
+* ``scores.bin``: ``float16`` keypoint detection scores
+* ``descriptors.bin``: ``float16`` keypoint descriptors
+
+Keypoints are stored in :term:`WGS 84` (``EPSG:4326``) coordinates so that they
+can be projected into any reference image with a known geotransform.
+"""
+import json
+import os
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ._corridor import _METERS_IN_DEGREE, grid_tile_bbox
+from ._transformations import BBox
+
+_METADATA_FILENAME = "features.json"
+"""Name of the metadata file inside the database directory"""
+
+_INDEX_FILENAME = "index.bin"
+"""Name of the grid index file inside the database directory"""
+
+_OFFSETS_FILENAME = "offsets.bin"
+"""Name of the keypoint offsets file inside the database directory"""
+
+_SCORES_FILENAME = "scores.bin"
+"""Name of the keypoint scores file inside the database directory"""
+
+_DESCRIPTORS_FILENAME = "descriptors.bin"
+"""Name of the keypoint descriptors file inside the database directory"""
+
+_FeatureArrays = Tuple[np.ndarray, np.ndarray, np.ndarray]
+"""Tuple of keypoint (longitude, latitude) coordinates, scores and descriptors"""
+
+
+def ground_sampling_distance(geotransform: np.ndarray, latitude: float) -> float:
+    """Returns the ground sampling distance of a raster in meters per pixel
+
+    :param geotransform: 2x2 or larger matrix whose upper left 2x2 block transforms
+        raster pixel offsets into (longitude, latitude) offsets in degrees
+    :param latitude: Latitude of the raster in degrees
+    :return: Ground sampling distance in meters per pixel
+    """
+    square_degrees = np.abs(np.linalg.det(geotransform[:2, :2]))
+    return float(
+        np.sqrt(square_degrees * np.cos(np.radians(latitude))) * _METERS_IN_DEGREE
+    )
+
+
+class FeatureDatabaseWriter:
+    """Writes reference features into a new feature database
+
+    The metadata file is written last in :meth:`.close`, so an incompletely
+    written database is never opened by :class:`.FeatureDatabase`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        step: float,
+        gsd: float,
+        rotations: int,
+        descriptor_dim: int,
+    ) -> None:
+        """Class initializer
+
+        Overwrites any existing database in the directory.
+
+        :param path: Database directory, created if it does not exist
+        :param step: Tile grid step in degrees
+        :param gsd: Ground sampling distance of the tiles in meters per pixel
+        :param rotations: Number of rotation steps in a full turn
+        :param descriptor_dim: Descriptor dimension
+        :raise OSError: If the database files cannot be created
+        """
+        self._path = os.path.expanduser(path)
+        os.makedirs(self._path, exist_ok=True)
+        metadata_path = os.path.join(self._path, _METADATA_FILENAME)
+        if os.path.isfile(metadata_path):
+            os.remove(metadata_path)
+
+        self._metadata = {
+            "step": step,
+            "gsd": gsd,
+            "rotations": rotations,
+            "descriptor_dim": descriptor_dim,
+            "count": 0,
+        }
+        self._index: List[Tuple[int, int, int, int, int]] = []
+        self._files: Dict[str, BinaryIO] = {
+            filename: open(os.path.join(self._path, filename), "wb")
+            for filename in (_OFFSETS_FILENAME, _SCORES_FILENAME, _DESCRIPTORS_FILENAME)
+        }
+
+    def add(
+        self,
+        column: int,
+        row: int,
+        rotation: int,
+        keypoints: np.ndarray,
+        scores: np.ndarray,
+        descriptors: np.ndarray,
+    ) -> None:
+        """Adds the features extracted from a tile at a rotation step
+
+        :param column: Tile grid column index
+        :param row: Tile grid row index
+        :param rotation: Rotation step index
+        :param keypoints: Keypoint (longitude, latitude) coordinates inside the
+            tile of shape (N, 2)
+        :param scores: Keypoint detection scores of shape (N,)
+        :param descriptors: Keypoint descriptors of shape (N, D)
+        """
+        assert len(keypoints) == len(scores) == len(descriptors)
+        assert descriptors.shape[1] == self._metadata["descriptor_dim"]
+        bbox = grid_tile_bbox(column, row, self._metadata["step"])
+        offsets = keypoints - (bbox.left, bbox.bottom)
+
+        start = self._metadata["count"]
+        self._files[_OFFSETS_FILENAME].write(offsets.astype(np.float32).tobytes())
+        self._files[_SCORES_FILENAME].write(scores.astype(np.float16).tobytes())
+        self._files[_DESCRIPTORS_FILENAME].write(
+            descriptors.astype(np.float16).tobytes()
+        )
+        self._metadata["count"] += len(keypoints)
+        self._index.append((column, row, rotation, start, self._metadata["count"]))
+
+    def close(self) -> None:
+        """Writes the grid index and metadata and closes the database files"""
+        for file in self._files.values():
+            file.close()
+        np.array(self._index, dtype=np.int64).reshape(-1, 5).tofile(
+            os.path.join(self._path, _INDEX_FILENAME)
+        )
+        with open(os.path.join(self._path, _METADATA_FILENAME), "w") as f:
+            json.dump(self._metadata, f)
+
+
+class FeatureDatabase:
+    """Read-only memory-mapped feature database
+
+    The database is safe to use from multiple threads.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Class initializer
+
+        :param path: Database directory
+        :raise OSError: If the database cannot be read
+        :raise ValueError: If the database files are inconsistent
+        """
+        path = os.path.expanduser(path)
+        with open(os.path.join(path, _METADATA_FILENAME)) as f:
+            metadata = json.load(f)
+
+        self.step = float(metadata["step"])
+        """Tile grid step in degrees"""
+
+        self.gsd = float(metadata["gsd"])
+        """Ground sampling distance of the tiles in meters per pixel"""
+
+        self.rotations = int(metadata["rotations"])
+        """Number of rotation steps in a full turn"""
+
+        count, dim = int(metadata["count"]), int(metadata["descriptor_dim"])
+        self._offsets = self._memmap(path, _OFFSETS_FILENAME, np.float32, (count, 2))
+        self._scores = self._memmap(path, _SCORES_FILENAME, np.float16, (count,))
+        self._descriptors = self._memmap(
+            path, _DESCRIPTORS_FILENAME, np.float16, (count, dim)
+        )
+
+        index = np.fromfile(os.path.join(path, _INDEX_FILENAME), dtype=np.int64)
+        self._index: Dict[Tuple[int, int, int], Tuple[int, int]] = {
+            (int(column), int(row), int(rotation)): (int(start), int(stop))
+            for column, row, rotation, start, stop in index.reshape(-1, 5)
+        }
+
+    @staticmethod
+    def _memmap(
+        path: str, filename: str, dtype: type, shape: Tuple[int, ...]
+    ) -> np.ndarray:
+        """Returns the database file memory-mapped as an array of the shape
+
+        :raise ValueError: If the file size does not match the shape
+        """
+        file_path = os.path.join(path, filename)
+        expected = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        if os.path.getsize(file_path) != expected:
+            raise ValueError(f"Unexpected size of feature database file {file_path}.")
+        if expected == 0:
+            # Empty files cannot be memory-mapped
+            return np.empty(shape, dtype)
+        return np.memmap(file_path, dtype=dtype, mode="r", shape=shape)
+
+    @classmethod
+    def exists(cls, path: str) -> bool:
+        """Returns True if a complete feature database exists in the directory"""
+        return os.path.isfile(
+            os.path.join(os.path.expanduser(path), _METADATA_FILENAME)
+        )
+
+    def rotation(self, angle: float) -> int:
+        """Returns the index of the rotation step nearest to the angle
+
+        :param angle: Counter-clockwise rotation angle in degrees
+        :return: Rotation step index
+        """
+        return int(round(angle * self.rotations / 360)) % self.rotations
+
+    def query(self, bbox: BBox, angle: float) -> Optional[_FeatureArrays]:
+        """Returns the features of all tiles that intersect the bounding box
+
+        Features outside the bounding box are not filtered out.
+
+        :param bbox: :term:`WGS 84` bounding box
+        :param angle: Counter-clockwise rotation angle of the reference image
+            in degrees
+        :return: Tuple of keypoint (longitude, latitude) coordinates, scores and
+            descriptors, or None if the bounding box is not completely covered by
+            the database
+        """
+        rotation = self.rotation(angle)
+        keypoints, scores, descriptors = [], [], []
+        for column in range(
+            int(np.floor(bbox.left / self.step)), int(np.ceil(bbox.right / self.step))
+        ):
+            for row in range(
+                int(np.floor(bbox.bottom / self.step)),
+                int(np.ceil(bbox.top / self.step)),
+            ):
+                features = self._index.get((column, row, rotation))
+                if features is None:
+                    return None
+                start, stop = features
+                tile_bbox = grid_tile_bbox(column, row, self.step)
+                keypoints.append(
+                    self._offsets[start:stop]
+                    + np.array((tile_bbox.left, tile_bbox.bottom))
+                )
+                scores.append(self._scores[start:stop])
+                descriptors.append(self._descriptors[start:stop])
+
+        if not keypoints:
+            return None
+
+        return (
+            np.concatenate(keypoints),
+            np.concatenate(scores),
+            np.concatenate(descriptors),
+        )
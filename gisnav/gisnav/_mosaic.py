@@ -0,0 +1,252 @@
+"""Rolling in-memory raster mosaic for incremental orthoimage updates
+
+When the vehicle moves, most of the new orthoimage overlaps with the previous one.
+:class:`.RasterMosaic` keeps the previous rasters on a geo-referenced pixel grid,
+shifts them by a whole number of pixels to the new bounding box, and fetches only
+the newly exposed edge strips instead of the whole raster.
+"""
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ._transformations import BBox
+
+_PixelRect = Tuple[int, int, int, int]
+"""Pixel rectangle (x0, y0, x1, y1) with exclusive upper bounds"""
+
+FetchCallable = Callable[[BBox, Tuple[int, int]], Optional[Tuple[np.ndarray, ...]]]
+"""Callable that returns the rasters of all layers for a bounding box and raster
+size (width, height), or None if they could not be retrieved
+
+The raster of each layer is downsampled from the raster size by the layer factor
+(see :class:`.RasterMosaic`).
+"""
+
+
+class RasterMosaic:
+    """Rolling mosaic of one or more co-registered raster layers
+
+    The mosaic canvas always has the most recently requested raster size. The
+    canvas is shifted instead of refetched if the requested resolution is within
+    tolerance of the current canvas resolution, in which case the returned bounding
+    box is the requested bounding box snapped to the canvas pixel grid.
+
+    Layers can be stored at a coarser resolution than the canvas resolution, e.g.
+    an elevation layer that does not need the resolution of the imagery layer. The
+    canvas is then shifted by multiples of the layer downsampling factors only.
+
+    The mosaic is safe to use from multiple threads. Returned rasters are never
+    modified afterwards.
+    """
+
+    def __init__(
+        self, factors: Sequence[int] = (1,), resolution_tolerance: float = 0.05
+    ) -> None:
+        """Class initializer
+
+        :param factors: Integer downsampling factor of each layer relative to the
+            canvas resolution
+        :param resolution_tolerance: Maximum relative difference between the
+            requested and current canvas resolution for the canvas to be shifted
+            instead of refetched
+        """
+        assert all(factor >= 1 for factor in factors)
+        self._factors = tuple(factors)
+        self._step = int(np.lcm.reduce(self._factors))
+        self._resolution_tolerance = resolution_tolerance
+        self._lock = threading.Lock()
+        self._bbox: Optional[BBox] = None
+        self._rasters: Optional[Tuple[np.ndarray, ...]] = None
+        self._size: Optional[Tuple[int, int]] = None
+
+        self.full_updates = 0
+        self.incremental_updates = 0
+        self.fetched_pixels = 0
+        self.reused_pixels = 0
+
+    def statistics(self) -> Dict[str, float]:
+        """Returns update counters and the share of pixels reused from the canvas"""
+        with self._lock:
+            statistics = {
+                "full_updates": self.full_updates,
+                "incremental_updates": self.incremental_updates,
+                "fetched_pixels": self.fetched_pixels,
+                "reused_pixels": self.reused_pixels,
+            }
+        total = statistics["fetched_pixels"] + statistics["reused_pixels"]
+        statistics["reuse_ratio"] = (
+            statistics["reused_pixels"] / total if total else 0.0
+        )
+        return statistics
+
+    def update(
+        self,
+        bbox: BBox,
+        size: Tuple[int, int],
+        fetch: FetchCallable,
+        commit: Optional[Callable[[], bool]] = None,
+    ) -> Optional[Tuple[BBox, Tuple[np.ndarray, ...]]]:
+        """Moves the mosaic canvas to the bounding box and returns its rasters
+
+        Concurrent updates all start from the same canvas, and the canvas is moved
+        by the update that finishes last. Updates whose rasters should not replace
+        the canvas, e.g. speculative or superseded requests, can opt out with the
+        commit callable.
+
+        :param bbox: Requested bounding box
+        :param size: Requested raster size (width, height)
+        :param fetch: Callable that retrieves the rasters for a bounding box
+        :param commit: Optional callable that is called under the lock once the
+            rasters are retrieved, and returns True if the canvas should be moved
+            to them. The canvas is always moved if not provided.
+        :return: Tuple of the canvas bounding box and the rasters of all layers,
+            or None if the rasters could not be retrieved
+        """
+        with self._lock:
+            old_bbox, old_rasters, old_size = self._bbox, self._rasters, self._size
+
+        width, height = size
+        shift = self._shift(old_bbox, old_size, bbox, size)
+        if shift is None:
+            new_bbox, rasters = bbox, fetch(bbox, size)
+            if rasters is None:
+                return None
+            with self._lock:
+                self.full_updates += 1
+                self.fetched_pixels += width * height
+        else:
+            assert old_bbox is not None and old_rasters is not None
+            incremental = self._shift_and_fill(
+                old_bbox, old_rasters, size, *shift, fetch
+            )
+            if incremental is None:
+                return None
+            new_bbox, rasters = incremental
+
+        with self._lock:
+            if commit is None or commit():
+                self._bbox, self._rasters, self._size = new_bbox, rasters, size
+
+        return new_bbox, rasters
+
+    def _shift(
+        self,
+        old_bbox: Optional[BBox],
+        old_size: Optional[Tuple[int, int]],
+        bbox: BBox,
+        size: Tuple[int, int],
+    ) -> Optional[Tuple[int, int]]:
+        """Returns the canvas shift in pixels (columns, rows) to the bounding box,
+        or None if the canvas cannot be shifted and must be refetched
+        """
+        if old_bbox is None or old_size is None:
+            return None
+
+        width, height = size
+        old_width, old_height = old_size
+        if (width, height) != (old_width, old_height):
+            return None
+        if width % self._step or height % self._step:
+            # Layers cannot be shifted by the same whole number of pixels
+            return None
+
+        dx = (old_bbox.right - old_bbox.left) / old_width
+        dy = (old_bbox.top - old_bbox.bottom) / old_height
+        new_dx = (bbox.right - bbox.left) / width
+        new_dy = (bbox.top - bbox.bottom) / height
+        if (
+            abs(new_dx - dx) > self._resolution_tolerance * dx
+            or abs(new_dy - dy) > self._resolution_tolerance * dy
+        ):
+            return None
+
+        # Snap the canvas to the pixel grid of the coarsest layer, centered on the
+        # requested bounding box
+        center_x = (bbox.left + bbox.right) / 2
+        center_y = (bbox.bottom + bbox.top) / 2
+        step = self._step
+        columns = step * int(
+            round((center_x - (old_bbox.left + old_bbox.right) / 2) / (dx * step))
+        )
+        rows = step * int(
+            round(((old_bbox.bottom + old_bbox.top) / 2 - center_y) / (dy * step))
+        )
+        if abs(columns) >= width or abs(rows) >= height:
+            return None
+
+        return columns, rows
+
+    def _shift_and_fill(
+        self,
+        old_bbox: BBox,
+        old_rasters: Tuple[np.ndarray, ...],
+        size: Tuple[int, int],
+        columns: int,
+        rows: int,
+        fetch: FetchCallable,
+    ) -> Optional[Tuple[BBox, Tuple[np.ndarray, ...]]]:
+        """Returns the canvas shifted by the number of pixels with the exposed edge
+        strips fetched, or None if any strip could not be retrieved
+        """
+        width, height = size
+        dx = (old_bbox.right - old_bbox.left) / width
+        dy = (old_bbox.top - old_bbox.bottom) / height
+        left = old_bbox.left + columns * dx
+        top = old_bbox.top - rows * dy
+        new_bbox = BBox(left, top - height * dy, left + width * dx, top)
+
+        # Overlapping region in new canvas pixel coordinates
+        x0, x1 = max(0, -columns), min(width, width - columns)
+        y0, y1 = max(0, -rows), min(height, height - rows)
+
+        rasters = tuple(np.zeros_like(raster) for raster in old_rasters)
+        for raster, old_raster, k in zip(rasters, old_rasters, self._factors):
+            raster[y0 // k : y1 // k, x0 // k : x1 // k] = old_raster[
+                (y0 + rows) // k : (y1 + rows) // k,
+                (x0 + columns) // k : (x1 + columns) // k,
+            ]
+
+        fetched_pixels = 0
+        for x_min, y_min, x_max, y_max in self._strips(width, height, x0, y0, x1, y1):
+            strip_bbox = BBox(
+                left + x_min * dx,
+                top - y_max * dy,
+                left + x_max * dx,
+                top - y_min * dy,
+            )
+            strip_rasters = fetch(strip_bbox, (x_max - x_min, y_max - y_min))
+            if strip_rasters is None:
+                return None
+            for raster, strip_raster, k in zip(rasters, strip_rasters, self._factors):
+                window = raster[y_min // k : y_max // k, x_min // k : x_max // k]
+                window[:] = strip_raster.reshape(window.shape)
+            fetched_pixels += (x_max - x_min) * (y_max - y_min)
+
+        with self._lock:
+            self.incremental_updates += 1
+            self.fetched_pixels += fetched_pixels
+            self.reused_pixels += (x1 - x0) * (y1 - y0)
+        return new_bbox, rasters
+
+    @staticmethod
+    def _strips(
+        width: int, height: int, x0: int, y0: int, x1: int, y1: int
+    ) -> List[_PixelRect]:
+        """Returns the non-empty edge strips of the canvas outside the overlapping
+        region
+
+        The left and right strips span the full canvas height, and the top and
+        bottom strips span the width of the overlapping region.
+        """
+        strips = [
+            (0, 0, x0, height),
+            (x1, 0, width, height),
+            (x0, 0, x1, y0),
+            (x0, y1, x1, height),
+        ]
+        return [
+            (x_min, y_min, x_max, y_max)
+            for x_min, y_min, x_max, y_max in strips
+            if x_max > x_min and y_max > y_min
+        ]
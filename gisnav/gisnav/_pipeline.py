@@ -0,0 +1,174 @@
+"""Multi-threaded pipeline of processing stages connected by bounded queues
+
+Processing a camera frame consists of stages that each mostly run in OpenCV or
+torch code that releases the GIL, e.g. decoding, feature extraction, matching and
+PnP. When the stages run serially, only one of them is busy at a time.
+:class:`.Pipeline` runs each stage in its own thread so that consecutive frames
+are processed in different stages at the same time, e.g. frame N+1 is decoded
+while frame N is matched and frame N-1 is in PnP.
+
+The queues between the stages are bounded, so a slow stage blocks the stages
+before it instead of letting frames pile up. Items pass through the stages in
+first-in-first-out order, so the output order matches the input order.
+"""
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_StageFunction = Callable[[Any], Optional[Any]]
+"""Stage function that returns the item for the next stage, or None to drop the
+item"""
+
+
+class _Stage:
+    """Pipeline stage with an input queue, a worker thread and statistics"""
+
+    _LATENCY_WINDOW = 100
+    """Number of latest stage latencies that the statistics are computed from"""
+
+    def __init__(self, name: str, function: _StageFunction, queue_size: int) -> None:
+        self.name = name
+        self.function = function
+        self.queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self.latencies: Deque[float] = deque(maxlen=self._LATENCY_WINDOW)
+        self.processed = 0
+        self.dropped = 0
+        self.thread: Optional[threading.Thread] = None
+
+
+class Pipeline:
+    """Pipeline of stages that each run in their own thread
+
+    Each stage function receives the item returned by the previous stage. The
+    last stage function is expected to consume the item, its return value is
+    discarded.
+    """
+
+    def __init__(
+        self,
+        stages: Sequence[Tuple[str, _StageFunction]],
+        queue_size: int = 1,
+        on_error: Optional[Callable[[str, Exception], None]] = None,
+        name: str = "pipeline",
+    ) -> None:
+        """Class initializer
+
+        :param stages: Sequence of stage names and stage functions in processing
+            order
+        :param queue_size: Maximum number of items waiting in front of each stage
+        :param on_error: Optional callable that is called with the stage name and
+            the exception if a stage function raises, the item is then dropped
+        :param name: Name prefix of the stage threads
+        """
+        assert stages and queue_size > 0
+        self._stages: List[_Stage] = [
+            _Stage(stage_name, function, queue_size) for stage_name, function in stages
+        ]
+        self._on_error = on_error
+        self._name = name
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Starts the stage threads"""
+        for i, stage in enumerate(self._stages):
+            stage.thread = threading.Thread(
+                target=self._run,
+                args=(i,),
+                name=f"{self._name}_{stage.name}",
+                daemon=True,
+            )
+            stage.thread.start()
+
+    def stop(self, timeout: Optional[float] = 1.0) -> None:
+        """Stops the stage threads, items still in the pipeline are discarded
+
+        :param timeout: Maximum time in seconds to wait for each stage to finish
+            the item it is currently processing
+        """
+        self._stopped.set()
+        for stage in self._stages:
+            if stage.thread is not None and stage.thread.is_alive():
+                stage.thread.join(timeout)
+
+    def put(self, item: Any, stage: Optional[str] = None) -> bool:
+        """Submits an item, blocks while the queue of the stage is full
+
+        :param item: Item to process
+        :param stage: Optional name of the stage to submit the item to, e.g. if
+            the earlier stages have already been completed elsewhere, defaults to
+            the first stage
+        :return: True if the item was submitted, False if the pipeline was stopped
+        """
+        index = (
+            0
+            if stage is None
+            else next(i for i, s in enumerate(self._stages) if s.name == stage)
+        )
+        return self._put(index, item)
+
+    def statistics(self) -> Dict[str, Dict[str, float]]:
+        """Returns the queue depth, processed and dropped item counters, and mean
+        and maximum latency in seconds of each stage
+        """
+        with self._lock:
+            return {
+                stage.name: {
+                    "queue_depth": stage.queue.qsize(),
+                    "processed": stage.processed,
+                    "dropped": stage.dropped,
+                    "latency_mean": float(np.mean(stage.latencies))
+                    if stage.latencies
+                    else 0.0,
+                    "latency_max": max(stage.latencies, default=0.0),
+                }
+                for stage in self._stages
+            }
+
+    def _put(self, index: int, item: Any) -> bool:
+        """Puts an item into the queue of the stage, blocks while the queue is
+        full
+
+        :return: True if the item was queued, False if the pipeline was stopped
+        """
+        queue_ = self._stages[index].queue
+        while not self._stopped.is_set():
+            try:
+                queue_.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self, index: int) -> None:
+        """Processes the items of the stage until stopped"""
+        stage = self._stages[index]
+        last = index == len(self._stages) - 1
+        while not self._stopped.is_set():
+            try:
+                item = stage.queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            start = time.monotonic()
+            try:
+                result = stage.function(item)
+            except Exception as e:
+                if self._on_error is None:
+                    raise
+                self._on_error(stage.name, e)
+                result = None
+            latency = time.monotonic() - start
+
+            with self._lock:
+                stage.latencies.append(latency)
+                stage.processed += 1
+                if result is None and not last:
+                    stage.dropped += 1
+
+            if result is not None and not last:
+                self._put(index + 1, result)
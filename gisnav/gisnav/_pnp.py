@@ -0,0 +1,260 @@
+"""Perspective-n-Point (PnP) solver with warm start and correspondence budgeting
+
+:class:`.PoseNode` estimates the camera pose by solving the PnP problem from the
+keypoint matches. The RANSAC solve time grows with the number of
+correspondences, so :class:`.PnPSolver` first caps the correspondence set with
+:func:`.bucket_select`, which keeps the most confident matches spread evenly
+over the image.
+
+Consecutive frames have similar poses, so the solver first tries the previous
+solution as a warm start: if enough correspondences are inliers under the
+previous pose, the pose is only refined on those inliers with
+Levenberg-Marquardt and RANSAC is skipped. Otherwise the
+pose is solved from scratch with classic RANSAC or one of the OpenCV USAC
+variants such as MAGSAC++ (see :data:`.PNP_METHODS`).
+"""
+from typing import Dict, Final, Hashable, NamedTuple, Optional, Tuple
+
+import cv2
+import numpy as np
+
+PNP_METHODS: Final = {
+    "ransac": cv2.SOLVEPNP_ITERATIVE,
+    "usac": cv2.USAC_DEFAULT,
+    "usac_accurate": cv2.USAC_ACCURATE,
+    "usac_magsac": cv2.USAC_MAGSAC,
+}
+"""Supported robust PnP methods and their :func:`cv2.solvePnPRansac` flags"""
+
+_Pose = Tuple[np.ndarray, np.ndarray]
+"""Tuple of rotation vector and translation vector"""
+
+
+class PnPResult(NamedTuple):
+    """PnP solution and its inlier statistics"""
+
+    r: np.ndarray
+    """Rotation matrix from the object (world) frame to the camera frame"""
+
+    t: np.ndarray
+    """Translation vector from the object (world) frame to the camera frame"""
+
+    correspondences: int
+    """Number of correspondences used to solve the pose after budgeting"""
+
+    inliers: int
+    """Number of inlier correspondences"""
+
+    inlier_ratio: float
+    """Ratio of inlier correspondences to the correspondences used"""
+
+    reprojection_error: float
+    """Root mean square reprojection error of the inliers in pixels"""
+
+    warm_started: bool
+    """True if the pose was refined from the warm start without RANSAC"""
+
+
+def bucket_select(
+    points: np.ndarray, max_count: int, grid: Tuple[int, int] = (8, 8)
+) -> np.ndarray:
+    """Returns the indices of at most the given number of points spread evenly
+    over a grid of cells
+
+    The cells are filled round-robin: the first point of every cell is selected
+    before the second point of any cell. Within a cell, points are selected in
+    input order, so if the points are in order of decreasing confidence, the most
+    confident points of each cell are selected.
+
+    :param points: Points as an (N, 2) array
+    :param max_count: Maximum number of points to select
+    :param grid: Number of cells along the x and y axes of the bounding box of
+        the points
+    :return: Indices of the selected points in increasing order
+    """
+    n = len(points)
+    if n <= max_count:
+        return np.arange(n)
+
+    grid_size = np.array(grid)
+    low = points.min(axis=0)
+    size = np.maximum(points.max(axis=0) - low, np.finfo(np.float32).eps)
+    cells = np.minimum((points - low) / size * grid_size, grid_size - 1).astype(int)
+    cell = cells[:, 1] * grid_size[0] + cells[:, 0]
+
+    # Rank of each point within its cell in input order
+    order = np.argsort(cell, kind="stable")
+    sorted_cell = cell[order]
+    starts = np.flatnonzero(np.r_[True, sorted_cell[1:] != sorted_cell[:-1]])
+    rank = np.empty(n, dtype=int)
+    rank[order] = np.arange(n) - np.repeat(starts, np.diff(np.r_[starts, n]))
+
+    return np.sort(np.lexsort((np.arange(n), rank))[:max_count])
+
+
+class PnPSolver:
+    """Robust PnP solver with correspondence budgeting and warm start
+
+    The solver remembers the latest solution for each key passed to
+    :meth:`.solve`, e.g. one for absolute and one for relative poses, and uses
+    it as the warm start for the next solve with the same key.
+
+    > [!NOTE]
+    > Not thread safe, the solver must only be used from one thread.
+    """
+
+    WARM_START_MIN_INLIER_RATIO: Final = 0.5
+    """Minimum ratio of inliers under the warm start pose for RANSAC to be
+    skipped"""
+
+    MIN_CORRESPONDENCES: Final = 6
+    """Minimum number of correspondences or inliers for a solution"""
+
+    def __init__(
+        self,
+        method: str = "ransac",
+        max_correspondences: int = 512,
+        reprojection_error: float = 8.0,
+        confidence: float = 0.99,
+        max_iterations: int = 100,
+    ) -> None:
+        """Class initializer
+
+        :param method: Robust estimation method, one of :data:`.PNP_METHODS`
+        :param max_correspondences: Maximum number of correspondences used to
+            solve a pose, see :func:`.bucket_select`
+        :param reprojection_error: Maximum reprojection error of an inlier in
+            pixels
+        :param confidence: RANSAC confidence
+        :param max_iterations: Maximum number of RANSAC iterations
+        :raise ValueError: If the method is not supported
+        """
+        if method not in PNP_METHODS:
+            raise ValueError(f"Unsupported PnP method {method}.")
+        self._flags = PNP_METHODS[method]
+        self._max_correspondences = max_correspondences
+        self._reprojection_error = reprojection_error
+        self._confidence = confidence
+        self._max_iterations = max_iterations
+        self._previous: Dict[Hashable, _Pose] = {}
+
+    def solve(
+        self,
+        object_points: np.ndarray,
+        image_points: np.ndarray,
+        k: np.ndarray,
+        key: Hashable = None,
+    ) -> Optional[PnPResult]:
+        """Returns the camera pose solved from the correspondences
+
+        :param object_points: Object points as an (N, 3) array, in order of
+            decreasing match confidence if known
+        :param image_points: Corresponding image points as an (N, 2) array
+        :param k: Camera intrinsic matrix
+        :param key: Key of the previous solution that is used as the warm start
+        :return: The solution and its inlier statistics, or None if the pose
+            could not be solved
+        """
+        if len(object_points) < self.MIN_CORRESPONDENCES:
+            self._previous.pop(key, None)
+            return None
+
+        selected = bucket_select(image_points, self._max_correspondences)
+        object_points = np.ascontiguousarray(object_points[selected], dtype=np.float64)
+        image_points = np.ascontiguousarray(image_points[selected], dtype=np.float64)
+        k = np.asarray(k, dtype=np.float64)
+
+        guess = self._previous.get(key)
+
+        pose = None
+        warm_started = False
+        if guess is not None:
+            pose = self._refine(object_points, image_points, k, guess)
+            warm_started = pose is not None
+        if pose is None:
+            pose = self._ransac(object_points, image_points, k)
+        if pose is None:
+            self._previous.pop(key, None)
+            return None
+
+        rvec, tvec = pose
+        errors = self._reprojection_errors(object_points, image_points, k, rvec, tvec)
+        inliers = errors < self._reprojection_error
+        inlier_count = int(np.count_nonzero(inliers))
+        if inlier_count < self.MIN_CORRESPONDENCES:
+            self._previous.pop(key, None)
+            return None
+
+        self._previous[key] = (rvec, tvec)
+        r, _ = cv2.Rodrigues(rvec)
+        return PnPResult(
+            r,
+            tvec,
+            len(object_points),
+            inlier_count,
+            inlier_count / len(object_points),
+            float(np.sqrt(np.mean(errors[inliers] ** 2))),
+            warm_started,
+        )
+
+    @staticmethod
+    def _reprojection_errors(
+        object_points: np.ndarray,
+        image_points: np.ndarray,
+        k: np.ndarray,
+        rvec: np.ndarray,
+        tvec: np.ndarray,
+    ) -> np.ndarray:
+        """Returns the reprojection error of each correspondence in pixels"""
+        projected, _ = cv2.projectPoints(object_points, rvec, tvec, k, None)
+        return np.linalg.norm(projected.reshape(-1, 2) - image_points, axis=1)
+
+    def _refine(
+        self,
+        object_points: np.ndarray,
+        image_points: np.ndarray,
+        k: np.ndarray,
+        guess: _Pose,
+    ) -> Optional[_Pose]:
+        """Returns the warm start pose refined on its inliers, or None if too few
+        correspondences are inliers under the warm start pose
+        """
+        rvec, tvec = (np.array(v, dtype=np.float64).reshape(3, 1) for v in guess)
+        inliers = (
+            self._reprojection_errors(object_points, image_points, k, rvec, tvec)
+            < self._reprojection_error
+        )
+        inlier_count = np.count_nonzero(inliers)
+        if (
+            inlier_count < self.MIN_CORRESPONDENCES
+            or inlier_count < self.WARM_START_MIN_INLIER_RATIO * len(inliers)
+        ):
+            return None
+        rvec, tvec = cv2.solvePnPRefineLM(
+            object_points[inliers], image_points[inliers], k, None, rvec, tvec
+        )
+        return rvec, tvec
+
+    def _ransac(
+        self, object_points: np.ndarray, image_points: np.ndarray, k: np.ndarray
+    ) -> Optional[_Pose]:
+        """Returns the pose solved with the robust estimation method, or None if
+        not solved
+        """
+        success, rvec, tvec, inliers = cv2.solvePnPRansac(
+            object_points,
+            image_points,
+            k,
+            None,
+            iterationsCount=self._max_iterations,
+            reprojectionError=self._reprojection_error,
+            confidence=self._confidence,
+            flags=self._flags,
+        )
+        if not success or inliers is None or len(inliers) < self.MIN_CORRESPONDENCES:
+            return None
+        # USAC does not refine the minimal solution on the inliers
+        inliers = inliers.reshape(-1)
+        return cv2.solvePnPRefineLM(
+            object_points[inliers], image_points[inliers], k, None, rvec, tvec
+        )
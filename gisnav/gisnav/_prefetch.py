@@ -0,0 +1,143 @@
+"""Flight path prediction for prefetching orthoimages ahead of the vehicle
+
+:class:`.BoundingBoxPredictor` estimates the velocity of the camera's ground-projected
+field of view from the recent bounding box history and extrapolates it along the
+projected flight path. :class:`.GISNode` uses the predicted bounding box to request
+the next orthoimage before the overlap threshold is crossed so that the new
+orthoimage can be swapped in without waiting for the GetMap round trip.
+"""
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+import numpy as np
+
+from ._transformations import BBox
+
+
+class BoundingBoxPredictor:
+    """Predicts future bounding boxes by linear extrapolation of the bounding box
+    center
+
+    Velocity is estimated with a least squares linear fit of the bounding box
+    center over the samples received within the history window, which is less
+    sensitive to noise in individual samples than a finite difference of the two
+    latest samples. The predicted bounding box has the size of the latest bounding
+    box.
+    """
+
+    def __init__(self, max_samples: int = 20, max_age: float = 5.0) -> None:
+        """Class initializer
+
+        :param max_samples: Maximum number of bounding boxes to keep in history
+        :param max_age: Maximum age of bounding boxes used for velocity estimation
+            in seconds
+        """
+        self._max_age = max_age
+        self._history: Deque[Tuple[float, BBox]] = deque(maxlen=max_samples)
+
+    def update(self, timestamp: float, bbox: BBox) -> None:
+        """Adds a bounding box to the history
+
+        :param timestamp: Monotonic timestamp of the bounding box in seconds
+        :param bbox: Bounding box
+        """
+        if self._history and timestamp <= self._history[-1][0]:
+            # Clock went backwards or duplicate sample - restart estimation
+            self._history.clear()
+        self._history.append((timestamp, bbox))
+
+    def velocity(self) -> Optional[Tuple[float, float]]:
+        """Returns the estimated velocity of the bounding box center
+
+        :return: Velocity tuple (x, y) in bounding box units per second, or None
+            if there are not enough recent samples
+        """
+        if not self._history:
+            return None
+
+        latest = self._history[-1][0]
+        samples = [
+            (timestamp, bbox)
+            for timestamp, bbox in self._history
+            if latest - timestamp <= self._max_age
+        ]
+        if len(samples) < 3:
+            return None
+
+        t = np.array([timestamp - latest for timestamp, _ in samples])
+        centers = np.array(
+            [
+                ((bbox.left + bbox.right) / 2, (bbox.bottom + bbox.top) / 2)
+                for _, bbox in samples
+            ]
+        )
+        # Least squares slope of center coordinates against time
+        t_centered = t - t.mean()
+        denominator = np.dot(t_centered, t_centered)
+        if denominator == 0:
+            return None
+        slope = t_centered @ (centers - centers.mean(axis=0)) / denominator
+        return float(slope[0]), float(slope[1])
+
+    def predict(self, lookahead: float) -> Optional[BBox]:
+        """Returns the predicted bounding box
+
+        :param lookahead: Time from the latest bounding box to predict for in
+            seconds
+        :return: Predicted bounding box, or None if velocity cannot be estimated
+        """
+        velocity = self.velocity()
+        if velocity is None:
+            return None
+
+        _, bbox = self._history[-1]
+        dx, dy = velocity[0] * lookahead, velocity[1] * lookahead
+        return BBox(bbox.left + dx, bbox.bottom + dy, bbox.right + dx, bbox.top + dy)
+
+
+class PrefetchStatistics:
+    """Prefetch hit and miss counters and lead times
+
+    Lead time is the time between a prefetched orthoimage becoming available and
+    the orthoimage being needed. A negative lead time means the prefetch request
+    was still in flight when the orthoimage was needed.
+    """
+
+    def __init__(self, max_samples: int = 100) -> None:
+        """Class initializer
+
+        :param max_samples: Number of latest lead times to compute the mean over
+        """
+        self.hits = 0
+        self.late_hits = 0
+        self.misses = 0
+        self._lead_times: Deque[float] = deque(maxlen=max_samples)
+
+    def hit(self, lead_time: float) -> None:
+        """Records a prefetch hit
+
+        :param lead_time: Lead time of the prefetched orthoimage in seconds
+        """
+        if lead_time < 0:
+            self.late_hits += 1
+        else:
+            self.hits += 1
+        self._lead_times.append(lead_time)
+
+    def miss(self) -> None:
+        """Records a prefetch miss"""
+        self.misses += 1
+
+    def statistics(self) -> Dict[str, float]:
+        """Returns prefetch hit and miss counters, hit rate and lead times"""
+        total = self.hits + self.late_hits + self.misses
+        statistics: Dict[str, float] = {
+            "hits": self.hits,
+            "late_hits": self.late_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.late_hits) / total if total else 0.0,
+        }
+        if self._lead_times:
+            statistics["last_lead_time"] = self._lead_times[-1]
+            statistics["mean_lead_time"] = float(np.mean(self._lead_times))
+        return statistics
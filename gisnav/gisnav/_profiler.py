@@ -0,0 +1,197 @@
+"""On-demand sampling profiler for live nodes
+
+A deterministic profiler such as :mod:`cProfile` hooks every Python function call
+and slows the profiled node down considerably, so it cannot be left enabled in
+flight. :class:`.SamplingProfiler` instead samples the call stacks of all threads
+from a background thread at a fixed interval. The overhead is limited to the
+sampling itself and does not depend on how many calls the node makes, and
+nothing is sampled while the profiler is stopped.
+
+Each node spun up by :func:`gisnav._run` has a :class:`.ProfilerService` that
+starts and stops profiling at runtime. When stopped, the sampled stacks are
+written to disk in the collapsed (folded) stack format that e.g.
+``flamegraph.pl``, ``inferno`` and speedscope read:
+
+.. code-block:: bash
+    :caption: Profile PoseNode for a while and render a flamegraph
+
+    ros2 service call /gisnav/pose_node/profile std_srvs/srv/SetBool "{data: true}"
+    ros2 service call /gisnav/pose_node/profile std_srvs/srv/SetBool "{data: false}"
+    flamegraph.pl ~/.cache/gisnav/profiles/pose_node-*.folded > pose_node.svg
+
+The profile measures wall-clock time: threads that are blocked, e.g. waiting in
+the executor or on a queue, also appear in the samples.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import CodeType
+from typing import Counter as CounterType
+from typing import Final, Optional, Tuple
+
+from rclpy.node import Node
+from std_srvs.srv import SetBool
+
+from .constants import ROS_SERVICE_RELATIVE_PROFILE
+
+_Stack = Tuple[str, Tuple[CodeType, ...]]
+"""Tuple of thread name and the code objects of the call stack from the
+outermost to the innermost frame"""
+
+
+class SamplingProfiler:
+    """Samples the call stacks of all other threads in a background thread"""
+
+    MAX_DEPTH: Final = 128
+    """Maximum number of innermost frames sampled from a call stack"""
+
+    def __init__(self, interval: float = 0.01) -> None:
+        """Class initializer
+
+        :param interval: Sampling interval in seconds
+        """
+        self._interval = interval
+        self._samples: CounterType[_Stack] = Counter()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        """True if the profiler is sampling"""
+        return self._thread is not None
+
+    def start(self) -> bool:
+        """Discards the previous samples and starts sampling
+
+        :return: True if started, False if the profiler was already running
+        """
+        with self._lock:
+            if self._thread is not None:
+                return False
+            self._samples = Counter()
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._sample, name="sampling_profiler", daemon=True
+            )
+            self._thread.start()
+            return True
+
+    def stop(self) -> CounterType[_Stack]:
+        """Stops sampling
+
+        :return: Number of samples of each call stack, empty if the profiler was
+            not running
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return Counter()
+        self._stop.set()
+        thread.join()
+        return self._samples
+
+    def _sample(self) -> None:
+        """Samples the call stacks until stopped, run in the profiler thread"""
+        ident = threading.get_ident()
+        samples = self._samples
+        while not self._stop.wait(self._interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_ident, frame in sys._current_frames().items():
+                if thread_ident == ident:
+                    continue
+                codes = []
+                while frame is not None and len(codes) < self.MAX_DEPTH:
+                    codes.append(frame.f_code)
+                    frame = frame.f_back
+                codes.reverse()
+                samples[(names.get(thread_ident, str(thread_ident)), tuple(codes))] += 1
+
+
+def write_collapsed(samples: CounterType[_Stack], path: str) -> None:
+    """Writes the samples in the collapsed stack format
+
+    Each line has the thread name and the functions of a call stack from the
+    outermost to the innermost separated by semicolons, followed by the number of
+    samples of the stack.
+
+    :param samples: Number of samples of each call stack
+    :param path: Output file path
+    """
+    with open(path, "w") as f:
+        for (thread_name, codes), count in samples.most_common():
+            frames = ";".join(
+                f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+                for code in codes
+            )
+            f.write(f"{thread_name};{frames} {count}\n")
+
+
+class ProfilerService:
+    """ROS service that starts and stops a :class:`.SamplingProfiler` for a node
+
+    The service is a :class:`std_srvs.srv.SetBool` on
+    :data:`.ROS_SERVICE_RELATIVE_PROFILE`: ``true`` starts profiling and
+    ``false`` stops it and writes the collapsed stacks into the output
+    directory. The response message has the path of the written file.
+    """
+
+    DEFAULT_DIR: Final = "~/.cache/gisnav/profiles"
+    """Default output directory of the collapsed stack files"""
+
+    def __init__(
+        self, node: Node, directory: str = DEFAULT_DIR, interval: float = 0.01
+    ) -> None:
+        """Class initializer
+
+        :param node: Profiled node that provides the service
+        :param directory: Output directory of the collapsed stack files
+        :param interval: Sampling interval in seconds
+        """
+        self._node = node
+        self._directory = os.path.expanduser(directory)
+        self._profiler = SamplingProfiler(interval)
+        self._service = node.create_service(
+            SetBool, ROS_SERVICE_RELATIVE_PROFILE, self._callback
+        )
+
+    def stop(self) -> Optional[str]:
+        """Stops profiling and writes the collapsed stacks
+
+        :return: Path of the written file, or None if not profiling
+        """
+        if not self._profiler.running:
+            return None
+        samples = self._profiler.stop()
+        os.makedirs(self._directory, exist_ok=True)
+        path = os.path.join(
+            self._directory,
+            f"{self._node.get_name()}-{time.strftime('%Y%m%d-%H%M%S')}.folded",
+        )
+        write_collapsed(samples, path)
+        self._node.get_logger().info(
+            f"Wrote {sum(samples.values())} profile samples to {path}."
+        )
+        return path
+
+    def _callback(
+        self, request: SetBool.Request, response: SetBool.Response
+    ) -> SetBool.Response:
+        """Starts or stops profiling"""
+        if request.data:
+            response.success = self._profiler.start()
+            response.message = (
+                "Profiling started." if response.success else "Already profiling."
+            )
+        else:
+            try:
+                path = self.stop()
+            except OSError as e:
+                response.success = False
+                response.message = f"Could not write profile: {e}"
+            else:
+                response.success = path is not None
+                response.message = path if path is not None else "Not profiling."
+        return response
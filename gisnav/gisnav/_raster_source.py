@@ -0,0 +1,225 @@
+"""Raster sources that :class:`.GISNode` retrieves orthoimagery and DEM rasters from
+
+The default source sends GetMap requests to a WMS endpoint. If the raster datasets
+are available on the same disk, :class:`.GDALRasterSource` can read them directly
+instead, which avoids the HTTP round trip and lossy image encoding and decoding.
+
+All sources return rasters in OpenCV layout, i.e. ``(height, width, channels)`` in
+BGR channel order, or ``(height, width)`` for grayscale rasters. The returned raster
+covers exactly the requested bounding box at exactly the requested size.
+
+> [!NOTE] Must install extra for GDAL raster source
+> :class:`.GDALRasterSource` is not available if the ``gdal_raster_source`` Python
+> extra has not been installed.
+>
+> .. code-block:: bash
+>     :caption: Install GDAL raster source dependencies
+>
+>     cd ~/colcon_ws/src/gisnav/gisnav
+>     pip install .[gdal_raster_source]
+"""
+import os
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from ._transformations import BBox
+from ._wms_client import WMSClient
+
+try:
+    import rasterio
+    from rasterio.enums import Resampling
+    from rasterio.transform import from_bounds
+    from rasterio.vrt import WarpedVRT
+    from rasterio.warp import transform_bounds
+except ModuleNotFoundError:
+    rasterio = None
+
+
+class RasterSource(ABC):
+    """Abstract base class for raster sources"""
+
+    @abstractmethod
+    def get_map(
+        self,
+        layers: List[str],
+        styles: List[str],
+        srs: str,
+        bbox: BBox,
+        size: Tuple[int, int],
+        format_: str,
+        transparency: bool,
+        grayscale: bool = False,
+    ) -> Optional[np.ndarray]:
+        """Returns the raster for the bounding box
+
+        The arguments match those of a WMS GetMap request.
+
+        :param layers: Requested layers
+        :param styles: Requested styles (may be ignored by the source)
+        :param srs: Spatial reference system of the bounding box
+        :param bbox: Bounding box of the raster
+        :param size: Raster size (width, height)
+        :param format_: Image format (may be ignored by the source)
+        :param transparency: Transparency flag (may be ignored by the source)
+        :param grayscale: True to return a single channel grayscale raster
+        :return: Raster in OpenCV layout, or None if not available
+        """
+
+
+class WMSRasterSource(RasterSource):
+    """Retrieves rasters via WMS GetMap requests
+
+    > [!NOTE]
+    > Exceptions raised by the WMS client are passed through to the caller (see
+    > :class:`.GISNode`).
+    """
+
+    def __init__(self, wms_client: WMSClient) -> None:
+        """Class initializer
+
+        :param wms_client: Connected WMS client
+        """
+        self._wms_client = wms_client
+
+    def get_map(
+        self,
+        layers: List[str],
+        styles: List[str],
+        srs: str,
+        bbox: BBox,
+        size: Tuple[int, int],
+        format_: str,
+        transparency: bool,
+        grayscale: bool = False,
+    ) -> Optional[np.ndarray]:
+        """Returns the raster for the bounding box by sending a GetMap request
+
+        See :meth:`.RasterSource.get_map` for the arguments.
+        """
+        img = self._wms_client.getmap(
+            layers=layers,
+            styles=styles,
+            srs=srs,
+            bbox=bbox,
+            size=size,
+            format=format_,
+            transparent=transparency,
+        )
+        return self.decode(img, grayscale)
+
+    @staticmethod
+    def decode(img: bytes, grayscale: bool = False) -> Optional[np.ndarray]:
+        """Decodes image bytes into a numpy array
+
+        :param img: Encoded image bytes
+        :param grayscale: True if buffer represents grayscale image
+        :return: Image as np.ndarray, or None if it could not be decoded
+        """
+        buffer = np.frombuffer(img, np.uint8)  # TODO: make DEM uint16?
+        return (
+            cv2.imdecode(buffer, cv2.IMREAD_UNCHANGED)
+            if not grayscale
+            else cv2.imdecode(buffer, cv2.IMREAD_GRAYSCALE)
+        )
+
+
+class GDALRasterSource(RasterSource):
+    """Reads rasters directly from GDAL datasets such as the ``imagery.vrt`` and
+    ``dem.vrt`` virtual rasters that back the MapServer layers
+
+    Each layer is read from the ``{layer}.vrt`` dataset in the data directory. The
+    dataset is warped on the fly to the requested bounding box and size, reading
+    from the coarsest overview that still has at least the requested resolution.
+
+    DEM values are assumed to be meters and are clipped to the 8-bit range to match
+    the 8-bit DEM convention used by :class:`.GISNode`.
+    """
+
+    def __init__(self, data_dir: str) -> None:
+        """Class initializer
+
+        :param data_dir: Directory containing the ``{layer}.vrt`` datasets
+        :raise ModuleNotFoundError: If ``rasterio`` is not installed
+        """
+        if rasterio is None:
+            raise ModuleNotFoundError(
+                "rasterio is required for the GDAL raster source."
+            )
+        self._data_dir = data_dir
+
+    def _dataset_path(self, layer: str) -> str:
+        """Returns the dataset path for the layer"""
+        return os.path.join(self._data_dir, f"{layer}.vrt")
+
+    @staticmethod
+    def _overview_level(
+        path: str, srs: str, bbox: BBox, size: Tuple[int, int]
+    ) -> Optional[int]:
+        """Returns the index of the coarsest overview whose resolution is still at
+        least the requested resolution, or None if full resolution should be read
+        """
+        with rasterio.open(path) as src:
+            factors = src.overviews(1)
+            if not factors:
+                return None
+            left, bottom, right, top = transform_bounds(srs, src.crs, *bbox)
+            requested_res = min((right - left) / size[0], (top - bottom) / size[1])
+            native_res = min(abs(src.res[0]), abs(src.res[1]))
+
+        level = None
+        for i, factor in enumerate(factors):
+            if native_res * factor <= requested_res:
+                level = i
+        return level
+
+    def get_map(
+        self,
+        layers: List[str],
+        styles: List[str],
+        srs: str,
+        bbox: BBox,
+        size: Tuple[int, int],
+        format_: str,
+        transparency: bool,
+        grayscale: bool = False,
+    ) -> Optional[np.ndarray]:
+        """Returns the raster for the bounding box by reading it from the dataset
+
+        Only the first layer is read. Styles, format and transparency are ignored.
+        See :meth:`.RasterSource.get_map` for the arguments.
+
+        :raise rasterio.errors.RasterioError: If the dataset cannot be read
+        """
+        path = self._dataset_path(layers[0])
+        width, height = size
+
+        overview_level = self._overview_level(path, srs, bbox, size)
+        open_kwargs = (
+            {} if overview_level is None else {"overview_level": overview_level}
+        )
+        with rasterio.open(path, **open_kwargs) as src:
+            with WarpedVRT(
+                src,
+                crs=srs,
+                transform=from_bounds(*bbox, width, height),
+                width=width,
+                height=height,
+                resampling=Resampling.bilinear,
+            ) as vrt:
+                raster = vrt.read()  # (bands, height, width)
+
+        if raster.dtype != np.uint8:
+            raster = np.clip(raster, 0, 255).astype(np.uint8)
+
+        if raster.shape[0] == 1:
+            return (
+                raster[0] if grayscale else cv2.cvtColor(raster[0], cv2.COLOR_GRAY2BGR)
+            )
+
+        raster = np.ascontiguousarray(np.moveaxis(raster[:3], 0, -1))
+        if grayscale:
+            return cv2.cvtColor(raster, cv2.COLOR_RGB2GRAY)
+        return cv2.cvtColor(raster, cv2.COLOR_RGB2BGR)
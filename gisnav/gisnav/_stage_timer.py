@@ -0,0 +1,111 @@
+"""Lightweight per-stage latency instrumentation
+
+:class:`.StageTimer` times named processing stages with the monotonic
+performance counter and keeps the latest latencies of each stage in a rolling
+window, from which the nodes publish the 50th, 95th and 99th percentile latencies
+in their diagnostics. This shows where the latency of the pose estimate comes
+from, e.g. orthoimage warping in :class:`.StereoNode` or feature extraction,
+matching or PnP in :class:`.PoseNode`.
+
+When disabled, :meth:`.StageTimer.time` returns a shared no-op context manager,
+so an instrumented stage costs only the method call.
+"""
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import ContextManager, Deque, Dict, Final, Tuple
+
+import numpy as np
+
+_NULL_CONTEXT: Final = nullcontext()
+"""Shared no-op context manager returned when timing is disabled"""
+
+
+class _Timer:
+    """Context manager that records the time spent inside it"""
+
+    __slots__ = ("_stage_timer", "_stage", "_start")
+
+    def __init__(self, stage_timer: "StageTimer", stage: Tuple[str, ...]) -> None:
+        self._stage_timer = stage_timer
+        self._stage = stage
+        self._start = 0.0
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter()
+
+    def __exit__(self, *_) -> None:
+        self._stage_timer.record(self._stage, time.perf_counter() - self._start)
+
+
+class StageTimer:
+    """Times named stages and aggregates the latencies of each stage over a
+    rolling window
+
+    Stages are named by one or more strings, e.g. the kind of input and the
+    stage, so that callers do not need to format names on the hot path. The
+    timer is thread-safe.
+    """
+
+    WINDOW_LENGTH: Final = 1000
+    """Number of latest latencies of each stage that the percentiles are computed
+    from"""
+
+    def __init__(self, enabled: bool) -> None:
+        """Class initializer
+
+        :param enabled: True to record latencies, False to make timing a no-op
+        """
+        self.enabled = enabled
+        self._latencies: Dict[Tuple[str, ...], Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def time(self, *stage: str) -> ContextManager[None]:
+        """Returns a context manager that records the time spent inside it as a
+        latency of the stage
+
+        :param stage: Stage name parts
+        :return: Timing context manager, or a no-op context manager if disabled
+        """
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return _Timer(self, stage)
+
+    def record(self, stage: Tuple[str, ...], latency: float) -> None:
+        """Records a latency of the stage
+
+        :param stage: Stage name parts
+        :param latency: Latency in seconds
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            latencies = self._latencies.get(stage)
+            if latencies is None:
+                latencies = deque(maxlen=self.WINDOW_LENGTH)
+                self._latencies[stage] = latencies
+            latencies.append(latency)
+
+    def statistics(self) -> Dict[str, Dict[str, float]]:
+        """Returns the number of latencies in the window and the 50th, 95th and
+        99th percentile and maximum latency in seconds of each stage
+
+        The stage name parts are joined with spaces.
+        """
+        with self._lock:
+            windows = {
+                " ".join(stage): np.array(latencies)
+                for stage, latencies in self._latencies.items()
+            }
+        statistics = {}
+        for stage, latencies in windows.items():
+            p50, p95, p99 = np.percentile(latencies, (50, 95, 99))
+            statistics[stage] = {
+                "samples": len(latencies),
+                "p50": float(p50),
+                "p95": float(p95),
+                "p99": float(p99),
+                "max": float(latencies.max()),
+            }
+        return statistics
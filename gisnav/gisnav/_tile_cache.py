@@ -0,0 +1,213 @@
+"""Persistent on-disk cache for decoded GIS rasters
+
+Rasters are stored as uncompressed NumPy ``.npy`` files so that cache hits can be
+memory-mapped without any HTTP round trip or image decoding. An SQLite index keeps
+track of the cached rasters and their last access times for least recently used
+(LRU) eviction under a byte budget.
+
+Cache keys are built from the GetMap request arguments. The bounding box should be
+quantized with :func:`.quantize_bbox` before it is requested so that requests for
+approximately the same area map to the same key.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ._transformations import BBox
+
+
+def quantize_bbox(bbox: BBox, step: float) -> BBox:
+    """Snaps the bounding box outwards to a regular grid
+
+    :param bbox: Bounding box to quantize
+    :param step: Grid step in bounding box units (e.g. degrees for WGS 84)
+    :return: Smallest bounding box on the grid that contains the input bounding box
+    """
+    assert step > 0, f"Quantization step must be positive ({step} provided)."
+    return BBox(
+        float(np.floor(bbox.left / step) * step),
+        float(np.floor(bbox.bottom / step) * step),
+        float(np.ceil(bbox.right / step) * step),
+        float(np.ceil(bbox.top / step) * step),
+    )
+
+
+class TileCache:
+    """Persistent LRU cache of decoded GIS rasters with a byte budget
+
+    The cache is safe to use from multiple threads.
+    """
+
+    _INDEX_FILENAME = "index.sqlite"
+    """Name of the SQLite index file inside the cache directory"""
+
+    def __init__(self, path: str, max_bytes: int) -> None:
+        """Class initializer
+
+        :param path: Cache directory, created if it does not exist
+        :param max_bytes: Maximum total size of the cached rasters in bytes
+        :raise OSError: If the cache directory cannot be created
+        :raise sqlite3.Error: If the cache index cannot be opened
+        """
+        self._path = os.path.expanduser(path)
+        self._max_bytes = max_bytes
+        os.makedirs(self._path, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            os.path.join(self._path, self._INDEX_FILENAME),
+            check_same_thread=False,
+            isolation_level=None,  # autocommit
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS rasters ("
+            "key TEXT PRIMARY KEY, filename TEXT NOT NULL, "
+            "nbytes INTEGER NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS rasters_accessed ON rasters (accessed)"
+        )
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(
+        layers: List[str],
+        styles: List[str],
+        srs: str,
+        bbox: BBox,
+        size: Tuple[int, int],
+        format_: str,
+        grayscale: bool,
+    ) -> str:
+        """Returns the cache key for a GetMap request
+
+        :param layers: Requested layers
+        :param styles: Requested styles
+        :param srs: Requested spatial reference system
+        :param bbox: Requested (quantized) bounding box
+        :param size: Requested raster size
+        :param format_: Requested image format
+        :param grayscale: True if the raster is decoded as grayscale
+        :return: Cache key
+        """
+        bbox_str = ",".join(f"{coordinate:.9f}" for coordinate in bbox)
+        return (
+            f"{','.join(layers)}|{','.join(styles)}|{srs}|{bbox_str}|"
+            f"{size[0]}x{size[1]}|{format_}|{'gray' if grayscale else 'color'}"
+        )
+
+    @property
+    def size_bytes(self) -> int:
+        """Total size of the cached rasters in bytes"""
+        with self._lock:
+            return self._size_bytes()
+
+    def _size_bytes(self) -> int:
+        (size,) = self._db.execute(
+            "SELECT COALESCE(SUM(nbytes), 0) FROM rasters"
+        ).fetchone()
+        return size
+
+    def statistics(self) -> Dict[str, int]:
+        """Returns cache hit, miss and eviction counters and current cache size"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size_bytes": self.size_bytes,
+            "max_bytes": self._max_bytes,
+        }
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Returns the cached raster as a read-only memory-mapped array
+
+        :param key: Cache key from :meth:`.key`
+        :return: Cached raster, or None if not in cache
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT filename FROM rasters WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                try:
+                    raster = np.load(os.path.join(self._path, row[0]), mmap_mode="r")
+                except (OSError, ValueError):
+                    # File missing or corrupted - drop it from the index
+                    self._db.execute("DELETE FROM rasters WHERE key = ?", (key,))
+                    raster = None
+
+                if raster is not None:
+                    self._db.execute(
+                        "UPDATE rasters SET accessed = ? WHERE key = ?",
+                        (time.time(), key),
+                    )
+                    self.hits += 1
+                    return raster
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, raster: np.ndarray) -> None:
+        """Stores the raster in the cache and evicts least recently used rasters
+        until the cache fits in its byte budget
+
+        :param key: Cache key from :meth:`.key`
+        :param raster: Raster to store
+        """
+        if raster.nbytes > self._max_bytes:
+            return
+
+        filename = f"{hashlib.sha256(key.encode()).hexdigest()}.npy"
+        filepath = os.path.join(self._path, filename)
+
+        # Write to a temporary file first so that readers never see partial files.
+        # Replacing the file does not affect existing memory maps of the old file.
+        tmp_filepath = f"{filepath}.{threading.get_ident()}.tmp"
+        with open(tmp_filepath, "wb") as f:
+            np.save(f, np.ascontiguousarray(raster))
+        os.replace(tmp_filepath, filepath)
+
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO rasters VALUES (?, ?, ?, ?)",
+                (key, filename, raster.nbytes, time.time()),
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        """Evicts least recently used rasters until the cache fits in its byte
+        budget
+        """
+        size = self._size_bytes()
+        while size > self._max_bytes:
+            row = self._db.execute(
+                "SELECT key, filename, nbytes FROM rasters "
+                "ORDER BY accessed ASC LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            key, filename, nbytes = row
+            self._db.execute("DELETE FROM rasters WHERE key = ?", (key,))
+            self._remove_file(filename)
+            self.evictions += 1
+            size -= nbytes
+
+    def _remove_file(self, filename: str) -> None:
+        """Removes a cached raster file, ignoring files that are already gone"""
+        try:
+            os.remove(os.path.join(self._path, filename))
+        except FileNotFoundError:
+            pass
+
+    def close(self) -> None:
+        """Closes the cache index"""
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,130 @@
+"""End-to-end latency tracing of camera frames across nodes
+
+A camera frame passes through :class:`.StereoNode`, :class:`.PoseNode`, the
+``robot_localization`` EKF and finally :class:`.NMEANode` or :class:`.UORBNode`
+before the autopilot receives the estimate derived from it. Each GISNav node on
+the way records with a :class:`.Tracer` the time a frame is received (ingress) and
+the time the output derived from it is sent (egress), and publishes both in a
+:class:`gisnav_msgs.msg.TraceEvent` on :data:`.ROS_TOPIC_TRACE`.
+:class:`.TraceNode` collects the trace events and computes the per-hop and total
+latency distributions.
+
+The trace of a frame is identified by its origin stamp, the timestamp of the
+camera image, which also the standard messages downstream of the GISNav stereo
+image messages carry in their headers. :class:`.StereoNode` additionally assigns
+a trace ID to each camera frame that is carried in the GISNav stereo image
+messages.
+
+> [!NOTE] Clocks
+> The origin stamp and the ingress and egress times must come from the same
+> clock, i.e. the camera driver and the nodes must run on the same computer or
+> on computers with synchronized clocks.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Final, Tuple
+
+from builtin_interfaces.msg import Time
+from rclpy.node import Node
+
+from gisnav_msgs.msg import TraceEvent  # type: ignore[attr-defined]
+
+
+def nanoseconds(stamp: Time) -> int:
+    """Returns the ROS timestamp in nanoseconds"""
+    return stamp.sec * 1_000_000_000 + stamp.nanosec
+
+
+class Tracer:
+    """Records the ingress times of camera frames and publishes a
+    :class:`gisnav_msgs.msg.TraceEvent` when an output derived from a frame is
+    sent
+
+    Frames are identified by their origin stamp and the topic they were received
+    on. Frames without a timestamp cannot be traced. The tracer is thread-safe,
+    the ingress and egress may be recorded from different threads.
+    """
+
+    MAX_PENDING: Final = 64
+    """Maximum number of frames whose ingress times are remembered, frames that
+    are dropped before egress are eventually forgotten"""
+
+    def __init__(
+        self, node: Node, publish: Callable[[TraceEvent], Any], enabled: bool
+    ) -> None:
+        """Class initializer
+
+        :param node: Traced node, provides the clock and the node name
+        :param publish: Callable that publishes the trace event
+        :param enabled: True to trace frames, False to make tracing a no-op
+        """
+        self.enabled = enabled
+        self._node = node
+        self._publish = publish
+        self._pending: "OrderedDict[Tuple[str, int], Tuple[Time, int]]" = OrderedDict()
+        self._topics: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def ingress(self, topic: str, origin_stamp: Time, trace_id: int = 0) -> None:
+        """Records the time a frame is received
+
+        :param topic: Topic the frame was received on
+        :param origin_stamp: Timestamp of the originating camera image
+        :param trace_id: Trace ID of the frame, 0 if unknown
+        """
+        if not self.enabled:
+            return
+        now = self._node.get_clock().now().to_msg()
+        origin = nanoseconds(origin_stamp)
+        if origin == 0:
+            return
+        key = (self._resolve(topic), origin)
+        with self._lock:
+            self._pending[key] = (now, trace_id)
+            self._pending.move_to_end(key)
+            while len(self._pending) > self.MAX_PENDING:
+                self._pending.popitem(last=False)
+
+    def egress(self, input_topic: str, output_topic: str, origin_stamp: Time) -> None:
+        """Publishes the trace event of an output derived from a received frame
+
+        The same frame may be egressed more than once, e.g. to different topics.
+        Nothing is published if the ingress of the frame was not recorded.
+
+        :param input_topic: Topic the frame was received on
+        :param output_topic: Topic or device the output was sent to
+        :param origin_stamp: Timestamp of the originating camera image
+        """
+        if not self.enabled:
+            return
+        now = self._node.get_clock().now().to_msg()
+        input_topic = self._resolve(input_topic)
+        with self._lock:
+            pending = self._pending.get((input_topic, nanoseconds(origin_stamp)))
+        if pending is None:
+            return
+
+        ingress_stamp, trace_id = pending
+        self._publish(
+            TraceEvent(
+                origin_stamp=origin_stamp,
+                trace_id=trace_id,
+                node=self._node.get_fully_qualified_name(),
+                input_topic=input_topic,
+                output_topic=self._resolve(output_topic),
+                ingress_stamp=ingress_stamp,
+                egress_stamp=now,
+            )
+        )
+
+    def _resolve(self, topic: str) -> str:
+        """Returns the fully qualified name of a private (``~``) topic"""
+        resolved = self._topics.get(topic)
+        if resolved is None:
+            resolved = (
+                topic.replace("~", self._node.get_fully_qualified_name(), 1)
+                if topic.startswith("~")
+                else topic
+            )
+            self._topics[topic] = resolved
+        return resolved
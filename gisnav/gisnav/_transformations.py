@@ -1,6 +1,6 @@
 """Helper functions for ROS messaging"""
 from collections import namedtuple
-from typing import Optional, Tuple, Union, cast
+from typing import Any, Dict, Optional, Tuple, Union, cast
 
 import cv2
 import numpy as np
@@ -8,7 +8,8 @@ import rclpy.time
 import tf2_ros
 import tf_transformations
 from builtin_interfaces.msg import Time
-from geographic_msgs.msg import BoundingBox
+from diagnostic_msgs.msg import DiagnosticStatus, KeyValue
+from geographic_msgs.msg import BoundingBox, GeoPoint
 from geometry_msgs.msg import (
     PoseStamped,
     PoseWithCovarianceStamped,
@@ -60,6 +61,32 @@ def create_header(
     return header
 
 
+def create_diagnostic_status(
+    name: str,
+    hardware_id: str,
+    values: Dict[str, Any],
+    level: bytes = DiagnosticStatus.OK,
+    message: str = "",
+) -> DiagnosticStatus:
+    """Creates a :class:`diagnostic_msgs.msg.DiagnosticStatus` for an outgoing
+    :class:`diagnostic_msgs.msg.DiagnosticArray` message
+
+    :param name: Name of the diagnosed component
+    :param hardware_id: Hardware (or node) identifier of the diagnosed component
+    :param values: Diagnostic key value pairs, values are converted to strings
+    :param level: Diagnostic level
+    :param message: Diagnostic status message
+    :return: ROS diagnostic status message
+    """
+    return DiagnosticStatus(
+        level=level,
+        name=name,
+        message=message,
+        hardware_id=hardware_id,
+        values=[KeyValue(key=key, value=str(value)) for key, value in values.items()],
+    )
+
+
 def usec_from_header(header: Header) -> int:
     """Returns timestamp in microseconds from :class:`.std_msgs.msg.Header`
     stamp
@@ -105,6 +132,14 @@ def bounding_box_to_bbox(msg: BoundingBox) -> BBox:
     )
 
 
+def bbox_to_bounding_box(bbox: BBox) -> BoundingBox:
+    """Converts :class:`.BBox` to :class:`geographic_msgs.msg.BoundingBox`"""
+    return BoundingBox(
+        min_pt=GeoPoint(latitude=bbox.bottom, longitude=bbox.left),
+        max_pt=GeoPoint(latitude=bbox.top, longitude=bbox.right),
+    )
+
+
 def create_transform_msg(
     stamp,
     parent_frame: FrameID,  # TODO: remove this arg - it should be in the stamp
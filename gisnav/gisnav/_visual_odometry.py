@@ -0,0 +1,237 @@
+"""Shallow keypoint matching engines for visual odometry (VO)
+
+Subsequent camera frames differ only slightly in viewpoint and illumination, so
+the relative pose between them can be estimated from traditional hand-crafted
+features that are an order of magnitude cheaper to compute than the deep learned
+features that :class:`.PoseNode` uses for matching against orthoimagery. Keypoints
+can even be tracked from frame to frame with optical flow instead of being
+detected and matched again for every frame.
+"""
+from abc import ABC, abstractmethod
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+_Matches = Tuple[np.ndarray, np.ndarray]
+"""Tuple of matched query image keypoints and matched reference image keypoints
+as (N, 2) arrays of pixel coordinates"""
+
+_Features = Tuple[np.ndarray, np.ndarray]
+"""Tuple of keypoints as an (N, 2) array of pixel coordinates and their
+descriptors as an (N, D) array"""
+
+
+def _no_matches() -> _Matches:
+    """Returns empty keypoint match arrays"""
+    return np.empty((0, 2), np.float32), np.empty((0, 2), np.float32)
+
+
+class ShallowMatcher(ABC):
+    """Abstract base class for shallow keypoint matching engines"""
+
+    def detect(self, img: np.ndarray) -> Optional[_Features]:
+        """Returns the features of an image
+
+        Every frame is first matched as the query image and then as the reference
+        image of the next frame, so the features can be extracted once and passed
+        to :meth:`.match` for both.
+
+        :param img: Grayscale image
+        :return: Tuple of keypoints and descriptors, or None if the engine does not
+            extract per-image features
+        """
+        return None
+
+    @abstractmethod
+    def match(
+        self,
+        qry: np.ndarray,
+        ref: np.ndarray,
+        qry_features: Optional[_Features] = None,
+        ref_features: Optional[_Features] = None,
+    ) -> _Matches:
+        """Returns keypoint matches between the query and reference images
+
+        :param qry: Grayscale query image (newer frame)
+        :param ref: Grayscale reference image (older frame)
+        :param qry_features: Optional query image features from :meth:`.detect`,
+            extracted from the query image if not provided
+        :param ref_features: Optional reference image features from
+            :meth:`.detect`, extracted from the reference image if not provided
+        :return: Tuple of matched query image keypoints, and matched reference
+            image keypoints, in order of decreasing match confidence if the
+            engine has a confidence measure
+        """
+
+
+class ORBMatcher(ShallowMatcher):
+    """Matches ORB features with a brute force Hamming distance matcher and
+    Lowe's ratio test
+
+    The two nearest neighbors of all query descriptors are computed in a single
+    :func:`cv2.batchDistance` call and the ratio test is applied to the resulting
+    distance array, so no Python objects are created per keypoint or match.
+    """
+
+    def __init__(self, ratio: float, max_keypoints: int = 500) -> None:
+        """Class initializer
+
+        :param ratio: Maximum ratio of the nearest to the second nearest neighbor
+            descriptor distance for a match to be accepted
+        :param max_keypoints: Maximum number of ORB keypoints per image
+        """
+        self._ratio = ratio
+        self._orb = cv2.ORB_create(nfeatures=max_keypoints)
+
+    def detect(self, img: np.ndarray) -> _Features:
+        """Returns the ORB keypoints and descriptors of an image
+
+        See :meth:`.ShallowMatcher.detect` for the arguments.
+        """
+        keypoints, descriptors = self._orb.detectAndCompute(img, None)
+        if descriptors is None:
+            return np.empty((0, 2), np.float32), np.empty((0, 32), np.uint8)
+        return cv2.KeyPoint_convert(keypoints), descriptors
+
+    def match(
+        self,
+        qry: np.ndarray,
+        ref: np.ndarray,
+        qry_features: Optional[_Features] = None,
+        ref_features: Optional[_Features] = None,
+    ) -> _Matches:
+        """Returns keypoint matches between the query and reference images
+
+        See :meth:`.ShallowMatcher.match` for the arguments.
+        """
+        kp_qry, desc_qry = self.detect(qry) if qry_features is None else qry_features
+        kp_ref, desc_ref = self.detect(ref) if ref_features is None else ref_features
+        if len(desc_qry) == 0 or len(desc_ref) < 2:
+            return _no_matches()
+
+        distances, indices = cv2.batchDistance(
+            desc_qry, desc_ref, -1, normType=cv2.NORM_HAMMING, K=2
+        )
+        ratios = distances[:, 0] / np.maximum(distances[:, 1], 1)
+        good = distances[:, 0] < self._ratio * distances[:, 1]
+        # Most distinctive matches first, see :func:`.bucket_select`
+        good = np.flatnonzero(good)[np.argsort(ratios[good], kind="stable")]
+
+        return kp_qry[good], kp_ref[indices[good, 0]]
+
+
+class KLTTracker(ShallowMatcher):
+    """Tracks a persistent set of keypoints from frame to frame with pyramidal
+    Lucas-Kanade optical flow
+
+    Keypoints are detected only when the number of tracked keypoints drops below
+    a threshold, and tracks that do not pass a forward-backward consistency check
+    are dropped.
+
+    Tracks continue from the previous call only if the reference image is the
+    query image of the previous call, i.e. the frames are consecutive. Otherwise
+    keypoints are detected again on the reference image.
+
+    > [!NOTE]
+    > Not thread safe, the tracker must only be used from one thread.
+    """
+
+    def __init__(
+        self,
+        min_tracks: int = 100,
+        max_tracks: int = 500,
+        max_forward_backward_error: float = 1.0,
+        window_size: int = 21,
+        max_level: int = 3,
+        min_distance: int = 7,
+    ) -> None:
+        """Class initializer
+
+        :param min_tracks: Number of tracked keypoints below which new keypoints
+            are detected
+        :param max_tracks: Maximum number of tracked keypoints
+        :param max_forward_backward_error: Maximum distance in pixels between a
+            keypoint and its position when tracked forward and then backward
+        :param window_size: Lucas-Kanade search window size in pixels at each
+            pyramid level
+        :param max_level: Maximum pyramid level
+        :param min_distance: Minimum distance in pixels between keypoints
+        """
+        self._min_tracks = min_tracks
+        self._max_tracks = max_tracks
+        self._max_forward_backward_error = max_forward_backward_error
+        self._window_size = (window_size, window_size)
+        self._max_level = max_level
+        self._min_distance = min_distance
+
+        self._previous: Optional[np.ndarray] = None
+        self._tracks: np.ndarray = np.empty((0, 1, 2), np.float32)
+
+    def _detect(self, img: np.ndarray, tracks: np.ndarray) -> np.ndarray:
+        """Returns the tracks topped up with new keypoints detected away from the
+        existing tracks
+        """
+        mask = np.full(img.shape[:2], 255, np.uint8)
+        for x, y in tracks.reshape(-1, 2):
+            cv2.circle(mask, (int(x), int(y)), self._min_distance, 0, -1)
+
+        corners = cv2.goodFeaturesToTrack(
+            img,
+            maxCorners=self._max_tracks - len(tracks),
+            qualityLevel=0.01,
+            minDistance=self._min_distance,
+            mask=mask,
+        )
+        if corners is None:
+            return tracks
+        return np.concatenate((tracks, corners.astype(np.float32)))
+
+    def match(
+        self,
+        qry: np.ndarray,
+        ref: np.ndarray,
+        qry_features: Optional[_Features] = None,
+        ref_features: Optional[_Features] = None,
+    ) -> _Matches:
+        """Returns keypoint matches between the query and reference images
+
+        See :meth:`.ShallowMatcher.match` for the arguments. The tracker does not
+        use per-image features, so the features arguments are ignored.
+        """
+        if self._previous is not None and (
+            self._previous is ref
+            or (
+                self._previous.shape == ref.shape
+                and np.array_equal(self._previous, ref)
+            )
+        ):
+            # Consecutive frames - continue tracking
+            tracks = self._tracks
+        else:
+            tracks = np.empty((0, 1, 2), np.float32)
+
+        if len(tracks) < self._min_tracks:
+            tracks = self._detect(ref, tracks)
+
+        self._previous = qry
+        if len(tracks) == 0:
+            self._tracks = tracks
+            return _no_matches()
+
+        lk_params = dict(winSize=self._window_size, maxLevel=self._max_level)
+        forward, status, _ = cv2.calcOpticalFlowPyrLK(
+            ref, qry, tracks, None, **lk_params
+        )
+        backward, backward_status, _ = cv2.calcOpticalFlowPyrLK(
+            qry, ref, forward, None, **lk_params
+        )
+        error = np.linalg.norm(tracks - backward, axis=2).ravel()
+        good = (
+            status.ravel().astype(bool)
+            & backward_status.ravel().astype(bool)
+            & (error < self._max_forward_backward_error)
+        )
+
+        self._tracks = forward[good]
+        return forward[good].reshape(-1, 2), tracks[good].reshape(-1, 2)
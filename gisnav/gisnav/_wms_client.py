@@ -0,0 +1,255 @@
+"""WMS client with a pooled keep-alive HTTP session and a GetCapabilities cache
+
+``OWSLib`` opens a new HTTP connection for every request and sends a blocking
+GetCapabilities request whenever a :class:`owslib.wms.WebMapService` is created.
+:class:`.WMSClient` instead sends all requests through a persistent
+:class:`requests.Session` with a bounded connection pool, and caches the
+GetCapabilities response on disk so that it can be reused immediately on restart.
+``OWSLib`` is only used for parsing the capabilities document.
+
+GetMap requests that fail with a transient error, i.e. a connection error or a
+5xx server error, are retried a bounded number of times with jittered exponential
+backoff (see :class:`.ExponentialBackoff`).
+"""
+import hashlib
+import os
+import random
+import time
+from typing import List, Optional, Tuple
+
+import requests
+from owslib.util import ServiceException
+from owslib.wms import WebMapService
+from requests.adapters import HTTPAdapter
+
+from ._transformations import BBox
+
+_SERVICE_EXCEPTION_CONTENT_TYPES = ("application/vnd.ogc.se_xml", "text/xml")
+"""Response content types of WMS service exception reports"""
+
+
+class WMSClient:
+    """WMS client that keeps its HTTP connections alive between requests
+
+    The client is safe to use from multiple threads once connected. Requests block
+    if all pooled connections are in use.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        version: str,
+        timeout: float,
+        pool_size: int = 4,
+        capabilities_cache_dir: str = "",
+        capabilities_max_age: float = 24 * 3600.0,
+        getmap_retries: int = 2,
+        backoff_initial: float = 0.5,
+        backoff_max: float = 30.0,
+    ) -> None:
+        """Class initializer
+
+        Does not send any requests (see :meth:`.connect`).
+
+        :param url: WMS endpoint URL
+        :param version: WMS protocol version
+        :param timeout: Request timeout in seconds
+        :param pool_size: Maximum number of pooled connections to the WMS endpoint
+        :param capabilities_cache_dir: GetCapabilities cache directory, or an empty
+            string to disable the cache
+        :param capabilities_max_age: Maximum age of a cached GetCapabilities
+            response in seconds
+        :param getmap_retries: Maximum number of retries of a GetMap request that
+            failed with a transient error
+        :param backoff_initial: Maximum delay before the first GetMap retry in
+            seconds
+        :param backoff_max: Upper bound of the GetMap retry delay in seconds
+        """
+        self._url = url
+        self._version = version
+        self._timeout = timeout
+        self._getmap_retries = getmap_retries
+        self._backoff_initial = backoff_initial
+        self._backoff_max = backoff_max
+        self._capabilities_max_age = capabilities_max_age
+        self._capabilities_cache_path: Optional[str] = (
+            os.path.join(
+                os.path.expanduser(capabilities_cache_dir),
+                f"{hashlib.sha256(f'{url}|{version}'.encode()).hexdigest()}.xml",
+            )
+            if capabilities_cache_dir
+            else None
+        )
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, pool_block=True
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+        self._wms: Optional[WebMapService] = None
+        self._getmap_url: Optional[str] = None
+
+    @property
+    def connected(self) -> bool:
+        """True if the capabilities of the WMS endpoint are known"""
+        return self._wms is not None
+
+    def connect(self) -> bool:
+        """Loads the capabilities of the WMS endpoint
+
+        The capabilities are read from the cache if a fresh enough cached response
+        is available, and requested from the endpoint otherwise.
+
+        :return: True if the capabilities were read from the cache
+        :raise requests.exceptions.RequestException: If the GetCapabilities
+            request fails
+        """
+        xml = self._read_cached_capabilities()
+        cached = xml is not None
+        if xml is None:
+            response = self._session.get(
+                self._url,
+                params={
+                    "service": "WMS",
+                    "request": "GetCapabilities",
+                    "version": self._version,
+                },
+                timeout=self._timeout,
+            )
+            response.raise_for_status()
+            xml = response.content
+
+        wms = WebMapService(
+            self._url, version=self._version, xml=xml, timeout=self._timeout
+        )
+        self._getmap_url = next(
+            method["url"]
+            for method in wms.getOperationByName("GetMap").methods
+            if method["type"].lower() == "get"
+        )
+        self._wms = wms
+
+        if not cached:
+            self._write_cached_capabilities(xml)
+
+        return cached
+
+    def _read_cached_capabilities(self) -> Optional[bytes]:
+        """Returns the cached GetCapabilities response, or None if not available
+        or too old
+        """
+        if self._capabilities_cache_path is None:
+            return None
+        try:
+            age = time.time() - os.path.getmtime(self._capabilities_cache_path)
+            if age > self._capabilities_max_age:
+                return None
+            with open(self._capabilities_cache_path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_cached_capabilities(self, xml: bytes) -> None:
+        """Writes the GetCapabilities response to the cache, ignoring errors"""
+        if self._capabilities_cache_path is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(self._capabilities_cache_path), exist_ok=True)
+            tmp_path = f"{self._capabilities_cache_path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(xml)
+            os.replace(tmp_path, self._capabilities_cache_path)
+        except OSError:
+            pass
+
+    def getmap(
+        self,
+        layers: List[str],
+        styles: List[str],
+        srs: str,
+        bbox: BBox,
+        size: Tuple[int, int],
+        format: str,
+        transparent: bool = False,
+    ) -> bytes:
+        """Sends a GetMap request and returns the encoded image
+
+        The request parameters match those of :meth:`owslib.wms.WebMapService.getmap`.
+
+        :return: Encoded image bytes
+        :raise ServiceException: If the WMS endpoint returns a service exception
+        :raise requests.exceptions.RequestException: If the request fails, after
+            the retries if the error is transient
+        """
+        assert self._getmap_url is not None, "WMS client is not connected."
+        params = {
+            "service": "WMS",
+            "version": self._version,
+            "request": "GetMap",
+            "layers": ",".join(layers),
+            "styles": ",".join(styles) if styles else "",
+            "crs" if self._version == "1.3.0" else "srs": srs,
+            "bbox": ",".join(repr(float(coordinate)) for coordinate in bbox),
+            "width": str(size[0]),
+            "height": str(size[1]),
+            "format": format,
+            "transparent": str(transparent).upper(),
+        }
+        backoff = ExponentialBackoff(self._backoff_initial, self._backoff_max)
+        retries = self._getmap_retries
+        while True:
+            try:
+                response = self._session.get(
+                    self._getmap_url, params=params, timeout=self._timeout
+                )
+                response.raise_for_status()
+                break
+            except requests.exceptions.RequestException as e:
+                if retries == 0 or not self._is_transient(e):
+                    raise
+            retries -= 1
+            time.sleep(backoff.next_delay())
+
+        content_type = response.headers.get("Content-Type", "").split(";")[0]
+        if content_type in _SERVICE_EXCEPTION_CONTENT_TYPES:
+            raise ServiceException(response.text)
+
+        return response.content
+
+    @staticmethod
+    def _is_transient(error: requests.exceptions.RequestException) -> bool:
+        """Returns True if the request may succeed when retried"""
+        if isinstance(error, requests.exceptions.HTTPError):
+            return error.response is not None and error.response.status_code >= 500
+        return isinstance(error, requests.exceptions.ConnectionError)
+
+    def close(self) -> None:
+        """Closes the pooled connections"""
+        self._session.close()
+
+
+class ExponentialBackoff:
+    """Jittered exponential backoff delays for retrying failed operations
+
+    Uses "full jitter", i.e. each delay is drawn uniformly between zero and the
+    exponentially growing cap, which spreads out retries from multiple clients.
+    """
+
+    def __init__(self, initial: float, maximum: float) -> None:
+        """Class initializer
+
+        :param initial: Cap of the first delay in seconds
+        :param maximum: Maximum cap of the delay in seconds
+        """
+        self._initial = initial
+        self._maximum = maximum
+        self._attempts = 0
+
+    def next_delay(self) -> float:
+        """Returns the next delay in seconds"""
+        cap = min(self._maximum, self._initial * 2**self._attempts)
+        if cap < self._maximum:
+            self._attempts += 1
+        return random.uniform(0, cap)
@@ -0,0 +1,123 @@
+"""Latest-wins work queue for processing sensor data off the ROS executor thread
+
+Inference can be slower than the rate at which the camera publishes new frames. If
+frames are processed inside the subscription callbacks, unprocessed messages pile
+up in the middleware and executor buffers and the output lags further and further
+behind real time. :class:`.LatestWorkQueue` instead holds at most one pending item
+per kind of work, and a newer item replaces a pending older one. Output latency is
+then bounded by the processing time of a single item.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class LatestWorkQueue:
+    """Bounded work queue that keeps only the latest item of each kind and
+    processes the items in a dedicated worker thread
+
+    Items of different kinds are processed in the order in which they were
+    submitted. Replaced items are dropped and counted.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Hashable, Any], None],
+        on_error: Optional[Callable[[Hashable, Exception], None]] = None,
+        name: str = "latest_work_queue",
+    ) -> None:
+        """Class initializer
+
+        :param handler: Callable that processes an item, called with the kind and
+            the item from the worker thread
+        :param on_error: Optional callable that is called with the kind and the
+            exception if the handler raises, the worker thread keeps running
+        :param name: Worker thread name
+        """
+        self._handler = handler
+        self._on_error = on_error
+        self._pending: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+        self.submitted: Dict[Hashable, int] = {}
+        """Number of submitted items by kind"""
+
+        self.processed: Dict[Hashable, int] = {}
+        """Number of processed items by kind"""
+
+        self.dropped: Dict[Hashable, int] = {}
+        """Number of items by kind that were replaced by a newer item before they
+        were processed"""
+
+    def start(self) -> None:
+        """Starts the worker thread"""
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 1.0) -> None:
+        """Stops the worker thread, pending items are discarded
+
+        :param timeout: Maximum time in seconds to wait for the item currently
+            being processed to finish
+        """
+        with self._condition:
+            self._stopped = True
+            self._pending.clear()
+            self._condition.notify_all()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def put(self, kind: Hashable, item: Any) -> bool:
+        """Submits an item, replacing any pending item of the same kind
+
+        Never blocks.
+
+        :param kind: Kind of work, e.g. the topic the item was received from
+        :param item: Item to process
+        :return: True if a pending item was dropped
+        """
+        with self._condition:
+            if self._stopped:
+                return False
+            self.submitted[kind] = self.submitted.get(kind, 0) + 1
+            dropped = kind in self._pending
+            if dropped:
+                self.dropped[kind] = self.dropped.get(kind, 0) + 1
+            # A replaced item keeps its position so that a constant stream of one
+            # kind cannot starve the other kinds
+            self._pending[kind] = item
+            self._condition.notify()
+            return dropped
+
+    def statistics(self) -> Dict[Hashable, Dict[str, int]]:
+        """Returns the submitted, processed and dropped item counters by kind"""
+        with self._condition:
+            return {
+                kind: {
+                    "submitted": submitted,
+                    "processed": self.processed.get(kind, 0),
+                    "dropped": self.dropped.get(kind, 0),
+                }
+                for kind, submitted in self.submitted.items()
+            }
+
+    def _run(self) -> None:
+        """Processes pending items until stopped"""
+        while True:
+            with self._condition:
+                while not self._pending and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                kind, item = self._pending.popitem(last=False)
+
+            try:
+                self._handler(kind, item)
+            except Exception as e:
+                if self._on_error is None:
+                    raise
+                self._on_error(kind, e)
+
+            with self._condition:
+                self.processed[kind] = self.processed.get(kind, 0) + 1
@@ -33,6 +33,9 @@ UORB_NODE_NAME: Final = "uorb_node"
 QGIS_NODE_NAME: Final = "qgis_node"
 """Name of :class:`.QGISNode` spun up by :func:`.run_qgis_node`"""
 
+TRACE_NODE_NAME: Final = "trace_node"
+"""Name of :class:`.TraceNode` spun up by :func:`.run_trace_node`"""
+
 ROS_TOPIC_RELATIVE_ORTHOIMAGE: Final = "~/orthoimage"
 """Relative topic into which :class:`.GISNode` publishes :attr:`.GISNode.orthoimage`."""
 
@@ -56,7 +59,7 @@ ROS_TOPIC_RELATIVE_TWIST_IMAGE: Final = "~/twist_image"
 
 ROS_TOPIC_RELATIVE_POSE: Final = "~/pose"
 """Relative topic into which :class:`.PoseNode` publishes
-:attr:`.PoseNode.pose`.
+:meth:`.PoseNode.pose`.
 
 """
 ROS_TOPIC_RELATIVE_QUERY_TWIST: Final = "~/vo/twist"
@@ -64,6 +67,32 @@ ROS_TOPIC_RELATIVE_QUERY_TWIST: Final = "~/vo/twist"
 :attr:`.PoseNode.camera_optical_twist_in_camera_optical_frame`.
 """
 
+ROS_TOPIC_RELATIVE_POSE_MATCHES_IMAGE: Final = "~/debug/pose_matches"
+"""Relative topic into which :class:`.PoseNode` publishes
+:meth:`.PoseNode.pose_matches_image`.
+"""
+
+ROS_TOPIC_RELATIVE_TWIST_MATCHES_IMAGE: Final = "~/debug/twist_matches"
+"""Relative topic into which :class:`.PoseNode` publishes
+:meth:`.PoseNode.twist_matches_image`.
+"""
+
+ROS_TOPIC_RELATIVE_DIAGNOSTICS: Final = "~/diagnostics"
+"""Relative topic into which GISNav nodes publish their
+:class:`diagnostic_msgs.msg.DiagnosticArray` diagnostics
+"""
+
+ROS_TOPIC_TRACE: Final = f"/{ROS_NAMESPACE}/trace"
+"""Topic into which GISNav nodes publish their
+:class:`gisnav_msgs.msg.TraceEvent` latency trace events
+"""
+
+ROS_SERVICE_RELATIVE_PROFILE: Final = "~/profile"
+"""Relative service name of the :class:`std_srvs.srv.SetBool` service with which
+the sampling profiler of each GISNav node is started and stopped, see
+:class:`.ProfilerService`
+"""
+
 MAVROS_TOPIC_TIME_REFERENCE: Final = "/mavros/time_reference"
 """The MAVROS time reference topic that has the difference between
 the local system time and the foreign FCU time
@@ -4,5 +4,6 @@ from .bbox_node import BBoxNode
 from .gis_node import GISNode
 from .pose_node import PoseNode
 from .stereo_node import StereoNode
+from .trace_node import TraceNode
 
-__all__ = ["BBoxNode", "StereoNode", "PoseNode", "GISNode"]
+__all__ = ["BBoxNode", "StereoNode", "PoseNode", "GISNode", "TraceNode"]
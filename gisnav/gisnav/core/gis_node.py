@@ -1,16 +1,35 @@
 """This module contains :class:`.GISNode`, a ROS node that requests
 orthoimagery from the GIS and publishes it to ROS.
+
+GetMap requests are sent from a background worker pool so that the blocking network
+round trip does not starve the node's subscriptions. Completed requests are passed
+back to the node via a response queue that is drained by the publish timer.
+
+The next orthoimage is prefetched along the projected flight path of the vehicle so
+that it can be swapped in as soon as the overlap threshold is crossed.
+
+Orthoimages are cut out of a rolling in-memory mosaic so that only the newly exposed
+edge strips need to be requested when the vehicle moves.
+
+If a mission corridor has been preloaded (see :mod:`.tools.preload_corridor` or
+:attr:`.GISNode.mission_plan`), rasters are assembled from the local corridor tiles
+and GetMap requests are only sent outside the corridor.
 """
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from copy import deepcopy
-from typing import IO, Final, List, Optional, Tuple
+from typing import Dict, Final, List, NamedTuple, Optional, Tuple
 
 import cv2
 import numpy as np
 import requests
 from cv_bridge import CvBridge
+from diagnostic_msgs.msg import DiagnosticArray
 from geographic_msgs.msg import BoundingBox, GeoPoint
 from owslib.util import ServiceException
-from owslib.wms import WebMapService
 from rcl_interfaces.msg import ParameterDescriptor
 from rclpy.node import Node
 from rclpy.qos import QoSPresetProfiles
@@ -22,18 +41,44 @@ from std_msgs.msg import String
 from gisnav_msgs.msg import OrthoImage  # type: ignore[attr-defined]
 
 from .. import _transformations as tf_
-from .._decorators import ROS, cache_if, narrow_types
+from .._corridor import CorridorTileStore, corridor_polygon, load_plan_waypoints
+from .._decorators import ROS, narrow_types
+from .._mosaic import RasterMosaic
+from .._prefetch import BoundingBoxPredictor, PrefetchStatistics
+from .._raster_source import GDALRasterSource, RasterSource, WMSRasterSource
+from .._tile_cache import TileCache, quantize_bbox
+from .._wms_client import ExponentialBackoff, WMSClient
 from ..constants import (
     BBOX_NODE_NAME,
     MAVROS_TOPIC_TIME_REFERENCE,
     ROS_NAMESPACE,
     ROS_TOPIC_CAMERA_INFO,
+    ROS_TOPIC_RELATIVE_DIAGNOSTICS,
     ROS_TOPIC_RELATIVE_FOV_BOUNDING_BOX,
     ROS_TOPIC_RELATIVE_ORTHOIMAGE,
     FrameID,
 )
 
 
+class _OrthoimageResponse(NamedTuple):
+    """Response from a background orthoimage request"""
+
+    request_id: int
+    """Identifier of the request, used to discard responses to stale requests"""
+
+    bounding_box: BoundingBox
+    """Bounding box the orthoimage was requested for"""
+
+    orthoimage: Optional[OrthoImage]
+    """Retrieved orthoimage, or None if the request failed"""
+
+    timings: Dict[str, float]
+    """Request and decode latency in seconds for each layer and in total"""
+
+    prefetch: bool
+    """True if the orthoimage was prefetched for a predicted bounding box"""
+
+
 class GISNode(Node):
     """Publishes the orthoimage, DEM, and their CRS as a single, atomic ROS message.
 
@@ -68,8 +113,27 @@ class GISNode(Node):
     ROS_D_PUBLISH_RATE = 1.0
     """Default value for :attr:`.publish_rate`"""
 
-    ROS_D_WMS_POLL_RATE = 0.1
-    """Default value for :attr:`.wms_poll_rate`"""
+    ROS_D_WMS_POOL_SIZE = 4
+    """Default value for :attr:`.wms_pool_size`"""
+
+    ROS_D_WMS_CAPABILITIES_CACHE_DIR = "~/.cache/gisnav/wms"
+    """Default value for :attr:`.wms_capabilities_cache_dir`
+
+    > [!TIP]
+    > Set to an empty string to disable the GetCapabilities cache.
+    """
+
+    ROS_D_WMS_CAPABILITIES_MAX_AGE = 24 * 3600.0
+    """Default value for :attr:`.wms_capabilities_max_age`"""
+
+    ROS_D_WMS_GETMAP_RETRIES = 2
+    """Default value for :attr:`.wms_getmap_retries`"""
+
+    ROS_D_WMS_BACKOFF_INITIAL = 0.5
+    """Default value for :attr:`.wms_backoff_initial`"""
+
+    ROS_D_WMS_BACKOFF_MAX = 30.0
+    """Default value for :attr:`.wms_backoff_max`"""
 
     ROS_D_LAYERS = ["imagery"]
     """Default value for :attr:`.wms_layers`
@@ -126,6 +190,86 @@ class GISNode(Node):
     threshold, a new map request is triggered.
     """
 
+    ROS_D_PREFETCH_ENABLED = True
+    """Default value for :attr:`.prefetch_enabled`"""
+
+    ROS_D_PREFETCH_LOOKAHEAD = 3.0
+    """Default value for :attr:`.prefetch_lookahead`"""
+
+    ROS_D_ORTHOIMAGE_GSD = 0.5
+    """Default value for :attr:`.orthoimage_gsd`"""
+
+    ROS_D_DEM_DOWNSAMPLING = 4
+    """Default value for :attr:`.dem_downsampling`"""
+
+    _ORTHOIMAGE_SIZE_STEP = 64
+    """Orthoimage sizes are rounded to multiples of this step so that the size does
+    not change with every small change in the bounding box, which would prevent
+    reusing the rolling mosaic
+    """
+
+    _METERS_IN_DEGREE = 111045.0
+    """Approximate length of one degree of latitude in meters"""
+
+    ROS_D_MOSAIC_ENABLED = True
+    """Default value for :attr:`.mosaic_enabled`"""
+
+    ROS_D_MISSION_PLAN = ""
+    """Default value for :attr:`.mission_plan`
+
+    > [!TIP]
+    > Set to a QGroundControl ``.plan`` file, e.g. the ``ksql_airport_px4.plan``
+    > mission in the ``gisnav-qgc`` Docker image, to preload the mission corridor
+    > on startup.
+    """
+
+    ROS_D_CORRIDOR_DIR = "~/.cache/gisnav/corridor"
+    """Default value for :attr:`.corridor_dir`"""
+
+    ROS_D_CORRIDOR_BUFFER = 500.0
+    """Default value for :attr:`.corridor_buffer`"""
+
+    ROS_D_CORRIDOR_TILE_STEP = 0.002
+    """Default value for :attr:`.corridor_tile_step`
+
+    About 220 meters of latitude in :term:`WGS 84` degrees.
+    """
+
+    ROS_D_CORRIDOR_TILE_SIZE = 512
+    """Default value for :attr:`.corridor_tile_size`"""
+
+    ROS_D_CORRIDOR_MAX_BYTES = 4 * 1024**3
+    """Default value for :attr:`.corridor_max_bytes`"""
+
+    ROS_D_MAX_WORKERS = 2
+    """Default value for :attr:`.max_workers`"""
+
+    ROS_D_CACHE_DIR = "~/.cache/gisnav/tiles"
+    """Default value for :attr:`.cache_dir`
+
+    > [!TIP]
+    > Set to an empty string to disable the tile cache.
+    """
+
+    ROS_D_CACHE_MAX_BYTES = 512 * 1024**2
+    """Default value for :attr:`.cache_max_bytes`"""
+
+    ROS_D_CACHE_BBOX_QUANTIZATION = 0.0001
+    """Default value for :attr:`.cache_bbox_quantization`
+
+    About 11 meters of latitude in :term:`WGS 84` degrees.
+    """
+
+    ROS_D_RASTER_SOURCE = "wms"
+    """Default value for :attr:`.raster_source`"""
+
+    ROS_D_GDAL_DATA_DIR = "/etc/mapserver"
+    """Default value for :attr:`.gdal_data_dir`
+
+    This is where the MapServer container keeps the ``imagery.vrt`` and ``dem.vrt``
+    virtual rasters that back its WMS layers.
+    """
+
     _ROS_PARAM_DESCRIPTOR_READ_ONLY: Final = ParameterDescriptor(read_only=True)
     """A read only ROS parameter descriptor"""
 
@@ -151,15 +295,88 @@ class GISNode(Node):
         # TODO: refactor out CvBridge and use np.frombuffer instead
         self._cv_bridge = CvBridge()
 
-        wms_poll_rate = self.wms_poll_rate
-        assert wms_poll_rate is not None
-        self._wms_client = None  # TODO add type hint if possible
-        self._connect_wms_timer: Optional[Timer] = self._create_connect_wms_timer(
-            wms_poll_rate
+        self._wms_client: Optional[WMSClient] = None
+        self._wms_connect_stop = threading.Event()
+        self._raster_source: Optional[RasterSource] = self._create_raster_source(
+            self.raster_source, self.gdal_data_dir
         )
+        if self._raster_source is None:
+            # Default WMS raster source is created once the WMS client is connected
+            self._start_wms_client(
+                self.wms_url,
+                self.wms_version,
+                self.wms_timeout,
+                self.wms_pool_size,
+                self.wms_capabilities_cache_dir,
+                self.wms_capabilities_max_age,
+                self.wms_getmap_retries,
+                self.wms_backoff_initial,
+                self.wms_backoff_max,
+            )
 
         self.old_bounding_box: Optional[BoundingBox] = None
 
+        # GetMap requests are handled by a background worker pool. Only the latest
+        # request is relevant - responses to superseded requests are discarded.
+        max_workers = self.max_workers
+        assert max_workers is not None
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=self.get_name()
+        )
+        # The DEM layer is requested concurrently with the imagery layer from a
+        # separate pool so that requests never wait on tasks queued behind them
+        self._layer_executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"{self.get_name()}_dem"
+        )
+        self._responses: "queue.SimpleQueue[_OrthoimageResponse]" = queue.SimpleQueue()
+        self._request_id = 0
+        self._pending_request: Optional[Future] = None
+        self._latest_orthoimage: Optional[OrthoImage] = None
+        self._latest_timings: Dict[str, float] = {}
+
+        self._tile_cache: Optional[TileCache] = self._create_tile_cache(
+            self.cache_dir, self.cache_max_bytes
+        )
+
+        dem_downsampling = self.dem_downsampling
+        assert dem_downsampling is not None and dem_downsampling >= 1
+        self._mosaic: Optional[RasterMosaic] = (
+            RasterMosaic(factors=(1, dem_downsampling)) if self.mosaic_enabled else None
+        )
+
+        self._corridor_store: Optional[CorridorTileStore] = self._create_corridor_store(
+            self.corridor_dir,
+            self.mission_plan,
+            self.corridor_tile_step,
+            self.corridor_tile_size,
+            self.corridor_max_bytes,
+        )
+        self._corridor_preload_started = False
+
+        # Prefetch requests are tracked separately from the main request so that
+        # they are not superseded by it
+        self._bounding_box_predictor = BoundingBoxPredictor()
+        self._prefetch_statistics = PrefetchStatistics()
+        self._prefetch_id = 0
+        self._pending_prefetch: Optional[Future] = None
+        self._prefetch_bounding_box: Optional[BoundingBox] = None
+        self._prefetched: Optional[_OrthoimageResponse] = None
+        self._prefetched_at: Optional[float] = None
+        self._prefetch_needed_at: Optional[float] = None
+
+    def destroy_node(self) -> None:
+        """Shuts down the background worker pools before destroying the node"""
+        self._wms_connect_stop.set()
+        if self._wms_client is not None:
+            self._wms_client.close()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._layer_executor.shutdown(wait=False, cancel_futures=True)
+        if self._tile_cache is not None:
+            self._tile_cache.close()
+        if self._corridor_store is not None:
+            self._corridor_store.close()
+        super().destroy_node()
+
     @property
     @ROS.parameter(ROS_D_URL, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
     def wms_url(self) -> Optional[str]:
@@ -211,9 +428,50 @@ class GISNode(Node):
         """ROS parameter for WMS request format for all GetMap requests"""
 
     @property
-    @ROS.parameter(ROS_D_WMS_POLL_RATE, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
-    def wms_poll_rate(self) -> Optional[float]:
-        """ROS parameter for WMS connection status poll rate in Hz"""
+    @ROS.parameter(ROS_D_WMS_POOL_SIZE, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
+    def wms_pool_size(self) -> Optional[int]:
+        """ROS parameter for the maximum number of pooled keep-alive connections to
+        the WMS endpoint
+        """
+
+    @property
+    @ROS.parameter(
+        ROS_D_WMS_CAPABILITIES_CACHE_DIR, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY
+    )
+    def wms_capabilities_cache_dir(self) -> Optional[str]:
+        """ROS parameter for the WMS GetCapabilities cache directory"""
+
+    @property
+    @ROS.parameter(
+        ROS_D_WMS_CAPABILITIES_MAX_AGE, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY
+    )
+    def wms_capabilities_max_age(self) -> Optional[float]:
+        """ROS parameter for the maximum age in seconds of a cached GetCapabilities
+        response before it is requested again
+        """
+
+    @property
+    @ROS.parameter(
+        ROS_D_WMS_BACKOFF_INITIAL, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY
+    )
+    def wms_backoff_initial(self) -> Optional[float]:
+        """ROS parameter for the maximum delay in seconds before the first WMS
+        connection or GetMap retry
+        """
+
+    @property
+    @ROS.parameter(ROS_D_WMS_BACKOFF_MAX, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
+    def wms_backoff_max(self) -> Optional[float]:
+        """ROS parameter for the upper bound in seconds of the exponentially
+        growing delay between WMS connection or GetMap retries
+        """
+
+    @property
+    @ROS.parameter(ROS_D_WMS_GETMAP_RETRIES, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
+    def wms_getmap_retries(self) -> Optional[int]:
+        """ROS parameter for the maximum number of retries of a WMS GetMap request
+        that failed with a connection error or a 5xx server error
+        """
 
     @property
     @ROS.parameter(ROS_D_MAP_OVERLAP_UPDATE_THRESHOLD)
@@ -228,6 +486,295 @@ class GISNode(Node):
     def publish_rate(self) -> Optional[float]:
         """Publish rate in Hz for the :attr:`.orthoimage` :term:`message`"""
 
+    @property
+    @ROS.parameter(ROS_D_PREFETCH_ENABLED)
+    def prefetch_enabled(self) -> Optional[bool]:
+        """ROS parameter for enabling prefetching of the next orthoimage along the
+        projected flight path
+        """
+
+    @property
+    @ROS.parameter(ROS_D_PREFETCH_LOOKAHEAD)
+    def prefetch_lookahead(self) -> Optional[float]:
+        """ROS parameter for the minimum time in seconds to look ahead along the
+        projected flight path when prefetching the next orthoimage
+
+        The latest orthoimage request latency is used instead if it is longer.
+        """
+
+    @property
+    @ROS.parameter(ROS_D_ORTHOIMAGE_GSD)
+    def orthoimage_gsd(self) -> Optional[float]:
+        """ROS parameter for the target ground sampling distance (GSD) of the
+        orthoimage in meters per pixel, or zero to always request orthoimages at
+        the camera diagonal resolution (see :meth:`._orthoimage_size`)
+        """
+
+    @property
+    @ROS.parameter(ROS_D_DEM_DOWNSAMPLING, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
+    def dem_downsampling(self) -> Optional[int]:
+        """ROS parameter for the integer factor by which the DEM resolution is
+        coarser than the orthoimage resolution
+
+        Elevation varies much more smoothly than imagery, so the DEM does not need
+        the resolution of the orthoimage.
+        """
+
+    @property
+    @ROS.parameter(ROS_D_MOSAIC_ENABLED, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
+    def mosaic_enabled(self) -> Optional[bool]:
+        """ROS parameter for enabling the rolling orthoimage mosaic
+
+        If enabled, only the newly exposed edge strips of the orthoimage are
+        requested when the vehicle moves, and the rest of the orthoimage is reused
+        from the previous orthoimage.
+        """
+
+    @property
+    @ROS.parameter(ROS_D_MISSION_PLAN, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
+    def mission_plan(self) -> Optional[str]:
+        """ROS parameter for the QGroundControl mission plan file whose corridor
+        is preloaded into :attr:`.corridor_dir` on startup, or an empty string to
+        disable preloading
+        """
+
+    @property
+    @ROS.parameter(ROS_D_CORRIDOR_DIR, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
+    def corridor_dir(self) -> Optional[str]:
+        """ROS parameter for the mission corridor tile store directory, or an empty
+        string to disable the corridor tile store
+
+        The store is used if it has been preloaded with the ``preload_corridor``
+        tool or if :attr:`.mission_plan` is set.
+        """
+
+    @property
+    @ROS.parameter(ROS_D_CORRIDOR_BUFFER, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
+    def corridor_buffer(self) -> Optional[float]:
+        """ROS parameter for the mission corridor half-width in meters
+
+        Should cover the ground-projected field of view of the camera along the
+        mission path.
+        """
+
+    @property
+    @ROS.parameter(ROS_D_CORRIDOR_TILE_STEP, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
+    def corridor_tile_step(self) -> Optional[float]:
+        """ROS parameter for the corridor tile grid step in degrees when creating a
+        new corridor tile store
+        """
+
+    @property
+    @ROS.parameter(ROS_D_CORRIDOR_TILE_SIZE, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
+    def corridor_tile_size(self) -> Optional[int]:
+        """ROS parameter for the corridor tile width and height in pixels when
+        creating a new corridor tile store
+        """
+
+    @property
+    @ROS.parameter(ROS_D_CORRIDOR_MAX_BYTES, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
+    def corridor_max_bytes(self) -> Optional[int]:
+        """ROS parameter for the maximum size of the corridor tile store in bytes"""
+
+    @property
+    @ROS.parameter(ROS_D_MAX_WORKERS, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
+    def max_workers(self) -> Optional[int]:
+        """ROS parameter for the maximum number of background worker threads used
+        for sending GetMap requests
+        """
+
+    @property
+    @ROS.parameter(ROS_D_CACHE_DIR, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
+    def cache_dir(self) -> Optional[str]:
+        """ROS parameter for the persistent tile cache directory, or an empty string
+        to disable the cache
+        """
+
+    @property
+    @ROS.parameter(ROS_D_CACHE_MAX_BYTES, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
+    def cache_max_bytes(self) -> Optional[int]:
+        """ROS parameter for the maximum size of the tile cache in bytes
+
+        Least recently used rasters are evicted when the cache grows larger.
+        """
+
+    @property
+    @ROS.parameter(
+        ROS_D_CACHE_BBOX_QUANTIZATION, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY
+    )
+    def cache_bbox_quantization(self) -> Optional[float]:
+        """ROS parameter for the grid step in :attr:`.wms_srs` units that requested
+        bounding boxes are snapped to when the tile cache is enabled
+
+        A coarser grid increases the cache hit rate at the cost of slightly larger
+        requested rasters.
+        """
+
+    @property
+    @ROS.parameter(ROS_D_RASTER_SOURCE, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
+    def raster_source(self) -> Optional[str]:
+        """ROS parameter for the raster source, either ``wms`` for WMS GetMap
+        requests or ``gdal`` for reading the raster datasets directly from disk
+        """
+
+    @property
+    @ROS.parameter(ROS_D_GDAL_DATA_DIR, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
+    def gdal_data_dir(self) -> Optional[str]:
+        """ROS parameter for the directory containing the ``{layer}.vrt`` datasets
+        when :attr:`.raster_source` is ``gdal``
+        """
+
+    @narrow_types
+    def _create_raster_source(
+        self, raster_source: str, gdal_data_dir: str
+    ) -> Optional[RasterSource]:
+        """Returns the raster source, or None if the default WMS raster source
+        should be used
+
+        The WMS raster source cannot be created before the WMS client is connected
+        (see :meth:`._start_wms_client`).
+
+        :param raster_source: Raster source type, ``wms`` or ``gdal``
+        :param gdal_data_dir: Directory of the GDAL datasets
+        :return: The :class:`.RasterSource` instance, or None
+        """
+        if raster_source == "gdal":
+            try:
+                source = GDALRasterSource(gdal_data_dir)
+                self.get_logger().info(
+                    f"Reading rasters directly from GDAL datasets in {gdal_data_dir}."
+                )
+                return source
+            except ModuleNotFoundError as e:
+                self.get_logger().error(
+                    f"Could not create GDAL raster source, falling back to WMS: {e}"
+                )
+        elif raster_source != "wms":
+            self.get_logger().error(
+                f"Unsupported raster source {raster_source}, falling back to WMS."
+            )
+        return None
+
+    @narrow_types
+    def _create_tile_cache(self, path: str, max_bytes: int) -> Optional[TileCache]:
+        """Returns the persistent tile cache, or None if it is disabled or cannot be
+        opened
+
+        :param path: Tile cache directory, or an empty string to disable the cache
+        :param max_bytes: Maximum size of the tile cache in bytes
+        :return: The :class:`.TileCache` instance, or None
+        """
+        if not path:
+            self.get_logger().info("Tile cache disabled.")
+            return None
+
+        try:
+            tile_cache = TileCache(path, max_bytes)
+            self.get_logger().info(f"Using tile cache at {path}.")
+            return tile_cache
+        except (OSError, sqlite3.Error) as e:
+            self.get_logger().error(
+                f"Could not open tile cache at {path}, disabling cache: {e}"
+            )
+            return None
+
+    @narrow_types
+    def _create_corridor_store(
+        self,
+        path: str,
+        mission_plan: str,
+        step: float,
+        tile_size: int,
+        max_bytes: int,
+    ) -> Optional[CorridorTileStore]:
+        """Returns the mission corridor tile store, or None if no corridor has been
+        preloaded or is to be preloaded, or if the store cannot be opened
+
+        :param path: Corridor tile store directory, or an empty string to disable
+            the store
+        :param mission_plan: Mission plan file to preload, or an empty string
+        :param step: Tile grid step in degrees for a new store
+        :param tile_size: Tile size in pixels for a new store
+        :param max_bytes: Maximum size of the store in bytes
+        :return: The :class:`.CorridorTileStore` instance, or None
+        """
+        if not path or not (mission_plan or CorridorTileStore.exists(path)):
+            return None
+
+        try:
+            corridor_store = CorridorTileStore(path, step, tile_size, max_bytes)
+            self.get_logger().info(f"Using mission corridor tile store at {path}.")
+            return corridor_store
+        except (OSError, sqlite3.Error) as e:
+            self.get_logger().error(
+                f"Could not open mission corridor tile store at {path}: {e}"
+            )
+            return None
+
+    def _start_corridor_preload(self) -> None:
+        """Starts preloading the mission corridor in a background thread
+
+        Preloading starts once the raster source is available and only once per
+        node lifetime. Tiles that are already in the store are not fetched again.
+        """
+
+        @narrow_types(self)
+        def _start(
+            corridor_store: CorridorTileStore,
+            raster_source: RasterSource,
+            mission_plan: str,
+            buffer: float,
+            max_workers: int,
+        ) -> None:
+            try:
+                polygon = corridor_polygon(load_plan_waypoints(mission_plan), buffer)
+            except (OSError, ValueError) as e:
+                self.get_logger().error(
+                    f"Could not load mission plan {mission_plan}: {e}"
+                )
+                return
+
+            def _preload() -> None:
+                for layers, styles, grayscale in (
+                    (self.wms_layers, self.wms_styles, False),
+                    (self.wms_dem_layers, self.wms_dem_styles, True),
+                ):
+                    counts = corridor_store.preload(
+                        raster_source,
+                        polygon,
+                        layers,
+                        styles,
+                        self.wms_format,
+                        self.wms_transparency,
+                        grayscale,
+                        max_workers,
+                    )
+                    self.get_logger().info(
+                        f"Preloaded mission corridor for layers {layers}: {counts}."
+                    )
+
+            self.get_logger().info(f"Preloading mission corridor of {mission_plan}.")
+            threading.Thread(
+                target=_preload,
+                name=f"{self.get_name()}_corridor_preload",
+                daemon=True,
+            ).start()
+
+        if (
+            not self._corridor_preload_started
+            and self._corridor_store is not None
+            and self._raster_source is not None
+            and self.mission_plan
+        ):
+            self._corridor_preload_started = True
+            _start(
+                self._corridor_store,
+                self._raster_source,
+                self.mission_plan,
+                self.corridor_buffer,
+                self.max_workers,
+            )
+
     @narrow_types
     def _create_publish_timer(self, publish_rate: float) -> Timer:
         """
@@ -245,23 +792,6 @@ class GISNode(Node):
         timer = self.create_timer(1 / publish_rate, self._publish)
         return timer
 
-    @narrow_types
-    def _create_connect_wms_timer(self, poll_rate: float) -> Timer:
-        """Returns a timer that reconnects the WMS client when needed
-
-        :param poll_rate: WMS connection status poll rate for the timer (in Hz)
-        :return: The :class:`.Timer` instance
-        """
-        if poll_rate <= 0:
-            error_msg = (
-                f"WMS connection status poll rate must be positive ("
-                f"{poll_rate} Hz provided)."
-            )
-            self.get_logger().error(error_msg)
-            raise ValueError(error_msg)
-        timer = self.create_timer(1 / poll_rate, self._try_wms_client_instantiation)
-        return timer
-
     @property
     def _publish_timer(self) -> Timer:
         """:attr:`.orthoimage` publish and map update timer"""
@@ -272,46 +802,410 @@ class GISNode(Node):
         self.__publish_timer = value
 
     def _publish(self):
-        """Publishes :attr:`.orthoimage`"""
+        """Handles completed orthoimage requests, swaps in a prefetched orthoimage
+        or requests a new orthoimage if needed, prefetches the next orthoimage
+        along the projected flight path, and publishes :attr:`.orthoimage`
+        """
+        self._start_corridor_preload()
+        self._handle_orthoimage_responses()
+        if self._should_request_orthoimage():
+            if not self._use_prefetched_orthoimage():
+                self._submit_orthoimage_request(deepcopy(self.bounding_box))
+        else:
+            predicted_bounding_box = self._predicted_bounding_box()
+            if self._should_prefetch_orthoimage(predicted_bounding_box):
+                self._submit_orthoimage_request(predicted_bounding_box, prefetch=True)
         self.orthoimage
+        self.diagnostics
+
+    def _submit_orthoimage_request(
+        self, bounding_box: Optional[BoundingBox], prefetch: bool = False
+    ) -> None:
+        """Submits a new orthoimage request to the background worker pool
 
-    def _try_wms_client_instantiation(self) -> None:
-        """Attempts to instantiate :attr:`._wms_client`
+        Cancels the pending request of the same kind if it has not started yet.
+        Responses to requests that are already running are discarded when they
+        arrive because they are superseded by this request.
 
-        Destroys :attr:`._connect_wms_timer` if instantiation is successful
+        :param bounding_box: Bounding box to request the orthoimage for
+        :param prefetch: True to prefetch the orthoimage for a predicted bounding
+            box instead of requesting it for the current bounding box
         """
 
         @narrow_types(self)
-        def _connect_wms(url: str, version: str, timeout: int, poll_rate: float):
-            try:
-                assert self._wms_client is None
-                self.get_logger().info(f"Connecting to WMS endpoint at {url}...")
-                self._wms_client = WebMapService(url, version=version, timeout=timeout)
-                self.get_logger().info("WMS client connection established.")
-
-                # We have the WMS client instance - we can now destroy the timer
-                assert self._connect_wms_timer is not None
-                self._connect_wms_timer.destroy()
-            except requests.exceptions.ConnectionError as _:  # noqa: F841
-                # Expected error if no connection
-                self.get_logger().error(
-                    f"Could not instantiate WMS client due to connection error, "
-                    f"trying again in {1 / poll_rate} seconds..."
+        def _submit(
+            bounding_box: BoundingBox,
+            size: Tuple[int, int],
+            srs: str,
+            format_: str,
+            transparency: bool,
+            layers: List[str],
+            dem_layers: List[str],
+            styles: List[str],
+            dem_styles: List[str],
+            dem_downsampling: int,
+        ) -> None:
+            if self._tile_cache is not None:
+                # Snap the bounding box to a grid so that requests for approximately
+                # the same area hit the same tile cache entry
+                quantization = self.cache_bbox_quantization
+                assert quantization is not None
+                bounding_box = tf_.bbox_to_bounding_box(
+                    quantize_bbox(tf_.bounding_box_to_bbox(bounding_box), quantization)
                 )
-                assert self._wms_client is None
-            except Exception as e:
-                # TODO: handle other exception types
-                self.get_logger().error(
-                    f"Could not instantiate WMS client due to unexpected exception "
-                    f"type ({type(e)}), trying again in {1 / poll_rate} seconds..."
+
+            args = (
+                bounding_box,
+                size,
+                srs,
+                format_,
+                transparency,
+                layers,
+                dem_layers,
+                styles,
+                dem_styles,
+                dem_downsampling,
+            )
+            if prefetch:
+                self._reset_prefetch()
+                self._pending_prefetch = self._executor.submit(
+                    self._fetch_orthoimage, self._prefetch_id, True, *args
                 )
-                assert self._wms_client is None
+                self._prefetch_bounding_box = bounding_box
+                return
+
+            if self._pending_request is not None:
+                self._pending_request.cancel()
 
-        if self._wms_client is None:
-            _connect_wms(
-                self.wms_url, self.wms_version, self.wms_timeout, self.wms_poll_rate
+            self._request_id += 1
+            self._pending_request = self._executor.submit(
+                self._fetch_orthoimage, self._request_id, False, *args
             )
 
+            # Set old bounding box so that the same orthoimage is not requested
+            # again while the request is in flight
+            self.old_bounding_box = bounding_box
+
+        _submit(
+            bounding_box,
+            self._orthoimage_size(bounding_box),
+            self.wms_srs,
+            self.wms_format,
+            self.wms_transparency,
+            self.wms_layers,
+            self.wms_dem_layers,
+            self.wms_styles,
+            self.wms_dem_styles,
+            self.dem_downsampling,
+        )
+
+    def _fetch_orthoimage(
+        self,
+        request_id: int,
+        prefetch: bool,
+        bounding_box: BoundingBox,
+        size: Tuple[int, int],
+        *args,
+    ) -> None:
+        """Retrieves the orthoimage for the bounding box and puts the response into
+        the response queue
+
+        If the rolling mosaic is enabled, the orthoimage is cut out of the mosaic
+        and the bounding box of the response is snapped to the mosaic pixel grid.
+        Only the latest main request moves the mosaic canvas: prefetch requests
+        reuse the canvas but do not move it to the predicted bounding box, so that
+        a late prefetch response does not undo the latest main request.
+
+        The edge strips of a mosaic update bypass the tile cache because their
+        bounding boxes are rarely requested again, and caching them would evict
+        full orthoimages.
+
+        > [!NOTE] Worker thread
+        > This method is run in a background worker thread.
+
+        :param request_id: Identifier of the request
+        :param prefetch: True if this is a prefetch request
+        :param bounding_box: Bounding box to request the orthoimage for
+        :param size: Orthoimage resolution
+        :param args: Remaining arguments for
+            :meth:`._request_orthoimage_for_bounding_box`
+        """
+        orthoimage = None
+        timings: Dict[str, float] = {}
+        start = time.monotonic()
+        try:
+            map: Optional[Tuple[np.ndarray, ...]] = None
+            if self._mosaic is not None:
+                mosaic = self._mosaic.update(
+                    tf_.bounding_box_to_bbox(bounding_box),
+                    size,
+                    lambda bbox, size_: self._request_orthoimage_for_bounding_box(
+                        tf_.bbox_to_bounding_box(bbox),
+                        size_,
+                        *args,
+                        timings,
+                        cache=size_ == size,
+                    ),
+                    lambda: not prefetch and request_id == self._request_id,
+                )
+                if mosaic is not None:
+                    bbox, map = mosaic
+                    bounding_box = tf_.bbox_to_bounding_box(bbox)
+            else:
+                map = self._request_orthoimage_for_bounding_box(
+                    bounding_box, size, *args, timings
+                )
+            orthoimage = self._create_orthoimage(bounding_box, map)
+        finally:
+            timings["total"] = time.monotonic() - start
+            self._responses.put(
+                _OrthoimageResponse(
+                    request_id, bounding_box, orthoimage, timings, prefetch
+                )
+            )
+
+    def _handle_orthoimage_responses(self) -> None:
+        """Swaps in the orthoimage from the latest completed request
+
+        Responses to superseded requests are discarded. If the latest request
+        failed, the previous orthoimage is kept and a new request will be triggered.
+        """
+        while True:
+            try:
+                response = self._responses.get_nowait()
+            except queue.Empty:
+                break
+
+            if response.prefetch:
+                self._handle_prefetch_response(response)
+                continue
+
+            if response.request_id != self._request_id:
+                self.get_logger().debug(
+                    f"Discarding response to superseded orthoimage request "
+                    f"{response.request_id}."
+                )
+                continue
+
+            self._pending_request = None
+            self._latest_timings = response.timings
+            if response.orthoimage is None:
+                # Trigger a new request on next publish
+                self.old_bounding_box = None
+            else:
+                self._latest_orthoimage = response.orthoimage
+
+    def _handle_prefetch_response(self, response: _OrthoimageResponse) -> None:
+        """Stores the prefetched orthoimage until it is needed, or swaps it in
+        immediately if it was already needed while the request was in flight
+
+        :param response: Response to a prefetch request
+        """
+        if response.request_id != self._prefetch_id:
+            self.get_logger().debug(
+                f"Discarding response to superseded orthoimage prefetch request "
+                f"{response.request_id}."
+            )
+            return
+
+        self._pending_prefetch = None
+        if response.orthoimage is None:
+            if self._prefetch_needed_at is not None:
+                # Prefetch request was promoted to main request - trigger a new
+                # request on next publish
+                self.old_bounding_box = None
+            self._reset_prefetch()
+            return
+
+        if self._prefetch_needed_at is not None:
+            # Negative lead time - the orthoimage arrived late
+            self._prefetch_statistics.hit(self._prefetch_needed_at - time.monotonic())
+            self._swap_in_prefetched_orthoimage(response)
+        else:
+            self._prefetched = response
+            self._prefetched_at = time.monotonic()
+
+    def _use_prefetched_orthoimage(self) -> bool:
+        """Swaps in the prefetched orthoimage if it covers the current bounding box
+
+        If the prefetch request that covers the current bounding box is still in
+        flight, it is promoted to the main request instead so that the same
+        orthoimage is not requested twice.
+
+        :return: True if the prefetched orthoimage was swapped in or the prefetch
+            request was promoted, False if a new orthoimage should be requested
+        """
+        if (
+            not self.prefetch_enabled
+            or self.bounding_box is None
+            or self.old_bounding_box is None  # first request or retry
+        ):
+            return False
+
+        if self._prefetch_bounding_box is None or not self._overlap_is_sufficient(
+            self.bounding_box, self._prefetch_bounding_box
+        ):
+            self._prefetch_statistics.miss()
+            self._reset_prefetch()
+            return False
+
+        if self._prefetched is not None:
+            assert self._prefetched_at is not None
+            self._prefetch_statistics.hit(time.monotonic() - self._prefetched_at)
+            self._swap_in_prefetched_orthoimage(self._prefetched)
+        else:
+            # Prefetch request still in flight - swap it in as soon as it arrives
+            self._prefetch_needed_at = time.monotonic()
+            self.old_bounding_box = self._prefetch_bounding_box
+
+        return True
+
+    def _swap_in_prefetched_orthoimage(self, response: _OrthoimageResponse) -> None:
+        """Replaces the latest orthoimage with the prefetched orthoimage
+
+        Supersedes the pending main request, if any.
+
+        :param response: Response to a prefetch request
+        """
+        if self._pending_request is not None:
+            self._pending_request.cancel()
+            self._pending_request = None
+        self._request_id += 1
+
+        self._latest_orthoimage = response.orthoimage
+        self._latest_timings = response.timings
+        self.old_bounding_box = response.bounding_box
+        self._reset_prefetch()
+
+    def _reset_prefetch(self) -> None:
+        """Cancels the pending prefetch request, if any, and discards the prefetched
+        orthoimage
+        """
+        if self._pending_prefetch is not None:
+            self._pending_prefetch.cancel()
+            self._pending_prefetch = None
+        self._prefetch_id += 1
+        self._prefetch_bounding_box = None
+        self._prefetched = None
+        self._prefetched_at = None
+        self._prefetch_needed_at = None
+
+    def _predicted_bounding_box(self) -> Optional[BoundingBox]:
+        """Returns the bounding box predicted along the projected flight path, or
+        None if it cannot be predicted
+
+        The lookahead time is :attr:`.prefetch_lookahead` or the latest orthoimage
+        request latency, whichever is longer.
+        """
+        lookahead = max(
+            self.prefetch_lookahead or 0.0, self._latest_timings.get("total", 0.0)
+        )
+        bbox = self._bounding_box_predictor.predict(lookahead)
+        return tf_.bbox_to_bounding_box(bbox) if bbox is not None else None
+
+    def _should_prefetch_orthoimage(
+        self, predicted_bounding_box: Optional[BoundingBox]
+    ) -> bool:
+        """Returns True if the orthoimage for the predicted bounding box should be
+        prefetched
+
+        An orthoimage is prefetched if the predicted bounding box would trigger a
+        new orthoimage request, and no prefetch request covering the predicted
+        bounding box is already in flight or completed.
+
+        :param predicted_bounding_box: Predicted bounding box
+        :return: True if the orthoimage should be prefetched
+        """
+        if (
+            not self.prefetch_enabled
+            or predicted_bounding_box is None
+            or self.old_bounding_box is None
+            or self._pending_prefetch is not None
+        ):
+            return False
+
+        if self._overlap_is_sufficient(predicted_bounding_box, self.old_bounding_box):
+            return False
+
+        return self._prefetch_bounding_box is None or not self._overlap_is_sufficient(
+            predicted_bounding_box, self._prefetch_bounding_box
+        )
+
+    @narrow_types
+    def _start_wms_client(
+        self,
+        url: str,
+        version: str,
+        timeout: int,
+        pool_size: int,
+        capabilities_cache_dir: str,
+        capabilities_max_age: float,
+        getmap_retries: int,
+        backoff_initial: float,
+        backoff_max: float,
+    ) -> None:
+        """Creates :attr:`._wms_client` and connects it in a background thread
+
+        Failed connection attempts are retried with jittered exponential backoff
+        until the client is connected or the node is destroyed. The WMS raster
+        source is created once the client is connected.
+
+        :param url: WMS endpoint URL
+        :param version: WMS protocol version
+        :param timeout: WMS request timeout in seconds
+        :param pool_size: Maximum number of pooled connections
+        :param capabilities_cache_dir: GetCapabilities cache directory
+        :param capabilities_max_age: Maximum age of cached capabilities in seconds
+        :param getmap_retries: Maximum number of retries of a failed GetMap request
+        :param backoff_initial: Maximum delay before the first retry in seconds
+        :param backoff_max: Upper bound of the retry delay in seconds
+        """
+        wms_client = WMSClient(
+            url,
+            version,
+            timeout,
+            pool_size=pool_size,
+            capabilities_cache_dir=capabilities_cache_dir,
+            capabilities_max_age=capabilities_max_age,
+            getmap_retries=getmap_retries,
+            backoff_initial=backoff_initial,
+            backoff_max=backoff_max,
+        )
+        backoff = ExponentialBackoff(backoff_initial, backoff_max)
+
+        def _connect() -> None:
+            while not self._wms_connect_stop.is_set():
+                try:
+                    self.get_logger().info("Connecting to WMS endpoint...")
+                    cached = wms_client.connect()
+                    self._raster_source = WMSRasterSource(wms_client)
+                    self.get_logger().info(
+                        f"WMS client connection established "
+                        f"({'cached' if cached else 'requested'} capabilities)."
+                    )
+                    return
+                except requests.exceptions.ConnectionError as _:  # noqa: F841
+                    # Expected error if no connection
+                    delay = backoff.next_delay()
+                    self.get_logger().error(
+                        f"Could not instantiate WMS client due to connection error, "
+                        f"trying again in {delay:.1f} seconds..."
+                    )
+                except Exception as e:
+                    # TODO: handle other exception types
+                    delay = backoff.next_delay()
+                    self.get_logger().error(
+                        f"Could not instantiate WMS client due to unexpected "
+                        f"exception type ({type(e)}), trying again in {delay:.1f} "
+                        f"seconds..."
+                    )
+                self._wms_connect_stop.wait(delay)
+
+        self._wms_client = wms_client
+        threading.Thread(
+            target=_connect, name=f"{self.get_name()}_wms_connect", daemon=True
+        ).start()
+
     @narrow_types
     def _bounding_box_with_padding_for_latlon(
         self, latitude: float, longitude: float, padding: float = 600.0
@@ -344,11 +1238,20 @@ class GISNode(Node):
     def time_reference(self) -> Optional[TimeReference]:
         """Time reference from FCU, or None if unknown"""
 
+    def _bounding_box_cb(self, msg: BoundingBox) -> None:
+        """Callback for the bounding box message, records the bounding box for
+        flight path prediction
+        """
+        self._bounding_box_predictor.update(
+            time.monotonic(), tf_.bounding_box_to_bbox(msg)
+        )
+
     @property
     @ROS.subscribe(
         f"/{ROS_NAMESPACE}"
         f'/{ROS_TOPIC_RELATIVE_FOV_BOUNDING_BOX.replace("~", BBOX_NODE_NAME)}',
         QoSPresetProfiles.SENSOR_DATA.value,
+        callback=_bounding_box_cb,
     )
     def bounding_box(self) -> Optional[BoundingBox]:
         """Subscribed bounding box of the camera's ground-projected FOV, or None if
@@ -365,9 +1268,10 @@ class GISNode(Node):
         resolution, or None if unknown
         """
 
-    @property
-    def _orthoimage_size(self) -> Optional[Tuple[int, int]]:
-        """Padded map size tuple (height, width) or None if the information
+    def _orthoimage_size(
+        self, bounding_box: Optional[BoundingBox]
+    ) -> Optional[Tuple[int, int]]:
+        """Padded map size tuple (width, height) or None if the information
         is not available.
 
         Because the deep learning models used for predicting matching keypoints
@@ -378,18 +1282,56 @@ class GISNode(Node):
         appear unless padding is used. Retrieved maps therefore have to be
         squares with the side lengths matching the diagonal of the camera frames
         so that scale is preserved and no black corners appear in the rasters
-        after arbitrary 2D rotation. The height and width will both be equal to
-        the diagonal of the declared camera frame dimensions.
+        after arbitrary 2D rotation. The height and width will both be the
+        diagonal of the declared camera frame dimensions rounded up to the size
+        step.
+
+        If :attr:`.orthoimage_gsd` is set, the side length is instead selected so
+        that the ground size of the bounding box is sampled at the target ground
+        sampling distance. The side length is capped at the camera diagonal because
+        :class:`.StereoNode` resamples the orthoimage to the camera resolution, so
+        any finer resolution would be discarded.
+
+        The size step is the least common multiple of
+        :attr:`._ORTHOIMAGE_SIZE_STEP` and :attr:`.dem_downsampling` so that the
+        DEM of the :class:`.RasterMosaic` can be shifted together with the
+        orthoimage.
+
+        :param bounding_box: Bounding box of the orthoimage
         """
 
         @narrow_types(self)
-        def _orthoimage_size(camera_info: CameraInfo):
+        def _orthoimage_size(
+            camera_info: CameraInfo,
+            bounding_box: BoundingBox,
+            gsd: float,
+            dem_downsampling: int,
+        ):
+            step = int(np.lcm(self._ORTHOIMAGE_SIZE_STEP, dem_downsampling))
             diagonal = int(
                 np.ceil(np.sqrt(camera_info.width**2 + camera_info.height**2))
             )
-            return diagonal, diagonal
+            if gsd <= 0:
+                side = -(-diagonal // step) * step
+                return side, side
+
+            latitude = (bounding_box.min_pt.latitude + bounding_box.max_pt.latitude) / 2
+            ground_width = (
+                (bounding_box.max_pt.longitude - bounding_box.min_pt.longitude)
+                * self._METERS_IN_DEGREE
+                * np.cos(np.radians(latitude))
+            )
+            ground_height = (
+                bounding_box.max_pt.latitude - bounding_box.min_pt.latitude
+            ) * self._METERS_IN_DEGREE
+
+            side = int(np.ceil(max(ground_width, ground_height) / gsd / step)) * step
+            side = min(max(side, step), max(diagonal // step * step, step))
+            return side, side
 
-        return _orthoimage_size(self.camera_info)
+        return _orthoimage_size(
+            self.camera_info, bounding_box, self.orthoimage_gsd, self.dem_downsampling
+        )
 
     @narrow_types
     def _request_orthoimage_for_bounding_box(
@@ -403,59 +1345,113 @@ class GISNode(Node):
         dem_layers: List[str],
         styles: List[str],
         dem_styles: List[str],
+        dem_downsampling: int,
+        timings: Dict[str, float],
+        cache: bool = True,
     ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
         """Sends GetMap request to GIS WMS for image and DEM layers and returns
         :attr:`.orthoimage` attribute.
 
+        The image and DEM layers are requested and decoded concurrently so that
+        total latency is roughly that of the slower of the two requests.
+
+        The DEM is requested at a resolution that is coarser than the orthoimage
+        resolution by the DEM downsampling factor.
+
         Assumes zero raster as DEM if no DEM layer is available.
 
         TODO: Currently no support for separate arguments for imagery and elevation
          layers. Assumes elevation layer is available at same CRS as imagery layer.
 
         :param bounding_box: BoundingBox to request the orthoimage for
-        :param size: Orthoimage resolution (height, width)
+        :param size: Orthoimage resolution (width, height)
+        :param dem_downsampling: Factor by which the DEM resolution is coarser
+        :param timings: Dictionary into which the request and decode latency of each
+            layer in seconds is written
+        :param cache: False to bypass the tile cache, see :meth:`._get_map`
         :return: Orthophoto and dem tuple for bounding box
         """
         assert len(styles) == len(layers)
         assert len(dem_styles) == len(dem_layers)
 
         bbox = tf_.bounding_box_to_bbox(bounding_box)
-
-        self.get_logger().info("Requesting new orthoimage")
-        img: np.ndarray = self._get_map(
-            layers, styles, srs, bbox, size, format_, transparency
+        dem_size = (
+            max(1, -(-size[0] // dem_downsampling)),
+            max(1, -(-size[1] // dem_downsampling)),
         )
-        if img is None:
-            self.get_logger().error("Could not get orthoimage from GIS server")
-            return None
 
-        dem: Optional[np.ndarray] = None
+        dem_future: Optional[Future] = None
         if len(dem_layers) > 0 and dem_layers[0]:
             self.get_logger().info("Requesting new DEM")
-            dem = self._get_map(
+            dem_future = self._layer_executor.submit(
+                self._get_map_timed,
+                timings,
+                "dem",
                 dem_layers,
                 dem_styles,
                 srs,
                 bbox,
-                size,
+                dem_size,
                 format_,
                 transparency,
                 grayscale=True,
+                cache=cache,
             )
+
+        self.get_logger().info("Requesting new orthoimage")
+        img: np.ndarray = self._get_map_timed(
+            timings,
+            "imagery",
+            layers,
+            styles,
+            srs,
+            bbox,
+            size,
+            format_,
+            transparency,
+            cache=cache,
+        )
+
+        dem: Optional[np.ndarray] = None
+        if dem_future is not None:
+            dem = dem_future.result()
             if dem is not None and dem.ndim == 2:
                 dem = np.expand_dims(dem, axis=2)
-        else:
+        elif img is not None:
             # Assume flat (:=zero) terrain if no DEM layer provided
             self.get_logger().debug(
                 "No DEM layer provided, assuming flat (=zero) elevation model."
             )
-            dem = np.zeros_like(img)
+            dem = np.zeros((dem_size[1], dem_size[0], 1), dtype=np.uint8)
+
+        if img is None:
+            self.get_logger().error("Could not get orthoimage from GIS server")
+            return None
 
         # TODO: handle dem is None from _get_map call
         assert img is not None and dem is not None
         assert img.ndim == dem.ndim == 3
         return img, dem
 
+    def _get_map_timed(
+        self, timings: Dict[str, float], label: str, *args, **kwargs
+    ) -> Optional[np.ndarray]:
+        """Calls :meth:`._get_map` and writes its latency into the provided
+        dictionary
+
+        :param timings: Dictionary into which the latency in seconds is written
+        :param label: Key for the latency in the dictionary
+        :param args: Positional arguments for :meth:`._get_map`
+        :param kwargs: Keyword arguments for :meth:`._get_map`
+        :return: Response raster from :meth:`._get_map`
+        """
+        start = time.monotonic()
+        try:
+            return self._get_map(*args, **kwargs)
+        finally:
+            # Accumulate over the edge strips of a mosaic update
+            timings[label] = timings.get(label, 0.0) + time.monotonic() - start
+
     def _should_request_orthoimage(self) -> bool:
         """Returns True if a new orthoimage (including DEM) should be requested
         from onboard GIS
@@ -470,9 +1466,29 @@ class GISNode(Node):
 
         :return: True if new orthoimage should be requested from onboard GIS
         """
+        if self.old_bounding_box is None:
+            return True
+
+        return self.bounding_box is not None and not self._overlap_is_sufficient(
+            self.bounding_box, self.old_bounding_box
+        )
+
+    def _overlap_is_sufficient(
+        self,
+        new_bounding_box: Optional[BoundingBox],
+        old_bounding_box: Optional[BoundingBox],
+    ) -> bool:
+        """Returns True if the bounding boxes overlap by more than
+        :attr:`.min_map_overlap_update_threshold`
+
+        :param new_bounding_box: New bounding box
+        :param old_bounding_box: Old bounding box
+        :return: True if overlap is sufficient, False if overlap is too low or
+            cannot be determined
+        """
 
         @narrow_types(self)
-        def _orthoimage_overlap_is_too_low(
+        def _overlap_is_sufficient(
             new_bounding_box: BoundingBox,
             old_bounding_box: BoundingBox,
             min_map_overlap_update_threshold: float,
@@ -483,15 +1499,14 @@ class GISNode(Node):
             ratio1 = bbox1.intersection(bbox2).area / bbox1.area
             ratio2 = bbox2.intersection(bbox1).area / bbox2.area
             ratio = min(ratio1, ratio2)
-            if ratio > min_map_overlap_update_threshold:
-                return False
-
-            return True
+            return ratio > min_map_overlap_update_threshold
 
-        return self.old_bounding_box is None or _orthoimage_overlap_is_too_low(
-            self.bounding_box,
-            self.old_bounding_box,
-            self.min_map_overlap_update_threshold,
+        return bool(
+            _overlap_is_sufficient(
+                new_bounding_box,
+                old_bounding_box,
+                self.min_map_overlap_update_threshold,
+            )
         )
 
     @property
@@ -499,21 +1514,82 @@ class GISNode(Node):
         ROS_TOPIC_RELATIVE_ORTHOIMAGE,
         QoSPresetProfiles.SENSOR_DATA.value,
     )
-    @cache_if(_should_request_orthoimage)
     def orthoimage(self) -> Optional[OrthoImage]:
-        """Outgoing orthoimage and DEM raster"""
-        bounding_box = deepcopy(self.bounding_box)
-        map = self._request_orthoimage_for_bounding_box(
-            bounding_box,
-            self._orthoimage_size,
-            self.wms_srs,
-            self.wms_format,
-            self.wms_transparency,
-            self.wms_layers,
-            self.wms_dem_layers,
-            self.wms_styles,
-            self.wms_dem_styles,
-        )
+        """Outgoing orthoimage and DEM raster
+
+        This is the orthoimage from the latest successfully completed request. It is
+        replaced atomically when a newer request completes.
+        """
+        return self._latest_orthoimage
+
+    @property
+    @ROS.publish(
+        ROS_TOPIC_RELATIVE_DIAGNOSTICS,
+        QoSPresetProfiles.SYSTEM_DEFAULT.value,
+    )
+    def diagnostics(self) -> Optional[DiagnosticArray]:
+        """Outgoing diagnostics including the request and decode latency of each
+        layer for the latest completed orthoimage request, the mosaic pixel reuse,
+        the tile cache and mission corridor tile store hit, miss and eviction
+        counters, and the orthoimage prefetch hit rate and lead time, or None if
+        there is nothing to report yet
+        """
+        diagnostics = DiagnosticArray()
+        diagnostics.header = tf_.create_header(self)
+        if self._latest_timings:
+            diagnostics.status.append(
+                tf_.create_diagnostic_status(
+                    f"{self.get_name()}: orthoimage request latency [s]",
+                    self.get_name(),
+                    self._latest_timings,
+                )
+            )
+        if self._tile_cache is not None:
+            diagnostics.status.append(
+                tf_.create_diagnostic_status(
+                    f"{self.get_name()}: tile cache",
+                    self.get_name(),
+                    self._tile_cache.statistics(),
+                )
+            )
+        if self._mosaic is not None:
+            diagnostics.status.append(
+                tf_.create_diagnostic_status(
+                    f"{self.get_name()}: orthoimage mosaic",
+                    self.get_name(),
+                    self._mosaic.statistics(),
+                )
+            )
+        if self._corridor_store is not None:
+            diagnostics.status.append(
+                tf_.create_diagnostic_status(
+                    f"{self.get_name()}: mission corridor tile store",
+                    self.get_name(),
+                    self._corridor_store.statistics(),
+                )
+            )
+        if self.prefetch_enabled:
+            diagnostics.status.append(
+                tf_.create_diagnostic_status(
+                    f"{self.get_name()}: orthoimage prefetch",
+                    self.get_name(),
+                    self._prefetch_statistics.statistics(),
+                )
+            )
+
+        return diagnostics if diagnostics.status else None
+
+    def _create_orthoimage(
+        self,
+        bounding_box: BoundingBox,
+        map: Optional[Tuple[np.ndarray, np.ndarray]],
+    ) -> Optional[OrthoImage]:
+        """Creates an :class:`.OrthoImage` message from the retrieved rasters
+
+        :param bounding_box: Bounding box of the rasters
+        :param map: Orthophoto and DEM tuple, or None if not available
+        :return: Orthoimage message, or None if not available
+        """
         if map is not None:
             img, dem = map
 
@@ -528,16 +1604,18 @@ class GISNode(Node):
             # Convert image to grayscale (color not needed)
             dem_msg = self._cv_bridge.cv2_to_imgmsg(dem, encoding="mono8")
             img_msg = self._cv_bridge.cv2_to_imgmsg(img, encoding="passthrough")
-            orthoimage_msg = OrthoImage(image=img_msg, dem=dem_msg)
-
-            # Set old bounding box
-            self.old_bounding_box = bounding_box
 
             if self.time_reference is None:
                 self.get_logger().warning(
                     "Publishing orthoimage without FCU time reference."
                 )
 
+            # The header identifies the orthoimage e.g. for caching its features
+            # (see PoseNode), so it is set once here and never updated
+            img_msg.header = tf_.create_header(self, time_reference=self.time_reference)
+            dem_msg.header = img_msg.header
+            orthoimage_msg = OrthoImage(image=img_msg, dem=dem_msg)
+
             height, width = img.shape[:2]
             M = self._calculate_affine_transformation_matrix(
                 height, width, bounding_box
@@ -645,10 +1723,43 @@ class GISNode(Node):
         return aff
 
     def _get_map(
-        self, layers, styles, srs, bbox, size, format_, transparency, grayscale=False
+        self,
+        layers,
+        styles,
+        srs,
+        bbox,
+        size,
+        format_,
+        transparency,
+        grayscale=False,
+        cache=True,
     ) -> Optional[np.ndarray]:
-        """Sends WMS GetMap request and returns response raster"""
-        if self._wms_client is None:
+        """Sends GetMap request to :attr:`._raster_source` and returns response raster
+
+        Returns the raster from :attr:`._corridor_store` or :attr:`._tile_cache`
+        without sending a request if it is available there, and stores the response
+        raster in the tile cache otherwise. The tile cache is bypassed if ``cache``
+        is False, e.g. for the edge strips of a :class:`.RasterMosaic` update.
+        """
+        if self._corridor_store is not None:
+            corridor_img = self._corridor_store.get_map(
+                layers, styles, srs, bbox, size, format_, grayscale
+            )
+            if corridor_img is not None:
+                self.get_logger().debug(f"Corridor tile hit for layers: {layers}.")
+                return corridor_img
+
+        cache_key: Optional[str] = None
+        if self._tile_cache is not None and cache:
+            cache_key = TileCache.key(
+                layers, styles, srs, bbox, size, format_, grayscale
+            )
+            cached_img = self._tile_cache.get(cache_key)
+            if cached_img is not None:
+                self.get_logger().debug(f"Tile cache hit for layers: {layers}.")
+                return cached_img
+
+        if self._raster_source is None:
             self.get_logger().warning(
                 "WMS client not instantiated. Skipping sending GetMap request."
             )
@@ -660,15 +1771,8 @@ class GISNode(Node):
         try:
             # Do not handle possible requests library related exceptions here
             # (see class docstring)
-            assert self._wms_client is not None
-            img: IO = self._wms_client.getmap(
-                layers=layers,
-                styles=styles,
-                srs=srs,
-                bbox=bbox,
-                size=size,
-                format=format_,
-                transparent=transparency,
+            img = self._raster_source.get_map(
+                layers, styles, srs, bbox, size, format_, transparency, grayscale
             )
         except ServiceException as se:
             self.get_logger().error(
@@ -690,22 +1794,14 @@ class GISNode(Node):
         finally:
             self.get_logger().debug("Image request complete.")
 
-        def _read_img(img: IO, grayscale: bool = False) -> np.ndarray:
-            """Reads image bytes and returns numpy array
-
-            :param img: Image bytes buffer
-            :param grayscale: True if buffer represents grayscale image
-            :return: Image as np.ndarray
-            """
-            img = np.frombuffer(img.read(), np.uint8)  # TODO: make DEM uint16?
-            img = (
-                cv2.imdecode(img, cv2.IMREAD_UNCHANGED)
-                if not grayscale
-                else cv2.imdecode(img, cv2.IMREAD_GRAYSCALE)
-            )
-            return img
+        if cache_key is not None and img is not None:
+            assert self._tile_cache is not None
+            try:
+                self._tile_cache.put(cache_key, img)
+            except OSError as e:
+                self.get_logger().error(f"Could not write raster to tile cache: {e}")
 
-        return _read_img(img, grayscale)
+        return img
 
     @staticmethod
     def _create_src_corners(h: int, w: int) -> np.ndarray:
@@ -13,8 +13,44 @@ matching.
 
 The pose is estimated by finding matching keypoints between the query and
 reference images and then solving the resulting PnP problem.
+
+Deep matching reference features are read from the offline mission area feature
+database if one has been built (see :mod:`.tools.build_feature_db`). Otherwise they
+are extracted once per orthoimage and reused for all reference images rotated and
+cropped from it (see :mod:`._feature_cache`).
+
+Every camera frame arrives twice, as the query image of both the pose and twist
+images from :class:`.StereoNode`, and then once more as the reference image of the
+next twist image. The decoded frame and the features extracted from it are cached
+by frame identity, so that every frame is decoded and its features are extracted
+only once.
+
+Inference runs in a dedicated thread that is fed by a latest-wins work queue (see
+:mod:`._work_queue`), so that the pose and twist are always estimated from the
+freshest camera frame. Frames that arrive while the previous frame is still being
+processed replace the waiting frame, and the replaced frames are dropped.
+
+Pose and twist estimation is split into decode, extract, match and PnP stages that
+run in their own threads (see :mod:`._pipeline`), so that consecutive frames are
+processed in different stages at the same time.
+
+The deep matching keypoint budget, input resolution and LightGlue early exit can
+be adapted online to keep the inference latency near a target (see
+:mod:`._adaptive`).
 """
-from typing import Final, Optional, Tuple, Union, cast
+import time
+from concurrent.futures import Future
+from typing import (
+    Callable,
+    Dict,
+    Final,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+    cast,
+)
 
 import cv2
 import numpy as np
@@ -24,33 +60,60 @@ import tf_transformations
 import torch
 from builtin_interfaces.msg import Time
 from cv_bridge import CvBridge
+from diagnostic_msgs.msg import DiagnosticArray
 from geometry_msgs.msg import (
     PoseWithCovariance,
     PoseWithCovarianceStamped,
     TwistWithCovarianceStamped,
 )
-from kornia.feature import DISK, LightGlueMatcher, laf_from_center_scale_ori
+from rcl_interfaces.msg import ParameterDescriptor
 from rclpy.node import Node
 from rclpy.qos import QoSPresetProfiles
 from robot_localization.srv import SetPose
-from scipy.interpolate import interp1d
 from sensor_msgs.msg import CameraInfo, Image, TimeReference
+from std_msgs.msg import Header
 
 from gisnav_msgs.msg import (  # type: ignore[attr-defined]
     MonocularStereoImage,
+    OrthoImage,
     OrthoStereoImage,
+    TraceEvent,
 )
 
 from .. import _transformations as tf_
+from .._adaptive import LatencyController, OperatingPoint, operating_points
+from .._debug_rendering import DebugRenderer, draw_matches
 from .._decorators import ROS, narrow_types
+from .._deep_matching import DeepMatcher, DeepMatchingPool, ReorderBuffer
+from .._feature_cache import (
+    FeatureCache,
+    compose,
+    quantize_angle,
+    rotation_matrix,
+    similarity_angle_and_scale,
+)
+from .._feature_db import FeatureDatabase, ground_sampling_distance
+from .._pipeline import Pipeline
+from .._pnp import PnPSolver
+from .._stage_timer import StageTimer
+from .._tracing import Tracer
+from .._transformations import BBox
+from .._visual_odometry import KLTTracker, ORBMatcher, ShallowMatcher, _Features
+from .._work_queue import LatestWorkQueue
 from ..constants import (
+    GIS_NODE_NAME,
     MAVROS_TOPIC_TIME_REFERENCE,
     ROS_NAMESPACE,
     ROS_TOPIC_CAMERA_INFO,
+    ROS_TOPIC_RELATIVE_DIAGNOSTICS,
+    ROS_TOPIC_RELATIVE_ORTHOIMAGE,
     ROS_TOPIC_RELATIVE_POSE,
     ROS_TOPIC_RELATIVE_POSE_IMAGE,
+    ROS_TOPIC_RELATIVE_POSE_MATCHES_IMAGE,
     ROS_TOPIC_RELATIVE_QUERY_TWIST,
     ROS_TOPIC_RELATIVE_TWIST_IMAGE,
+    ROS_TOPIC_RELATIVE_TWIST_MATCHES_IMAGE,
+    ROS_TOPIC_TRACE,
     STEREO_NODE_NAME,
     FrameID,
 )
@@ -64,6 +127,58 @@ _covariance_matrix[4, 4] = _covariance_matrix[3, 3]
 _covariance_matrix[5, 5] = _covariance_matrix[3, 3]
 _COVARIANCE_LIST = _covariance_matrix.flatten().tolist()
 
+_POSE_IMAGE_TOPIC: Final = (
+    f"/{ROS_NAMESPACE}"
+    f'/{ROS_TOPIC_RELATIVE_POSE_IMAGE.replace("~", STEREO_NODE_NAME)}'
+)
+"""Topic of :attr:`.PoseNode.pose_image`"""
+
+_TWIST_IMAGE_TOPIC: Final = (
+    f"/{ROS_NAMESPACE}"
+    f'/{ROS_TOPIC_RELATIVE_TWIST_IMAGE.replace("~", STEREO_NODE_NAME)}'
+)
+"""Topic of :attr:`.PoseNode.twist_image`"""
+
+_T = TypeVar("_T")
+
+_ImageMatches = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+"""Tuple of query image, reference image, DEM, matched query image keypoints and
+matched reference image keypoints"""
+
+
+class _Frame(NamedTuple):
+    """Stereo image passing through the pose estimation pipeline"""
+
+    msg: Union[OrthoStereoImage, MonocularStereoImage]
+    """Stereo image message"""
+
+    qry: np.ndarray
+    """Grayscale query image"""
+
+    ref: np.ndarray
+    """Grayscale reference image"""
+
+    dem: np.ndarray
+    """Reference elevation raster"""
+
+    query_features: Optional[Union[Tuple[torch.Tensor, torch.Tensor], _Features]] = None
+    """Query image keypoints and descriptors, or None if not yet extracted"""
+
+    reference_features: Optional[
+        Union[Tuple[torch.Tensor, torch.Tensor], _Features]
+    ] = None
+    """Reference image keypoints and descriptors, or None if not yet extracted"""
+
+    inference_time: float = 0.0
+    """Deep matching feature extraction time in seconds"""
+
+    operating_point: Optional[OperatingPoint] = None
+    """Deep matching operating point of the query image features, or None if not
+    yet extracted"""
+
+    matches: Optional[Tuple[np.ndarray, np.ndarray]] = None
+    """Matched query and reference image keypoints, or None if not yet matched"""
+
 
 class PoseNode(Node):
     """Estimates camera pose in global (REP 105 ``earth``) and local (REP 103
@@ -71,6 +186,54 @@ class PoseNode(Node):
     solving the PnP problem.
     """
 
+    _ROS_PARAM_DESCRIPTOR_READ_ONLY: Final = ParameterDescriptor(read_only=True)
+    """A read only ROS parameter descriptor"""
+
+    ROS_D_FEATURE_DB_DIR = "~/.cache/gisnav/features"
+    """Default value for :attr:`.feature_db_dir`"""
+
+    ROS_D_VO_ENGINE = "orb"
+    """Default value for :attr:`.vo_engine`"""
+
+    ROS_D_DEEP_MATCHING_WORKERS = 0
+    """Default value for :attr:`.deep_matching_workers`"""
+
+    ROS_D_PIPELINE_QUEUE_SIZE = 1
+    """Default value for :attr:`.pipeline_queue_size`"""
+
+    ROS_D_EXTRACTOR_RUNTIME = "eager"
+    """Default value for :attr:`.extractor_runtime`"""
+
+    ROS_D_MATCHER_RUNTIME = "eager"
+    """Default value for :attr:`.matcher_runtime`"""
+
+    ROS_D_MODEL_DIR = "~/.cache/gisnav/models"
+    """Default value for :attr:`.model_dir`"""
+
+    ROS_D_LATENCY_TARGET_MS = 0.0
+    """Default value for :attr:`.latency_target_ms`"""
+
+    ROS_D_MIN_KEYPOINTS = 256
+    """Default value for :attr:`.min_keypoints`"""
+
+    ROS_D_MAX_DOWNSCALE = 2.0
+    """Default value for :attr:`.max_downscale`"""
+
+    ROS_D_PNP_METHOD = "ransac"
+    """Default value for :attr:`.pnp_method`"""
+
+    ROS_D_LATENCY_INSTRUMENTATION = False
+    """Default value for :attr:`.latency_instrumentation`"""
+
+    ROS_D_TRACING = False
+    """Default value for :attr:`.tracing`"""
+
+    ROS_D_DEBUG_IMAGE_RATE = 0.0
+    """Default value for :attr:`.debug_image_rate`"""
+
+    DIAGNOSTICS_PERIOD = 1.0
+    """Period in seconds at which :attr:`.diagnostics` are published"""
+
     CONFIDENCE_THRESHOLD_SHALLOW_MATCH = 0.9
     """Confidence threshold for filtering out bad keypoint matches for shallow matching
 
@@ -84,38 +247,100 @@ class PoseNode(Node):
     MIN_MATCHES = 30
     """Minimum number of keypoint matches before attempting pose estimation"""
 
+    PNP_MAX_CORRESPONDENCES = 512
+    """Maximum number of keypoint matches used to solve the PnP problem
+
+    > [!NOTE]
+    > Bounds the PnP solve time. The most confident matches are selected evenly
+    > over the query image, see :func:`.bucket_select`.
+    """
+
+    MAX_KEYPOINTS = 1024
+    """Maximum number of keypoints extracted from a query or reference image for deep
+    matching
+
+    > [!NOTE]
+    > Limits the number of features to run faster. More keypoints are extracted from
+    > the orthoimage in proportion to its area so that the reference image still
+    > gets approximately this many keypoints after cropping.
+    """
+
+    REFERENCE_FEATURE_ROTATION_STEP = 30.0
+    """Rotation step in degrees at which reference features are extracted from the
+    orthoimage
+
+    > [!NOTE]
+    > The learned descriptors are not rotation invariant, so the reference features
+    > are extracted from the orthoimage rotated to the nearest multiple of this
+    > step. Smaller steps improve matching at the cost of more frequent extraction.
+    """
+
+    FEATURE_DB_GSD_TOLERANCE = 0.25
+    """Maximum relative difference between the reference image and feature database
+    ground sampling distances for the database features to be used
+    """
+
     class _ScalingBuffer:
-        """Maintains timestamped query frame to world frame scaling in a sliding windown
+        """Maintains timestamped query frame to world frame scaling in a sliding window
         buffer so that shallow matching (VO) pose can be scaled to meters using
         scaling information obtained from deep matching
+
+        The samples are stored in a preallocated ring buffer in which every sample
+        is written twice, :attr:`_WINDOW_LENGTH` apart. The window is then always
+        a contiguous slice of the buffer, and interpolation is a binary search on
+        a view without any allocation.
         """
 
         _WINDOW_LENGTH: Final = 100
 
         def __init__(self):
-            self._scaling_arr: np.ndarray = np.ndarray([])
-            self._timestamp_arr: np.ndarray = np.ndarray([])
+            self._timestamp_arr: np.ndarray = np.zeros(2 * self._WINDOW_LENGTH)
+            self._scaling_arr: np.ndarray = np.zeros(2 * self._WINDOW_LENGTH)
+            self._start = 0
+            self._size = 0
 
         def append(self, timestamp_usec: int, scaling: float) -> None:
-            self._scaling_arr = np.append(self._scaling_arr, scaling)
-            self._timestamp_arr = np.append(self._timestamp_arr, timestamp_usec)
-
-            if self._scaling_arr.size > self._WINDOW_LENGTH:
-                self._scaling_arr[-self._WINDOW_LENGTH :]
-            if self._timestamp_arr.size > self._WINDOW_LENGTH:
-                self._timestamp_arr[-self._WINDOW_LENGTH :]
+            """Appends a scaling sample, the oldest sample is discarded if the
+            window is full
+
+            Samples are expected in timestamp order. An older timestamp than the
+            latest one, e.g. after a simulation reset, clears the buffer.
+            """
+            if self._size > 0:
+                end = self._start + self._size
+                if timestamp_usec < self._timestamp_arr[end - 1]:
+                    self._start, self._size = 0, 0
+
+            index = (self._start + self._size) % self._WINDOW_LENGTH
+            for i in (index, index + self._WINDOW_LENGTH):
+                self._timestamp_arr[i] = timestamp_usec
+                self._scaling_arr[i] = scaling
+
+            if self._size < self._WINDOW_LENGTH:
+                self._size += 1
+            else:
+                self._start = (self._start + 1) % self._WINDOW_LENGTH
 
         def interpolate(self, timestamp_usec: int) -> Optional[float]:
-            if self._scaling_arr.size < 2:
+            """Returns the scaling linearly interpolated at the timestamp, or
+            linearly extrapolated from the first or last two samples if the
+            timestamp is outside the window
+
+            :return: Scaling, or None if there are less than two samples
+            """
+            if self._size < 2:
                 return None
 
-            interp_function = interp1d(
-                self._timestamp_arr,
-                self._scaling_arr,
-                kind="linear",
-                fill_value="extrapolate",
-            )
-            return interp_function(timestamp_usec)
+            end = self._start + self._size
+            timestamps = self._timestamp_arr[self._start : end]
+            i = int(np.searchsorted(timestamps, timestamp_usec))
+            i = min(max(i, 1), self._size - 1) + self._start
+
+            t0, t1 = self._timestamp_arr[i - 1], self._timestamp_arr[i]
+            s0, s1 = self._scaling_arr[i - 1], self._scaling_arr[i]
+            if t1 == t0:
+                return float(s1)
+            return float(s0 + (s1 - s0) * (timestamp_usec - t0) / (t1 - t0))
 
     def __init__(self, *args, **kwargs):
         """Class initializer
@@ -126,37 +351,65 @@ class PoseNode(Node):
         super().__init__(*args, **kwargs)
         self._device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
 
+        # Per stage latency histograms published in diagnostics if enabled
+        self._stage_timer = StageTimer(bool(self.latency_instrumentation))
+
+        # Stereo image ingress and pose and twist egress for end-to-end tracing
+        self._tracer = Tracer(self, self.trace_event, bool(self.tracing))
+
         # Initialize DL model for map matching (noisy global position, no drift)
-        self._matcher = (
-            LightGlueMatcher(
-                "disk",
-                params={
-                    "filter_threshold": self.CONFIDENCE_THRESHOLD_DEEP_MATCH,
-                    "depth_confidence": -1,
-                    "width_confidence": -1,
-                },
-            )
-            .to(self._device)
-            .eval()
+        self._deep_matcher = self._create_deep_matcher(
+            self.extractor_runtime, self.matcher_runtime
+        )
+        self._latency_controller = self._create_latency_controller(
+            self.latency_target_ms, self.min_keypoints, self.max_downscale
+        )
+        self._reference_features: FeatureCache[
+            Tuple[torch.Tensor, torch.Tensor, np.ndarray]
+        ] = FeatureCache()
+        self._feature_db: Optional[FeatureDatabase] = self._open_feature_db(
+            self.feature_db_dir
         )
-        self._extractor = DISK.from_pretrained("depth").to(self._device)
 
-        # Initialize ORB detector and brute force matcher for VO
+        # Initialize shallow matching engine for VO
         # (smooth relative position with drift)
-        self._orb = cv2.ORB_create()
-        self._bf = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=False)
+        self._shallow_matcher: ShallowMatcher = self._create_shallow_matcher(
+            self.vo_engine
+        )
+
+        # Per camera frame caches, a frame is needed as the query image of the
+        # current pose and twist images and as the reference image of the next
+        # twist image
+        self._frame_images: FeatureCache[np.ndarray] = FeatureCache(2)
+        self._frame_deep_features: FeatureCache[
+            Tuple[torch.Tensor, torch.Tensor]
+        ] = FeatureCache(2)
+        self._frame_shallow_features: FeatureCache[_Features] = FeatureCache(2)
+
+        # Optional deep matching worker processes, the poses are published in
+        # frame order from the reorder buffer
+        self._deep_matching_pool: Optional[
+            DeepMatchingPool
+        ] = self._create_deep_matching_pool(self.deep_matching_workers)
+        self._pending_poses: ReorderBuffer[
+            Tuple[OrthoStereoImage, np.ndarray, np.ndarray, np.ndarray]
+        ] = ReorderBuffer(
+            len(self._deep_matching_pool) if self._deep_matching_pool else 1
+        )
+        self._deferred_pose_image: Optional[OrthoStereoImage] = None
 
         self._cv_bridge = CvBridge()
 
         # initialize subscriptions
+        self.orthoimage
         self.camera_info
         self.pose_image
         self.twist_image
         self.time_reference
 
         # initialize publishers (for launch tests)
-        self.pose
-        # TODO method does not support none input
+        # TODO methods do not support none input
+        self.pose(None)
         self.camera_optical_twist_in_camera_optical_frame(None)
 
         self._tf_buffer = tf2_ros.Buffer()
@@ -172,6 +425,438 @@ class PoseNode(Node):
 
         self._scaling_buffer = self._ScalingBuffer()
 
+        self._pnp_solver = self._create_pnp_solver(self.pnp_method)
+        self._pnp_statistics: Dict[type, Dict[str, float]] = {}
+
+        # Optional debug images, rendered in their own thread
+        self._debug_renderer: Optional[DebugRenderer] = self._create_debug_renderer(
+            self.debug_image_rate
+        )
+
+        # Inference workers, started last when the node is fully initialized
+        self._pipeline = Pipeline(
+            (
+                ("decode", self._decode_stage),
+                ("extract", self._extract_stage),
+                ("match", self._match_stage),
+                ("pnp", self._pnp_stage),
+            ),
+            queue_size=self.pipeline_queue_size or self.ROS_D_PIPELINE_QUEUE_SIZE,
+            on_error=self._pipeline_error,
+            name="pose_node",
+        )
+        self._pipeline.start()
+        self._inference_queue = LatestWorkQueue(
+            self._infer, on_error=self._infer_error, name="pose_node_inference"
+        )
+        self._inference_queue.start()
+
+        self.diagnostics
+        self._diagnostics_timer = self.create_timer(
+            self.DIAGNOSTICS_PERIOD, lambda: self.diagnostics
+        )
+
+    def destroy_node(self) -> None:
+        """Stops the inference workers before destroying the node"""
+        self._inference_queue.stop()
+        self._pipeline.stop()
+        if self._debug_renderer is not None:
+            self._debug_renderer.stop()
+        if self._deep_matching_pool is not None:
+            self._deep_matching_pool.close()
+        super().destroy_node()
+
+    @property
+    @ROS.parameter(ROS_D_FEATURE_DB_DIR, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
+    def feature_db_dir(self) -> Optional[str]:
+        """ROS parameter for the mission area feature database directory, or an
+        empty string to disable the feature database
+
+        The database is used if it has been built with the ``build_feature_db``
+        tool.
+        """
+
+    @property
+    @ROS.parameter(ROS_D_VO_ENGINE, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
+    def vo_engine(self) -> Optional[str]:
+        """ROS parameter for the visual odometry (VO) engine, either ``orb`` for ORB
+        feature matching or ``klt`` for Lucas-Kanade optical flow keypoint tracking
+        """
+
+    def _create_shallow_matcher(self, engine: Optional[str]) -> ShallowMatcher:
+        """Returns the shallow matching engine for visual odometry
+
+        :param engine: Visual odometry engine type, ``orb`` or ``klt``
+        :return: The :class:`.ShallowMatcher` instance
+        """
+        if engine == "klt":
+            self.get_logger().info("Using optical flow keypoint tracking for VO.")
+            return KLTTracker()
+        elif engine != "orb":
+            self.get_logger().error(
+                f"Unsupported VO engine {engine}, falling back to ORB."
+            )
+        return ORBMatcher(self.CONFIDENCE_THRESHOLD_SHALLOW_MATCH)
+
+    @property
+    @ROS.parameter(
+        ROS_D_DEEP_MATCHING_WORKERS, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY
+    )
+    def deep_matching_workers(self) -> Optional[int]:
+        """ROS parameter for the number of deep matching worker processes, or 0 to
+        match in the node process
+
+        > [!NOTE]
+        > The workers run on the CPU and are intended for many-core CPU-only
+        > computers. Each worker loads its own model instance and is pinned to its
+        > own subset of the available cores.
+        """
+
+    @property
+    @ROS.parameter(ROS_D_EXTRACTOR_RUNTIME, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
+    def extractor_runtime(self) -> Optional[str]:
+        """ROS parameter for the deep matching feature extractor runtime, one of
+        ``eager``, ``torchscript``, ``compile`` or ``onnx``
+
+        > [!NOTE]
+        > The ``torchscript`` and ``onnx`` runtimes require the models to be
+        > exported into :attr:`.model_dir` with the ``export_deep_matching_models``
+        > tool. The ``onnx`` runtime is CPU only.
+        """
+
+    @property
+    @ROS.parameter(ROS_D_MATCHER_RUNTIME, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
+    def matcher_runtime(self) -> Optional[str]:
+        """ROS parameter for the deep matching keypoint matcher runtime, one of
+        ``eager``, ``compile`` or ``int8``
+
+        > [!NOTE]
+        > The ``int8`` runtime is CPU only.
+        """
+
+    @property
+    @ROS.parameter(ROS_D_MODEL_DIR, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
+    def model_dir(self) -> Optional[str]:
+        """ROS parameter for the directory of the exported deep matching models"""
+
+    def _create_deep_matcher(
+        self, extractor_runtime: Optional[str], matcher_runtime: Optional[str]
+    ) -> DeepMatcher:
+        """Returns the deep matching engine
+
+        :param extractor_runtime: Feature extractor runtime
+        :param matcher_runtime: Keypoint matcher runtime
+        :return: The :class:`.DeepMatcher` instance, with eager mode runtimes if
+            the requested runtimes are not available
+        """
+        extractor_runtime = extractor_runtime or self.ROS_D_EXTRACTOR_RUNTIME
+        matcher_runtime = matcher_runtime or self.ROS_D_MATCHER_RUNTIME
+        try:
+            deep_matcher = DeepMatcher(
+                self._device,
+                self.CONFIDENCE_THRESHOLD_DEEP_MATCH,
+                self.MAX_KEYPOINTS,
+                extractor_runtime=extractor_runtime,
+                matcher_runtime=matcher_runtime,
+                model_dir=self.model_dir,
+            )
+            self.get_logger().info(
+                f"Using {extractor_runtime} extractor and {matcher_runtime} matcher "
+                f"runtimes for deep matching."
+            )
+            return deep_matcher
+        except (ImportError, OSError, ValueError) as e:
+            self.get_logger().error(
+                f"Could not create {extractor_runtime} extractor and "
+                f"{matcher_runtime} matcher runtimes, falling back to eager mode: {e}"
+            )
+            return DeepMatcher(
+                self._device, self.CONFIDENCE_THRESHOLD_DEEP_MATCH, self.MAX_KEYPOINTS
+            )
+
+    @property
+    @ROS.parameter(ROS_D_LATENCY_TARGET_MS, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
+    def latency_target_ms(self) -> Optional[float]:
+        """ROS parameter for the target deep matching inference latency in
+        milliseconds, or 0 to always match at full quality
+
+        > [!NOTE]
+        > The keypoint budget, input downscale factor and LightGlue early exit are
+        > adjusted online within :attr:`.min_keypoints` and :attr:`.max_downscale`
+        > to keep the latency near the target. The current operating point is
+        > published in :attr:`.diagnostics`.
+        """
+
+    @property
+    @ROS.parameter(ROS_D_MIN_KEYPOINTS, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
+    def min_keypoints(self) -> Optional[int]:
+        """ROS parameter for the lower bound of the adaptive deep matching keypoint
+        budget
+        """
+
+    @property
+    @ROS.parameter(ROS_D_MAX_DOWNSCALE, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
+    def max_downscale(self) -> Optional[float]:
+        """ROS parameter for the upper bound of the adaptive deep matching input
+        downscale factor
+
+        > [!NOTE]
+        > Precomputed reference features are not downscaled, so large factors
+        > increase the scale difference between the query and reference features.
+        """
+
+    def _create_latency_controller(
+        self,
+        latency_target_ms: Optional[float],
+        min_keypoints: Optional[int],
+        max_downscale: Optional[float],
+    ) -> LatencyController:
+        """Returns the deep matching operating point controller
+
+        :param latency_target_ms: Target inference latency in milliseconds
+        :param min_keypoints: Lower bound of the keypoint budget
+        :param max_downscale: Upper bound of the input downscale factor
+        :return: The :class:`.LatencyController` instance, disabled if the target
+            or the bounds are invalid
+        """
+        latency_target_ms = latency_target_ms or 0.0
+        min_keypoints = min_keypoints or self.ROS_D_MIN_KEYPOINTS
+        max_downscale = max_downscale or self.ROS_D_MAX_DOWNSCALE
+        if not 0 < min_keypoints <= self.MAX_KEYPOINTS or max_downscale < 1:
+            self.get_logger().error(
+                f"Invalid adaptive deep matching bounds {min_keypoints} keypoints "
+                f"and {max_downscale} downscale, matching at full quality."
+            )
+            latency_target_ms = 0.0
+            min_keypoints, max_downscale = self.MAX_KEYPOINTS, 1.0
+
+        if latency_target_ms > 0:
+            self.get_logger().info(
+                f"Adapting deep matching to {latency_target_ms} ms target latency."
+            )
+        return LatencyController(
+            latency_target_ms / 1000,
+            operating_points(self.MAX_KEYPOINTS, min_keypoints, max_downscale),
+        )
+
+    def _update_latency(self, latency: float) -> None:
+        """Updates the deep matching operating point controller with the measured
+        inference latency of a frame
+        """
+        if self._latency_controller.update(latency):
+            self.get_logger().debug(
+                f"Deep matching operating point changed to "
+                f"{self._latency_controller.operating_point}."
+            )
+
+    @property
+    @ROS.parameter(ROS_D_PNP_METHOD, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
+    def pnp_method(self) -> Optional[str]:
+        """ROS parameter for the robust PnP method, one of ``ransac``, ``usac``,
+        ``usac_accurate`` or ``usac_magsac``
+        """
+
+    def _create_pnp_solver(self, method: Optional[str]) -> PnPSolver:
+        """Returns the PnP solver
+
+        :param method: Robust PnP method
+        :return: The :class:`.PnPSolver` instance
+        """
+        try:
+            return PnPSolver(
+                method or self.ROS_D_PNP_METHOD, self.PNP_MAX_CORRESPONDENCES
+            )
+        except ValueError as e:
+            self.get_logger().error(f"{e} Falling back to RANSAC.")
+            return PnPSolver("ransac", self.PNP_MAX_CORRESPONDENCES)
+
+    @property
+    @ROS.parameter(
+        ROS_D_LATENCY_INSTRUMENTATION, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY
+    )
+    def latency_instrumentation(self) -> Optional[bool]:
+        """ROS parameter to time the preprocess, extract, process and postprocess
+        stages of pose and twist estimation and publish their latency percentiles
+        in :attr:`.diagnostics`
+        """
+
+    @property
+    @ROS.parameter(ROS_D_TRACING, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
+    def tracing(self) -> Optional[bool]:
+        """ROS parameter to publish the ingress and egress times of the traced
+        camera frames in :meth:`.trace_event`
+        """
+
+    @ROS.publish(
+        ROS_TOPIC_TRACE,
+        QoSPresetProfiles.SYSTEM_DEFAULT.value,
+    )
+    def trace_event(self, event: TraceEvent) -> Optional[TraceEvent]:
+        """Outgoing latency trace event, published only if :attr:`.tracing` is
+        enabled
+        """
+        return event
+
+    @property
+    @ROS.parameter(ROS_D_DEBUG_IMAGE_RATE, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
+    def debug_image_rate(self) -> Optional[float]:
+        """ROS parameter for the maximum rate in Hz at which the keypoint match
+        debug images are published, or 0 to disable the debug images
+
+        > [!NOTE]
+        > The debug images are published in :meth:`.pose_matches_image` and
+        > :meth:`.twist_matches_image`. Nothing is copied or rendered when they
+        > are disabled.
+        """
+
+    def _create_debug_renderer(
+        self, debug_image_rate: Optional[float]
+    ) -> Optional[DebugRenderer]:
+        """Returns the started debug image renderer, or None if disabled
+
+        :param debug_image_rate: Maximum debug image rate in Hz
+        :return: The :class:`.DebugRenderer` instance, or None
+        """
+        if not debug_image_rate or debug_image_rate <= 0:
+            return None
+
+        self.get_logger().info(
+            f"Publishing debug images at up to {debug_image_rate} Hz."
+        )
+        debug_renderer = DebugRenderer(
+            self._publish_debug_image,
+            debug_image_rate,
+            on_error=lambda kind, e: self.get_logger().error(
+                f"Could not render {kind.__name__} debug image: {e}"
+            ),
+            name="pose_node_debug",
+        )
+        debug_renderer.start()
+        return debug_renderer
+
+    def _submit_debug_image(
+        self,
+        msg: Union[OrthoStereoImage, MonocularStereoImage],
+        qry: np.ndarray,
+        ref: np.ndarray,
+        mkp_qry: np.ndarray,
+        mkp_ref: np.ndarray,
+        r: np.ndarray,
+        t: np.ndarray,
+    ) -> None:
+        """Submits the keypoint match debug image of the stereo image for
+        rendering, see :func:`.draw_matches`
+        """
+        assert self._debug_renderer is not None
+        camera_info = self.camera_info
+        if camera_info is None:
+            return
+        k = camera_info.k.reshape((3, 3))
+        header = msg.query.header
+
+        def _render() -> Image:
+            image = self._cv_bridge.cv2_to_imgmsg(
+                draw_matches(qry, ref, mkp_qry, mkp_ref, k, r, t), encoding="bgr8"
+            )
+            image.header = header
+            return image
+
+        self._debug_renderer.submit(type(msg), _render)
+
+    def _publish_debug_image(self, kind: type, image: Image) -> None:
+        """Publishes a rendered debug image, called from the rendering thread"""
+        if kind is OrthoStereoImage:
+            self.pose_matches_image(image)
+        else:
+            self.twist_matches_image(image)
+
+    @ROS.publish(
+        ROS_TOPIC_RELATIVE_POSE_MATCHES_IMAGE,
+        QoSPresetProfiles.SENSOR_DATA.value,
+    )
+    def pose_matches_image(self, image: Image) -> Optional[Image]:
+        """Debug image of the deep matching keypoint matches, with the camera
+        field of view and position drawn on the reference image
+
+        :param image: Rendered debug image
+        """
+        return image
+
+    @ROS.publish(
+        ROS_TOPIC_RELATIVE_TWIST_MATCHES_IMAGE,
+        QoSPresetProfiles.SENSOR_DATA.value,
+    )
+    def twist_matches_image(self, image: Image) -> Optional[Image]:
+        """Debug image of the shallow matching (VO) keypoint matches, with the
+        camera field of view and principal point drawn on the previous frame
+
+        :param image: Rendered debug image
+        """
+        return image
+
+    @property
+    @ROS.parameter(
+        ROS_D_PIPELINE_QUEUE_SIZE, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY
+    )
+    def pipeline_queue_size(self) -> Optional[int]:
+        """ROS parameter for the maximum number of frames waiting in front of each
+        pose estimation pipeline stage
+
+        > [!NOTE]
+        > Larger queues smooth out variation in stage latency at the cost of higher
+        > end-to-end latency. See the stage queue depths and latencies in
+        > :attr:`.diagnostics` when tuning.
+        """
+
+    def _create_deep_matching_pool(
+        self, workers: Optional[int]
+    ) -> Optional[DeepMatchingPool]:
+        """Returns the deep matching worker pool, or None if disabled
+
+        :param workers: Number of worker processes
+        :return: The :class:`.DeepMatchingPool` instance, or None
+        """
+        if not workers:
+            return None
+        elif workers < 0:
+            self.get_logger().error(
+                f"Invalid number of deep matching workers {workers}, matching in "
+                f"the node process."
+            )
+            return None
+
+        self.get_logger().info(f"Starting {workers} deep matching worker processes.")
+        return DeepMatchingPool(
+            workers,
+            self.CONFIDENCE_THRESHOLD_DEEP_MATCH,
+            self.MAX_KEYPOINTS,
+            extractor_runtime=self.extractor_runtime or self.ROS_D_EXTRACTOR_RUNTIME,
+            matcher_runtime=self.matcher_runtime or self.ROS_D_MATCHER_RUNTIME,
+            model_dir=self.model_dir,
+        )
+
+    @narrow_types
+    def _open_feature_db(self, path: str) -> Optional[FeatureDatabase]:
+        """Returns the mission area feature database, or None if it has not been
+        built or cannot be opened
+
+        :param path: Feature database directory, or an empty string to disable the
+            feature database
+        :return: The :class:`.FeatureDatabase` instance, or None
+        """
+        if not path or not FeatureDatabase.exists(path):
+            return None
+
+        try:
+            feature_db = FeatureDatabase(path)
+            self.get_logger().info(f"Using mission area feature database at {path}.")
+            return feature_db
+        except (OSError, ValueError) as e:
+            self.get_logger().error(
+                f"Could not open mission area feature database at {path}: {e}"
+            )
+            return None
+
     def _set_initial_pose(self, pose):
         if not self._pose_sent:
             self._set_pose_request.pose = pose
@@ -194,25 +879,293 @@ class PoseNode(Node):
     def camera_info(self) -> Optional[CameraInfo]:
         """Camera info including the intrinsics matrix, or None if unknown"""
 
-    def _pose_image_cb(self, msg: Image) -> None:
+    @property
+    @ROS.subscribe(
+        f"/{ROS_NAMESPACE}"
+        f'/{ROS_TOPIC_RELATIVE_ORTHOIMAGE.replace("~", GIS_NODE_NAME)}',
+        QoSPresetProfiles.SENSOR_DATA.value,
+    )
+    def orthoimage(self) -> Optional[OrthoImage]:
+        """Unrotated orthoimage from :class:`.GISNode` that reference features are
+        extracted from, or None if unknown
+        """
+
+    def _pose_image_cb(self, msg: OrthoStereoImage) -> None:
         """Callback for :attr:`.pose_image` message"""
-        pose = self.pose
-        if pose is not None:
-            # TODO: need to set via FCU EKF since VO might already be publishing to
-            #  EKF node
-            self._set_initial_pose(pose)
+        self._tracer.ingress(_POSE_IMAGE_TOPIC, msg.query.header.stamp, msg.trace_id)
+        if self._inference_queue.put(OrthoStereoImage, msg):
+            self.get_logger().debug(
+                f"Dropped stale pose image, "
+                f"{self._inference_queue.dropped[OrthoStereoImage]} dropped in total."
+            )
 
-    def _twist_image_cb(self, msg: Image) -> None:
+    def _twist_image_cb(self, msg: MonocularStereoImage) -> None:
         """Callback for :attr:`.twist_image` message"""
-        self.camera_optical_twist_in_camera_optical_frame(self.twist_image)
+        self._tracer.ingress(_TWIST_IMAGE_TOPIC, msg.query.header.stamp, msg.trace_id)
+        if self._inference_queue.put(MonocularStereoImage, msg):
+            self.get_logger().debug(
+                f"Dropped stale twist image, "
+                f"{self._inference_queue.dropped[MonocularStereoImage]} dropped in "
+                f"total."
+            )
+
+    def _infer(
+        self, kind: type, msg: Union[OrthoStereoImage, MonocularStereoImage]
+    ) -> None:
+        """Estimates and publishes the pose or twist from a stereo image, called
+        from the inference worker thread
+
+        :param kind: Stereo image message type
+        :param msg: Latest stereo image of the type
+        """
+        if kind is DeepMatchingPool:
+            self._publish_pool_poses()
+        elif kind is OrthoStereoImage and self._deep_matching_pool is not None:
+            if self._pending_poses.full():
+                # All workers are busy, submit when the next worker is done
+                if self._deferred_pose_image is not None:
+                    self.get_logger().debug(
+                        "Dropped stale pose image, all deep matching workers busy."
+                    )
+                self._deferred_pose_image = msg
+            else:
+                self._submit_pose(msg)
+        else:
+            # Blocks while the first stage queue is full, newer frames meanwhile
+            # replace each other in the work queue
+            self._pipeline.put(msg)
+
+    def _infer_error(self, kind: type, e: Exception) -> None:
+        """Logs an exception raised by :meth:`._infer`"""
+        self.get_logger().error(f"Could not process {kind.__name__}: {e}")
+
+    def _pipeline_error(self, stage: str, e: Exception) -> None:
+        """Logs an exception raised by a pose estimation pipeline stage"""
+        self.get_logger().error(f"Pose estimation {stage} stage failed: {e}")
+
+    def _decode_stage(
+        self, msg: Union[OrthoStereoImage, MonocularStereoImage]
+    ) -> _Frame:
+        """Decodes the stereo image and looks up precomputed reference features
+        for deep matching
+        """
+        qry, ref, dem = self._preprocess(msg)
+        reference_features = (
+            self._reference_features(msg, ref.shape[:2])
+            if isinstance(msg, OrthoStereoImage)
+            else None
+        )
+        return _Frame(msg, qry, ref, dem, reference_features=reference_features)
+
+    def _extract_stage(self, frame: _Frame) -> _Frame:
+        """Extracts the query image features, and the reference image features for
+        shallow matching
+
+        The features of a camera frame are extracted only once, see
+        :meth:`._frame_cached`.
+        """
+        if isinstance(frame.msg, MonocularStereoImage):
+            with self._stage_timer.time("MonocularStereoImage", "extract"):
+                query_features = self._frame_cached(
+                    self._frame_shallow_features,
+                    frame.msg.query.header,
+                    lambda: self._shallow_matcher.detect(frame.qry),
+                )
+                # Previous frame, features already extracted as the previous query
+                reference_features = self._frame_cached(
+                    self._frame_shallow_features,
+                    frame.msg.reference.header,
+                    lambda: self._shallow_matcher.detect(frame.ref),
+                )
+            return frame._replace(
+                query_features=query_features, reference_features=reference_features
+            )
+        else:
+            # The frame is matched at the operating point its features are
+            # extracted at, even if the controller moves on in the meantime
+            operating_point = self._latency_controller.operating_point
+            start = time.monotonic()
+            query_features = self._frame_cached(
+                self._frame_deep_features,
+                frame.msg.query.header,
+                lambda: self._deep_matcher.extract(
+                    frame.qry, operating_point.max_keypoints, operating_point.downscale
+                ),
+            )
+            inference_time = time.monotonic() - start
+            self._stage_timer.record(("OrthoStereoImage", "extract"), inference_time)
+            return frame._replace(
+                query_features=query_features,
+                inference_time=inference_time,
+                operating_point=operating_point,
+            )
+
+    def _match_stage(self, frame: _Frame) -> _Frame:
+        """Matches the query and reference image keypoints
+
+        The deep matching inference latency is fed to the operating point
+        controller.
+        """
+        shallow_inference = isinstance(frame.msg, MonocularStereoImage)
+        start = time.monotonic()
+        matches = self._process(
+            frame.qry,
+            frame.ref,
+            shallow_inference=shallow_inference,
+            query_features=frame.query_features,
+            reference_features=frame.reference_features,
+            operating_point=frame.operating_point,
+        )
+        if not shallow_inference:
+            self._update_latency(frame.inference_time + time.monotonic() - start)
+        return frame._replace(matches=matches)
+
+    def _pnp_stage(self, frame: _Frame) -> None:
+        """Estimates and publishes the pose or twist from the keypoint matches"""
+        assert frame.matches is not None
+        matches = (frame.qry, frame.ref, frame.dem, *frame.matches)
+        if isinstance(frame.msg, OrthoStereoImage):
+            self._publish_pose(frame.msg, matches)
+        elif (
+            self.camera_optical_twist_in_camera_optical_frame(frame.msg, matches)
+            is not None
+        ):
+            self._tracer.egress(
+                _TWIST_IMAGE_TOPIC,
+                ROS_TOPIC_RELATIVE_QUERY_TWIST,
+                frame.msg.query.header.stamp,
+            )
 
     @property
+    @ROS.publish(
+        ROS_TOPIC_RELATIVE_DIAGNOSTICS,
+        QoSPresetProfiles.SYSTEM_DEFAULT.value,
+    )
+    def diagnostics(self) -> Optional[DiagnosticArray]:
+        """Outgoing diagnostics including the queue depth and latency of each pose
+        estimation pipeline stage, the latency percentiles of the instrumented
+        stages if enabled, the deep matching operating point, the inlier
+        statistics of the latest PnP solutions, and the number of stale frames
+        dropped by the inference work queue
+        """
+        diagnostics = DiagnosticArray()
+        diagnostics.header = tf_.create_header(self)
+        for stage, statistics in self._pipeline.statistics().items():
+            diagnostics.status.append(
+                tf_.create_diagnostic_status(
+                    f"{self.get_name()}: pipeline {stage} stage",
+                    self.get_name(),
+                    statistics,
+                )
+            )
+        diagnostics.status.append(
+            tf_.create_diagnostic_status(
+                f"{self.get_name()}: deep matching operating point",
+                self.get_name(),
+                self._latency_controller.statistics(),
+            )
+        )
+        for stage, statistics in self._stage_timer.statistics().items():
+            diagnostics.status.append(
+                tf_.create_diagnostic_status(
+                    f"{self.get_name()}: {stage} latency [s]",
+                    self.get_name(),
+                    statistics,
+                )
+            )
+        for kind, statistics in list(self._pnp_statistics.items()):
+            diagnostics.status.append(
+                tf_.create_diagnostic_status(
+                    f"{self.get_name()}: {kind.__name__} PnP",
+                    self.get_name(),
+                    statistics,
+                )
+            )
+        diagnostics.status.append(
+            tf_.create_diagnostic_status(
+                f"{self.get_name()}: inference queue",
+                self.get_name(),
+                {
+                    f"{kind.__name__}_{key}": value
+                    for kind, statistics in self._inference_queue.statistics().items()
+                    for key, value in statistics.items()
+                },
+            )
+        )
+        return diagnostics
+
+    def _publish_pose(
+        self, msg: OrthoStereoImage, matches: Optional[_ImageMatches] = None
+    ) -> None:
+        """Publishes the pose and sets the initial pose of the EKF
+
+        :param msg: Stereo image from :attr:`.pose_image`
+        :param matches: Optional precomputed keypoint matches
+        """
+        pose = self.pose(msg, matches)
+        if pose is not None:
+            self._tracer.egress(
+                _POSE_IMAGE_TOPIC, ROS_TOPIC_RELATIVE_POSE, msg.query.header.stamp
+            )
+            # TODO: need to set via FCU EKF since VO might already be publishing
+            #  to EKF node
+            self._set_initial_pose(pose)
+
+    def _submit_pose(self, msg: OrthoStereoImage) -> None:
+        """Submits the stereo image to the deep matching worker pool
+
+        :meth:`._publish_pool_poses` is scheduled on the inference worker thread
+        when the matches are ready.
+        """
+        assert self._deep_matching_pool is not None
+        qry, ref, dem = self._preprocess(msg)
+        reference_features = self._reference_features(msg, ref.shape[:2])
+        future = self._deep_matching_pool.submit(
+            qry,
+            ref,
+            None
+            if reference_features is None
+            else (
+                reference_features[0].cpu().numpy(),
+                reference_features[1].cpu().numpy(),
+            ),
+            self._latency_controller.operating_point,
+        )
+        self._pending_poses.push(future, (msg, qry, ref, dem))
+        submitted = time.monotonic()
+
+        def _done(future: "Future[Tuple[np.ndarray, np.ndarray]]") -> None:
+            if not future.cancelled() and future.exception() is None:
+                self._update_latency(time.monotonic() - submitted)
+            self._inference_queue.put(DeepMatchingPool, None)
+
+        future.add_done_callback(_done)
+
+    def _publish_pool_poses(self) -> None:
+        """Publishes the poses of the deep matching worker pool results in frame
+        order, and submits the deferred stereo image if a worker became available
+        """
+        for future, (msg, qry, ref, dem) in self._pending_poses.pop_ready():
+            try:
+                matches = future.result()
+            except Exception as e:
+                self.get_logger().error(f"Deep matching worker failed: {e}")
+                continue
+            # PnP stage publishes the pose in the same thread as the twist
+            self._pipeline.put(_Frame(msg, qry, ref, dem, matches=matches), "pnp")
+
+        if self._deferred_pose_image is not None and not self._pending_poses.full():
+            msg, self._deferred_pose_image = self._deferred_pose_image, None
+            self._submit_pose(msg)
+
     @ROS.publish(
         ROS_TOPIC_RELATIVE_POSE,
         QoSPresetProfiles.SENSOR_DATA.value,
     )
     @ROS.transform(child_frame_id="camera_optical")
-    def pose(self) -> Optional[PoseWithCovarianceStamped]:
+    def pose(
+        self, msg: OrthoStereoImage, matches: Optional[_ImageMatches] = None
+    ) -> Optional[PoseWithCovarianceStamped]:
         """Camera pose in :term:`REP 105` ``earth`` frame
 
         This represents the global 3D position and orientation of the ``camera_optical``
@@ -220,42 +1173,59 @@ class PoseNode(Node):
         matching and is a discontinuous estimate of pose. It is intended to be fused
         with and complement the continous or smooth twist estimate obtained via
         shallow matching or visual odometry (VO).
+
+        :param msg: Stereo image from :attr:`.pose_image`
+        :param matches: Optional precomputed keypoint matches, computed from the
+            stereo image if not provided
         """
-        return self._get_pose(self.pose_image)
+        return self._get_pose(msg, matches)
+
+    def _reference_features(
+        self, msg: OrthoStereoImage, shape: Tuple[int, int]
+    ) -> Optional[Tuple[torch.Tensor, torch.Tensor]]:
+        """Returns precomputed deep matching reference features from the feature
+        database or from the per orthoimage cache, or None if not available
+        """
+        reference_features = self._database_reference_features(msg, shape)
+        if reference_features is None:
+            reference_features = self._cached_reference_features(msg, shape)
+        return reference_features
+
+    def _match(
+        self, msg: Union[OrthoStereoImage, MonocularStereoImage]
+    ) -> _ImageMatches:
+        """Returns the keypoint matches of the stereo image
+
+        Runs the pipeline stages serially in the calling thread.
+
+        :param msg: Stereo image
+        :return: Tuple of query image, reference image, DEM, and matched keypoints
+        """
+        frame = self._match_stage(self._extract_stage(self._decode_stage(msg)))
+        assert frame.matches is not None
+        return (frame.qry, frame.ref, frame.dem, *frame.matches)
 
     @narrow_types
     def _get_pose(
-        self, msg: Union[OrthoStereoImage, MonocularStereoImage]
+        self,
+        msg: Union[OrthoStereoImage, MonocularStereoImage],
+        matches: Optional[_ImageMatches] = None,
     ) -> Optional[PoseWithCovarianceStamped]:
-        qry, ref, dem = self._preprocess(msg)
-        mkp_qry, mkp_ref = self._process(qry, ref)
-        shallow_inference = isinstance(msg, MonocularStereoImage)
-        pose = self._postprocess(
-            mkp_qry,
-            mkp_ref,
-            dem,
-            qry,
-            ref,
-            "Shallow match / relative position (VO)"
-            if shallow_inference
-            else "Deep match / absolute global position (GIS)",
+        qry, ref, dem, mkp_qry, mkp_ref = (
+            self._match(msg) if matches is None else matches
         )
+        pose = self._postprocess(mkp_qry, mkp_ref, dem, type(msg))
         if pose is None:
             return None
         r, t = pose
 
+        if self._debug_renderer is not None:
+            self._submit_debug_image(msg, qry, ref, mkp_qry, mkp_ref, r, t)
+
         r_inv = r.T
 
         camera_optical_position_in_world = -r_inv @ t
 
-        tf_.visualize_camera_position(
-            ref.copy(),
-            camera_optical_position_in_world,
-            f"Camera {'principal point' if shallow_inference else 'position'} "
-            f"in {'previous' if shallow_inference else 'world'} frame, "
-            f"{'shallow' if shallow_inference else 'deep'} inference",
-        )
-
         if isinstance(msg, MonocularStereoImage):
             scaling = self._scaling_buffer.interpolate(
                 tf_.usec_from_header(msg.query.header)
@@ -326,9 +1296,14 @@ class PoseNode(Node):
     )
     @narrow_types
     def camera_optical_twist_in_camera_optical_frame(
-        self, msg: MonocularStereoImage
+        self, msg: MonocularStereoImage, matches: Optional[_ImageMatches] = None
     ) -> Optional[TwistWithCovarianceStamped]:
-        """REP 105 ``camera_optical`` frame twist in its intrisic frame"""
+        """REP 105 ``camera_optical`` frame twist in its intrisic frame
+
+        :param msg: Stereo image from :attr:`.twist_image`
+        :param matches: Optional precomputed keypoint matches, computed from the
+            stereo image if not provided
+        """
         scaling = self._scaling_buffer.interpolate(
             tf_.usec_from_header(msg.query.header)
         )
@@ -342,7 +1317,7 @@ class PoseNode(Node):
         )  # todo do not hard code
         previous_pose = tf_.create_identity_pose_stamped(x, y, z)
         previous_pose.header = msg.reference.header
-        current_pose = self._get_pose(msg)
+        current_pose = self._get_pose(msg, matches)
         if current_pose is not None:
             return tf_.poses_to_twist(current_pose, previous_pose)
         else:
@@ -350,8 +1325,7 @@ class PoseNode(Node):
 
     @property
     @ROS.subscribe(
-        f"/{ROS_NAMESPACE}"
-        f'/{ROS_TOPIC_RELATIVE_POSE_IMAGE.replace("~", STEREO_NODE_NAME)}',
+        _POSE_IMAGE_TOPIC,
         QoSPresetProfiles.SENSOR_DATA.value,
         callback=_pose_image_cb,
     )
@@ -365,8 +1339,7 @@ class PoseNode(Node):
     @property
     # @ROS.max_delay_ms(DELAY_DEFAULT_MS)
     @ROS.subscribe(
-        f"/{ROS_NAMESPACE}"
-        f'/{ROS_TOPIC_RELATIVE_TWIST_IMAGE.replace("~", STEREO_NODE_NAME)}',
+        _TWIST_IMAGE_TOPIC,
         QoSPresetProfiles.SENSOR_DATA.value,
         callback=_twist_image_cb,
     )
@@ -386,175 +1359,274 @@ class PoseNode(Node):
         :param stereo_image: A GISNav format stereo image message
         :return: A 3-tuple/triplet of query image, reference image, and DEM rasters
         """
-        # Convert the ROS Image message to an OpenCV image
-        if isinstance(stereo_image, OrthoStereoImage):
-            # Extract individual channels
-            query_img = self._cv_bridge.imgmsg_to_cv2(
-                stereo_image.query, desired_encoding="passthrough"
-            )
-            query_img = cv2.cvtColor(query_img, cv2.COLOR_BGR2GRAY)
-            reference_img = self._cv_bridge.imgmsg_to_cv2(
-                stereo_image.reference, desired_encoding="mono8"
+        with self._stage_timer.time(type(stereo_image).__name__, "preprocess"):
+            # Convert the ROS Image message to an OpenCV image
+            query_img = self._frame_image(stereo_image.query)
+            if isinstance(stereo_image, OrthoStereoImage):
+                # Extract individual channels
+                reference_img = self._cv_bridge.imgmsg_to_cv2(
+                    stereo_image.reference, desired_encoding="mono8"
+                )
+                assert reference_img.ndim == 2 or reference_img.shape[2] == 1
+                # reference_img = cv2.cvtColor(reference_img, cv2.COLOR_BGR2GRAY)
+                # Reconstruct 16-bit elevation from the last two channels
+                reference_elevation = self._cv_bridge.imgmsg_to_cv2(
+                    stereo_image.dem, desired_encoding="mono8"
+                )
+
+                return (
+                    query_img,
+                    reference_img,
+                    reference_elevation,
+                )
+            else:
+                assert isinstance(stereo_image, MonocularStereoImage)
+                reference_img = self._frame_image(stereo_image.reference)
+
+                return query_img, reference_img, np.zeros_like(reference_img)
+
+    def _frame_cached(
+        self,
+        cache: FeatureCache[_T],
+        header: Header,
+        extract: Callable[[], Optional[_T]],
+    ) -> Optional[_T]:
+        """Returns the cached value for a camera frame, computing it on a miss
+
+        Camera frames are identified by header stamp and frame ID. Frames without
+        a timestamp cannot be told apart, so their values are never cached.
+
+        :param cache: Cache of the values
+        :param header: Camera frame image header
+        :param extract: Callable that computes the value on a cache miss
+        :return: Cached or newly computed value, or None if not available
+        """
+        if header.stamp.sec == 0 and header.stamp.nanosec == 0:
+            return extract()
+        return cache.get(
+            (header.stamp.sec, header.stamp.nanosec, header.frame_id), extract
+        )
+
+    def _frame_image(self, msg: Image) -> np.ndarray:
+        """Returns the camera frame as a grayscale image, decoded once per frame
+
+        > [!NOTE]
+        > The returned array is shared between callers and must not be modified
+        > in place.
+        """
+        img = self._frame_cached(
+            self._frame_images,
+            msg.header,
+            lambda: self._cv_bridge.imgmsg_to_cv2(msg, desired_encoding="mono8"),
+        )
+        assert img is not None
+        return img
+
+    def _database_reference_features(
+        self, msg: OrthoStereoImage, shape: Tuple[int, int]
+    ) -> Optional[Tuple[torch.Tensor, torch.Tensor]]:
+        """Returns reference image keypoints and descriptors from the mission area
+        feature database
+
+        The database is queried with the bounding box of the reference image
+        footprint, which covers the camera field of view. The keypoints are
+        projected into reference image pixel coordinates with the reference CRS,
+        and the highest scoring keypoints inside the reference image are returned.
+
+        :param msg: Stereo image with the reference CRS and reference transform
+        :param shape: Reference image shape (height, width)
+        :return: Tuple of reference keypoints and descriptors, or None if the
+            database is not available or does not cover the reference image
+        """
+        if self._feature_db is None:
+            return None
+
+        angle, scale = similarity_angle_and_scale(
+            np.array(msg.reference_transform).reshape(2, 3)
+        )
+        if scale == 0:
+            # Reference transform not provided
+            return None
+
+        # Reference pixel (x, y) to WGS 84 (longitude, latitude) geotransform
+        geotransform = tf_.proj_to_affine(msg.crs.data)[:2, [0, 1, 3]]
+        height, width = shape
+        corners = (
+            np.array([[0, 0, 1], [width, 0, 1], [width, height, 1], [0, height, 1]])
+            @ geotransform.T
+        )
+        (left, bottom), (right, top) = corners.min(axis=0), corners.max(axis=0)
+
+        gsd = ground_sampling_distance(geotransform, (bottom + top) / 2)
+        if abs(gsd / self._feature_db.gsd - 1) > self.FEATURE_DB_GSD_TOLERANCE:
+            self.get_logger().debug(
+                f"Reference GSD {gsd:.2f} m does not match feature database GSD "
+                f"{self._feature_db.gsd:.2f} m, extracting reference features."
             )
-            assert reference_img.ndim == 2 or reference_img.shape[2] == 1
-            # reference_img = cv2.cvtColor(reference_img, cv2.COLOR_BGR2GRAY)
-            # Reconstruct 16-bit elevation from the last two channels
-            reference_elevation = self._cv_bridge.imgmsg_to_cv2(
-                stereo_image.dem, desired_encoding="mono8"
+            return None
+
+        features = self._feature_db.query(BBox(left, bottom, right, top), angle)
+        if features is None:
+            self.get_logger().debug(
+                "Feature database does not cover reference, extracting reference "
+                "features."
             )
+            return None
+        keypoints, scores, descriptors = features
+
+        pixels = (keypoints - geotransform[:, 2]) @ np.linalg.inv(geotransform[:, :2]).T
+        inside = np.flatnonzero(
+            (pixels[:, 0] >= 0)
+            & (pixels[:, 0] < width)
+            & (pixels[:, 1] >= 0)
+            & (pixels[:, 1] < height)
+        )
+        max_keypoints = self._latency_controller.operating_point.max_keypoints
+        best = inside[np.argsort(-scores[inside])[:max_keypoints]]
 
-            return (
-                query_img,
-                reference_img,
-                reference_elevation,
+        return (
+            torch.from_numpy(pixels[best].astype(np.float32)).to(self._device),
+            torch.from_numpy(descriptors[best].astype(np.float32)).to(self._device),
+        )
+
+    def _cached_reference_features(
+        self, msg: OrthoStereoImage, shape: Tuple[int, int]
+    ) -> Optional[Tuple[torch.Tensor, torch.Tensor]]:
+        """Returns reference image keypoints and descriptors transformed from the
+        features extracted from the source orthoimage
+
+        The features are extracted from the source orthoimage once per rotation
+        step (see :attr:`.REFERENCE_FEATURE_ROTATION_STEP`) and cached. The
+        keypoints are then transformed into reference image pixel coordinates with
+        the reference transform from :class:`.StereoNode`, and keypoints outside
+        the reference image are discarded.
+
+        :param msg: Stereo image with the source orthoimage header and reference
+            transform
+        :param shape: Reference image shape (height, width)
+        :return: Tuple of reference keypoints and descriptors, or None if the
+            source orthoimage features are not available
+        """
+        reference_transform = np.array(msg.reference_transform).reshape(2, 3)
+        angle, scale = similarity_angle_and_scale(reference_transform)
+        if scale == 0:
+            # Reference transform not provided
+            return None
+        angle = quantize_angle(angle, self.REFERENCE_FEATURE_ROTATION_STEP)
+        header = msg.orthoimage_header
+        height, width = shape
+
+        def _extract() -> Optional[Tuple[torch.Tensor, torch.Tensor, np.ndarray]]:
+            orthoimage = self.orthoimage
+            if orthoimage is None or orthoimage.image.header != header:
+                # A newer orthoimage has already replaced the source orthoimage
+                return None
+
+            img = self._cv_bridge.imgmsg_to_cv2(
+                orthoimage.image, desired_encoding="passthrough"
             )
-        else:
-            assert isinstance(stereo_image, MonocularStereoImage)
-            query_img = self._cv_bridge.imgmsg_to_cv2(
-                stereo_image.query, desired_encoding="mono8"
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+            matrix, size = rotation_matrix(img.shape[:2], angle, scale)
+            img = cv2.warpAffine(img, matrix, size)
+
+            max_keypoints = int(
+                self.MAX_KEYPOINTS * size[0] * size[1] / (width * height)
             )
-            reference_img = self._cv_bridge.imgmsg_to_cv2(
-                stereo_image.reference, desired_encoding="mono8"
+            # Cached for the whole orthoimage, so not extracted at the current
+            # operating point
+            keypoints, descriptors = self._deep_matcher.extract(
+                img, max_keypoints, downscale=1.0
             )
+            return keypoints, descriptors, matrix
+
+        features = self._reference_features.get(
+            (
+                header.stamp.sec,
+                header.stamp.nanosec,
+                header.frame_id,
+                angle,
+                round(scale, 3),
+            ),
+            _extract,
+        )
+        if features is None:
+            return None
+        keypoints, descriptors, matrix = features
 
-            return query_img, reference_img, np.zeros_like(reference_img)
+        # Rotated orthoimage pixels to source orthoimage pixels to reference pixels
+        M = torch.tensor(
+            compose(reference_transform, cv2.invertAffineTransform(matrix)),
+            dtype=keypoints.dtype,
+            device=keypoints.device,
+        )
+        keypoints = keypoints @ M[:, :2].T + M[:, 2]
+        inside = (
+            (keypoints[:, 0] >= 0)
+            & (keypoints[:, 0] < width)
+            & (keypoints[:, 1] >= 0)
+            & (keypoints[:, 1] < height)
+        )
+        return keypoints[inside], descriptors[inside]
 
     def _process(
-        self, qry: np.ndarray, ref: np.ndarray, shallow_inference: bool = False
+        self,
+        qry: np.ndarray,
+        ref: np.ndarray,
+        shallow_inference: bool = False,
+        query_features: Optional[
+            Union[Tuple[torch.Tensor, torch.Tensor], _Features]
+        ] = None,
+        reference_features: Optional[
+            Union[Tuple[torch.Tensor, torch.Tensor], _Features]
+        ] = None,
+        operating_point: Optional[OperatingPoint] = None,
     ) -> Tuple[np.ndarray, np.ndarray]:
         """Returns keypoint matches for input image pair
 
+        :param qry: Query image
+        :param ref: Reference image
+        :param shallow_inference: True to use shallow matching (VO)
+        :param query_features: Optional precomputed query keypoints and
+            descriptors, extracted from the query image if not provided
+        :param reference_features: Optional precomputed reference keypoints and
+            descriptors, extracted from the reference image if not provided
+        :param operating_point: Optional deep matching operating point, see
+            :meth:`.DeepMatcher.match`
         :return: Tuple of matched query image keypoints, and matched reference image
             keypoints
         """
-        if not shallow_inference:
-            qry_tensor = torch.Tensor(qry[None, None]).to(self._device) / 255.0
-            ref_tensor = torch.Tensor(ref[None, None]).to(self._device) / 255.0
-            qry_tensor = qry_tensor.expand(-1, 3, -1, -1)
-            ref_tensor = ref_tensor.expand(-1, 3, -1, -1)
-
-            with torch.inference_mode():
-                input = torch.cat([qry_tensor, ref_tensor], dim=0)
-                # limit number of features to run faster, None means no limit i.e.
-                # slow but accurate
-                max_keypoints = 1024  # 4096  # None
-                feat_qry, feat_ref = self._extractor(
-                    input, max_keypoints, pad_if_not_divisible=True
-                )
-                kp_qry, desc_qry = feat_qry.keypoints, feat_qry.descriptors
-                kp_ref, desc_ref = feat_ref.keypoints, feat_ref.descriptors
-                lafs_qry = laf_from_center_scale_ori(
-                    kp_qry[None], torch.ones(1, len(kp_qry), 1, 1, device=self._device)
-                )
-                lafs_ref = laf_from_center_scale_ori(
-                    kp_ref[None], torch.ones(1, len(kp_ref), 1, 1, device=self._device)
-                )
-                dists, match_indices = self._matcher(
-                    desc_qry, desc_ref, lafs_qry, lafs_ref
+        with self._stage_timer.time(
+            "MonocularStereoImage" if shallow_inference else "OrthoStereoImage",
+            "process",
+        ):
+            if not shallow_inference:
+                return self._deep_matcher.match(
+                    qry, ref, query_features, reference_features, operating_point
                 )
-
-            mkp_qry = kp_qry[match_indices[:, 0]].cpu().numpy()
-            mkp_ref = kp_ref[match_indices[:, 1]].cpu().numpy()
-
-            return mkp_qry, mkp_ref
-
-        else:
-            # find the keypoints and descriptors with ORB
-            kp_qry, desc_qry = self._orb.detectAndCompute(qry, None)
-            kp_ref, desc_ref = self._orb.detectAndCompute(ref, None)
-
-            matches = self._bf.knnMatch(desc_qry, desc_ref, k=2)
-
-            # Apply ratio test
-            good = []
-            for m, n in matches:
-                # TODO: have a separate confidence threshold for shallow and deep
-                #  keypoint matching?
-                if m.distance < self.CONFIDENCE_THRESHOLD_SHALLOW_MATCH * n.distance:
-                    good.append(m)
-
-            mkps = list(
-                map(
-                    lambda dmatch: (
-                        tuple(kp_qry[dmatch.queryIdx].pt),
-                        tuple(kp_ref[dmatch.trainIdx].pt),
-                    ),
-                    good,
+            else:
+                return self._shallow_matcher.match(
+                    qry, ref, query_features, reference_features
                 )
-            )
-
-            mkp_qry, mkp_ref = zip(*mkps)
-            mkp_qry = np.array(mkp_qry)
-            mkp_ref = np.array(mkp_ref)
-
-            return mkp_qry, mkp_ref
 
     def _postprocess(
         self,
         mkp_qry: np.ndarray,
         mkp_ref: np.ndarray,
         elevation: np.ndarray,
-        qry_img: np.ndarray,
-        ref_img: np.ndarray,
-        label: str,
-    ) -> Optional[PoseWithCovarianceStamped]:
-        """Computes camera pose from keypoint matches"""
-
-        @narrow_types(self)
-        def _visualize_matches_and_pose(
-            camera_info: CameraInfo,
-            qry: np.ndarray,
-            ref: np.ndarray,
-            mkp_qry: np.ndarray,
-            mkp_ref: np.ndarray,
-            r: np.ndarray,
-            t: np.ndarray,
-            label: str,
-        ) -> None:
-            """Visualizes matches and projected FOV"""
-
-            def _project_fov(img, h_matrix):
-                """Projects FOV on reference image"""
-                height, width = img.shape[0:2]
-                src_pts = np.float32(
-                    [[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]]
-                ).reshape(-1, 1, 2)
-                try:
-                    return cv2.perspectiveTransform(src_pts, np.linalg.inv(h_matrix))
-                except np.linalg.LinAlgError:
-                    return src_pts
-
-            # We modify these from ROS to cv2 axes convention so we create copies
-            # mkp_qry = mkp_qry.copy()
-            # mkp_ref = mkp_ref.copy()
-
-            k = camera_info.k.reshape((3, 3))
-            h_matrix = k @ np.delete(np.hstack((r, t)), 2, 1)
-            projected_fov = _project_fov(qry, h_matrix)
-
-            projected_fov[:, :, 1] = projected_fov[:, :, 1]
-            img_with_fov = cv2.polylines(
-                ref, [np.int32(projected_fov)], True, 255, 3, cv2.LINE_AA
-            )
-
-            mkp_qry = [cv2.KeyPoint(x[0], x[1], 1) for x in mkp_qry]
-            mkp_ref = [cv2.KeyPoint(x[0], x[1], 1) for x in mkp_ref]
-
-            matches = [cv2.DMatch(i, i, 0) for i in range(len(mkp_qry))]
-
-            match_img = cv2.drawMatches(
-                img_with_fov,
-                mkp_ref,
-                qry,
-                mkp_qry,
-                matches,
-                None,
-                matchColor=(0, 255, 0),
-                flags=2,
-            )
-
-            cv2.imshow(label, match_img)
-            cv2.waitKey(1)
+        kind: type,
+    ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Computes camera pose from keypoint matches
+
+        The previous pose of the same kind of stereo image is used as the warm
+        start, see :class:`.PnPSolver`.
+
+        :param mkp_qry: Matched query image keypoints
+        :param mkp_ref: Matched reference image keypoints
+        :param elevation: Reference elevation raster
+        :param kind: Stereo image message type
+        :return: Tuple of rotation matrix and translation vector, or None if the
+            pose could not be solved
+        """
 
         @narrow_types(self)
         def _compute_pose(
@@ -562,9 +1634,6 @@ class PoseNode(Node):
             mkp_qry: np.ndarray,
             mkp_ref: np.ndarray,
             elevation: np.ndarray,
-            qry_img: np.ndarray,
-            ref_img: np.ndarray,
-            label: str,
         ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
             if len(mkp_qry) < self.MIN_MATCHES:
                 self.get_logger().debug("Not enough matches - returning None")
@@ -581,23 +1650,6 @@ class PoseNode(Node):
                 z_values = elevation[y, x].reshape(-1, 1)
                 return np.hstack((mkp_ref, z_values))
 
-            def _compute_pose(
-                mkp2_3d: np.ndarray, mkp_qry: np.ndarray, k_matrix: np.ndarray
-            ) -> Tuple[np.ndarray, np.ndarray]:
-                """Computes :term:`pose` using :func:`cv2.solvePnPRansac`"""
-                dist_coeffs = np.zeros((4, 1))
-                _, r, t, _ = cv2.solvePnPRansac(
-                    mkp2_3d,
-                    mkp_qry,
-                    k_matrix,
-                    dist_coeffs,
-                    useExtrinsicGuess=False,
-                    iterationsCount=10,
-                )
-                r_matrix, _ = cv2.Rodrigues(r)
-
-                return r_matrix, t
-
             k_matrix = camera_info.k.reshape((3, 3))
 
             mkp2_3d = _compute_3d_points(mkp_ref, elevation)
@@ -607,24 +1659,20 @@ class PoseNode(Node):
             # mkp2_3d[:, 1] = camera_info.height - mkp2_3d[:, 1]
             # mkp_qry[:, 1] = camera_info.height - mkp_qry[:, 1]
 
-            r, t = _compute_pose(mkp2_3d, mkp_qry, k_matrix)
-
-            _visualize_matches_and_pose(
-                camera_info,
-                qry_img.copy(),
-                ref_img.copy(),
-                mkp_qry,
-                mkp_ref,
-                r,
-                t,
-                label,
-            )
+            result = self._pnp_solver.solve(mkp2_3d, mkp_qry, k_matrix, key=kind)
+            if result is None:
+                self.get_logger().debug("Could not solve PnP - returning None")
+                return None
+            self._pnp_statistics[kind] = {
+                key: float(value)
+                for key, value in result._asdict().items()
+                if key not in ("r", "t")
+            }
 
-            return r, t
+            return result.r, result.t
 
-        return _compute_pose(
-            self.camera_info, mkp_qry, mkp_ref, elevation, qry_img, ref_img, label
-        )
+        with self._stage_timer.time(kind.__name__, "postprocess"):
+            return _compute_pose(self.camera_info, mkp_qry, mkp_ref, elevation)
 
     def _get_stamp(self, msg) -> Time:
         if self.time_reference is None:
@@ -10,6 +10,7 @@ reference orthoimage by using information of the onboard camera resolution and t
 vehicle's heading. Alignment  is required since the deep learning network that is used
 for matching keypoints is not assumed to be rotation agnostic.
 """
+from itertools import count
 from typing import Final, Optional, Tuple
 
 import cv2
@@ -18,6 +19,7 @@ import rclpy
 import tf2_ros
 import tf_transformations
 from cv_bridge import CvBridge
+from diagnostic_msgs.msg import DiagnosticArray
 from geometry_msgs.msg import TransformStamped
 from rcl_interfaces.msg import ParameterDescriptor
 from rclpy.node import Node
@@ -29,18 +31,23 @@ from gisnav_msgs.msg import (  # type: ignore[attr-defined]
     MonocularStereoImage,
     OrthoImage,
     OrthoStereoImage,
+    TraceEvent,
 )
 
 from .. import _transformations as tf_
 from .._decorators import ROS, narrow_types
+from .._stage_timer import StageTimer
+from .._tracing import Tracer
 from ..constants import (
     GIS_NODE_NAME,
     ROS_NAMESPACE,
     ROS_TOPIC_CAMERA_INFO,
     ROS_TOPIC_IMAGE,
+    ROS_TOPIC_RELATIVE_DIAGNOSTICS,
     ROS_TOPIC_RELATIVE_ORTHOIMAGE,
     ROS_TOPIC_RELATIVE_POSE_IMAGE,
     ROS_TOPIC_RELATIVE_TWIST_IMAGE,
+    ROS_TOPIC_TRACE,
 )
 
 
@@ -50,6 +57,15 @@ class StereoNode(Node):
     _ROS_PARAM_DESCRIPTOR_READ_ONLY: Final = ParameterDescriptor(read_only=True)
     """A read only ROS parameter descriptor"""
 
+    ROS_D_LATENCY_INSTRUMENTATION = False
+    """Default value for :attr:`.latency_instrumentation`"""
+
+    ROS_D_TRACING = False
+    """Default value for :attr:`.tracing`"""
+
+    DIAGNOSTICS_PERIOD = 1.0
+    """Period in seconds at which :attr:`.diagnostics` are published"""
+
     def __init__(self, *args, **kwargs) -> None:
         """Class initializer
 
@@ -61,6 +77,14 @@ class StereoNode(Node):
         # Converts image_raw to cv2 compatible image
         self._cv_bridge = CvBridge()
 
+        # Per stage latency histograms published in diagnostics if enabled
+        self._stage_timer = StageTimer(bool(self.latency_instrumentation))
+
+        # Camera frames are assigned trace IDs for end-to-end latency tracing
+        self._tracer = Tracer(self, self.trace_event, bool(self.tracing))
+        self._trace_ids = count(1)
+        self._trace_id = 0
+
         # Calling these decorated properties the first time will setup
         # subscriptions to the appropriate ROS topics
         self.orthoimage
@@ -79,6 +103,60 @@ class StereoNode(Node):
         self._tf_buffer = tf2_ros.Buffer()
         self._tf_listener = tf2_ros.TransformListener(self._tf_buffer, self)
 
+        if self._stage_timer.enabled:
+            self.diagnostics
+            self._diagnostics_timer = self.create_timer(
+                self.DIAGNOSTICS_PERIOD, lambda: self.diagnostics
+            )
+
+    @property
+    @ROS.parameter(
+        ROS_D_LATENCY_INSTRUMENTATION, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY
+    )
+    def latency_instrumentation(self) -> Optional[bool]:
+        """ROS parameter to time the stages of :attr:`.pose_image` generation and
+        publish their latency percentiles in :attr:`.diagnostics`
+        """
+
+    @property
+    @ROS.parameter(ROS_D_TRACING, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
+    def tracing(self) -> Optional[bool]:
+        """ROS parameter to assign trace IDs to camera frames and publish their
+        ingress and egress times in :meth:`.trace_event`
+        """
+
+    @ROS.publish(
+        ROS_TOPIC_TRACE,
+        QoSPresetProfiles.SYSTEM_DEFAULT.value,
+    )
+    def trace_event(self, event: TraceEvent) -> Optional[TraceEvent]:
+        """Outgoing latency trace event, published only if :attr:`.tracing` is
+        enabled
+        """
+        return event
+
+    @property
+    @ROS.publish(
+        ROS_TOPIC_RELATIVE_DIAGNOSTICS,
+        QoSPresetProfiles.SYSTEM_DEFAULT.value,
+    )
+    def diagnostics(self) -> Optional[DiagnosticArray]:
+        """Outgoing latency percentiles of the instrumented :attr:`.pose_image`
+        generation stages, published only if :attr:`.latency_instrumentation` is
+        enabled
+        """
+        diagnostics = DiagnosticArray()
+        diagnostics.header = tf_.create_header(self)
+        for stage, statistics in self._stage_timer.statistics().items():
+            diagnostics.status.append(
+                tf_.create_diagnostic_status(
+                    f"{self.get_name()}: {stage} latency [s]",
+                    self.get_name(),
+                    statistics,
+                )
+            )
+        return diagnostics
+
     @property
     @ROS.subscribe(
         f"/{ROS_NAMESPACE}"
@@ -100,9 +178,21 @@ class StereoNode(Node):
 
     def _image_cb(self, msg: Image) -> None:
         """Callback for :attr:`.image` message"""
-        self.pose_image  # publish rotated and cropped orthoimage stack
+        if self._tracer.enabled:
+            self._trace_id = next(self._trace_ids)
+            self._tracer.ingress(ROS_TOPIC_IMAGE, msg.header.stamp, self._trace_id)
+
+        # publish rotated and cropped orthoimage stack
+        if self.pose_image is not None:
+            self._tracer.egress(
+                ROS_TOPIC_IMAGE, ROS_TOPIC_RELATIVE_POSE_IMAGE, msg.header.stamp
+            )
 
-        self.twist_image  # publish two subsequent images for VO
+        # publish two subsequent images for VO
+        if self.twist_image is not None:
+            self._tracer.egress(
+                ROS_TOPIC_IMAGE, ROS_TOPIC_RELATIVE_TWIST_IMAGE, msg.header.stamp
+            )
 
         # TODO this is brittle - nothing is enforcing that this is assigned after
         #  publishing stereo_image
@@ -134,6 +224,8 @@ class StereoNode(Node):
             M_3d = np.eye(4)
             M_3d[:2, :2] = M[:2, :2]
             M_3d[:2, 3] = M[:2, 2]
+            # Scale z by the same factor as x and y if the orthoimage was resampled
+            M_3d[2, 2] = np.sqrt(np.abs(np.linalg.det(M[:2, :2])))
 
             try:
                 tf_transformations.quaternion_from_matrix(M_3d)
@@ -174,21 +266,15 @@ class StereoNode(Node):
             """Rotate and crop and orthoimage stack to align with query image"""
             transform = transform.transform
 
-            orthoimage_arr = self._cv_bridge.imgmsg_to_cv2(
-                orthoimage.image, desired_encoding="passthrough"
-            )
-            dem_arr = self._cv_bridge.imgmsg_to_cv2(
-                orthoimage.dem, desired_encoding="mono8"
-            )
-            orthoimage_arr = cv2.cvtColor(orthoimage_arr, cv2.COLOR_BGR2GRAY)
-            orthoimage_stack = np.dstack((orthoimage_arr, dem_arr))
-
-            # TODO: make dem 16 bit
-            assert orthoimage_stack.shape[2] == 2, (
-                f"Orthoimage stack channel count was {orthoimage_stack.shape[2]} "
-                f"when 2 was expected (one channel for 8-bit grayscale reference "
-                f"image and one 8-bit channel for 8-bit elevation reference)"
-            )
+            with self._stage_timer.time("decode"):
+                orthoimage_arr = self._cv_bridge.imgmsg_to_cv2(
+                    orthoimage.image, desired_encoding="passthrough"
+                )
+                # TODO: make dem 16 bit
+                dem_arr = self._cv_bridge.imgmsg_to_cv2(
+                    orthoimage.dem, desired_encoding="mono8"
+                )
+                orthoimage_arr = cv2.cvtColor(orthoimage_arr, cv2.COLOR_BGR2GRAY)
 
             # Rotate and crop orthoimage stack
             # TODO: implement this part better e.g. use
@@ -203,31 +289,50 @@ class StereoNode(Node):
 
             crop_shape: Tuple[int, int] = image.height, image.width
 
+            # The orthoimage side is resampled to the camera diagonal. The
+            # orthoimage and DEM may have been retrieved at a coarser resolution
+            # (see GISNode.orthoimage_gsd and GISNode.dem_downsampling).
+            diagonal = int(np.ceil(np.sqrt(image.width**2 + image.height**2)))
+            scale = diagonal / orthoimage_arr.shape[1]
+            dem_scale = diagonal / dem_arr.shape[1]
+
             # here positive rotation is counter-clockwise, so we invert
-            orthoimage_rotated_stack, M = self._rotate_and_crop_center(
-                orthoimage_stack, rotation, crop_shape
-            )
+            with self._stage_timer.time("warp"):
+                reference_arr, M = self._rotate_and_crop_center(
+                    orthoimage_arr, rotation, crop_shape, scale
+                )
+                reference_dem_arr, _ = self._rotate_and_crop_center(
+                    dem_arr, rotation, crop_shape, dem_scale
+                )
 
-            reference_image_msg = self._cv_bridge.cv2_to_imgmsg(
-                orthoimage_rotated_stack[:, :, 0], encoding="mono8"
-            )
+            with self._stage_timer.time("encode"):
+                reference_image_msg = self._cv_bridge.cv2_to_imgmsg(
+                    reference_arr, encoding="mono8"
+                )
 
-            # TODO: 16 bit DEM
-            dem_msg = self._cv_bridge.cv2_to_imgmsg(
-                orthoimage_rotated_stack[:, :, 1], encoding="mono8"
-            )
+                # TODO: 16 bit DEM
+                dem_msg = self._cv_bridge.cv2_to_imgmsg(
+                    reference_dem_arr, encoding="mono8"
+                )
             reference_image_msg.header.stamp = image.header.stamp
             dem_msg.header.stamp = image.header.stamp
 
             ortho_stereo_image_msg = OrthoStereoImage(
-                query=image, reference=reference_image_msg, dem=dem_msg
+                query=image,
+                reference=reference_image_msg,
+                dem=dem_msg,
+                orthoimage_header=orthoimage.image.header,
+                # Forward transform for reusing orthoimage features (see PoseNode)
+                reference_transform=cv2.invertAffineTransform(M[:2]).flatten(),
+                trace_id=self._trace_id,
             )
 
             # Publish transformation
-            proj_str = self._world_to_reference_proj_str(
-                np.linalg.inv(M),  # TODO: try-except
-                orthoimage.crs.data,
-            )
+            with self._stage_timer.time("transform"):
+                proj_str = self._world_to_reference_proj_str(
+                    np.linalg.inv(M),  # TODO: try-except
+                    orthoimage.crs.data,
+                )
 
             ortho_stereo_image_msg.crs = String(data=proj_str)
 
@@ -237,17 +342,19 @@ class StereoNode(Node):
 
         # Need camera orientation in an ENU frame ("map") to rotate
         # the orthoimage stack
-        transform = (
-            tf_.get_transform(self, "map", "camera", rclpy.time.Time())
-            if hasattr(self, "_tf_buffer")
-            else None
-        )
+        with self._stage_timer.time("tf lookup"):
+            transform = (
+                tf_.get_transform(self, "map", "camera", rclpy.time.Time())
+                if hasattr(self, "_tf_buffer")
+                else None
+            )
 
-        return _pnp_image(
-            query_image,
-            orthoimage,
-            transform,
-        )
+        with self._stage_timer.time("pose image"):
+            return _pnp_image(
+                query_image,
+                orthoimage,
+                transform,
+            )
 
     @property
     @ROS.publish(
@@ -262,21 +369,31 @@ class StereoNode(Node):
 
         @narrow_types(self)
         def _stereo_image(qry: Image, ref: Image) -> Optional[MonocularStereoImage]:
-            return MonocularStereoImage(query=qry, reference=ref)
+            return MonocularStereoImage(
+                query=qry, reference=ref, trace_id=self._trace_id
+            )
 
         return _stereo_image(qry=self.image, ref=self.previous_image)
 
     # @staticmethod
     def _rotate_and_crop_center(
-        self, image: np.ndarray, angle_degrees: float, shape: Tuple[int, int]
+        self,
+        image: np.ndarray,
+        angle_degrees: float,
+        shape: Tuple[int, int],
+        scale: float = 1.0,
     ) -> Tuple[np.ndarray, np.ndarray]:
-        """Rotates an image around its center axis and then crops it to the
-        specified shape.
+        """Rotates and scales an image around its center axis and then crops it
+        to the specified shape.
+
+        The image is warped directly into the cropped shape so that pixels outside
+        the crop are never computed.
 
         :param image: Numpy array representing the image.
         :param angle: Rotation angle in degrees.
         :param shape: Tuple (height, width) representing the desired shape
             after cropping.
+        :param scale: Isotropic scale factor applied together with the rotation
         :return: Tuple of 1. Cropped and rotated image, and 2. matrix that can be
             used to convert points in rotated and cropped frame back into original
             frame
@@ -288,17 +405,16 @@ class StereoNode(Node):
         center = (w // 2, h // 2)
 
         # Calculate the rotation matrix
-        rotation_matrix = cv2.getRotationMatrix2D(center, angle_degrees, 1.0)
-
-        # Perform the rotation
-        rotated_image = cv2.warpAffine(image, rotation_matrix, (w, h))
+        rotation_matrix = cv2.getRotationMatrix2D(center, angle_degrees, scale)
 
         # Calculate the cropping coordinates
         dx = center[0] - shape[1] // 2
         dy = center[1] - shape[0] // 2
 
-        # Perform the cropping
-        cropped_image = rotated_image[dy : dy + shape[0], dx : dx + shape[1]]
+        # Perform the rotation and cropping in a single warp
+        crop_matrix = rotation_matrix.copy()
+        crop_matrix[:, 2] -= (dx, dy)
+        cropped_image = cv2.warpAffine(image, crop_matrix, (shape[1], shape[0]))
 
         # Invert the matrix
         extended_matrix = np.vstack([rotation_matrix, [0, 0, 1]])
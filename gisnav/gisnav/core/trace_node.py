@@ -0,0 +1,172 @@
+"""This module contains :class:`.TraceNode`, a ROS node that collects the latency
+trace events of the GISNav nodes and publishes the per-hop and total latency
+distributions of the camera frames.
+
+The nodes only publish trace events if their ``tracing`` parameter is enabled,
+see :mod:`._tracing`.
+"""
+from collections import OrderedDict
+from typing import Final, List, Optional
+
+from diagnostic_msgs.msg import DiagnosticArray
+from rclpy.node import Node
+from rclpy.qos import QoSPresetProfiles
+
+from gisnav_msgs.msg import TraceEvent  # type: ignore[attr-defined]
+
+from .. import _transformations as tf_
+from .._decorators import ROS
+from .._stage_timer import StageTimer
+from .._tracing import nanoseconds
+from ..constants import ROS_TOPIC_RELATIVE_DIAGNOSTICS, ROS_TOPIC_TRACE
+
+
+class TraceNode(Node):
+    """Collects :class:`gisnav_msgs.msg.TraceEvent` messages and publishes the
+    latency percentiles of each hop of the camera frames in :attr:`.diagnostics`
+
+    The trace events of a camera frame are grouped by their origin stamp. The
+    following latencies are computed from each event:
+
+    * ``hop <node>``: from ingress to egress in the node, per input and output
+      topic
+    * ``hop <upstream node> → <node>``: from egress in the upstream node to ingress
+      in the node. The upstream event is the one that published to the input topic
+      of the node, or if there is none such as for the ``robot_localization`` EKF
+      in between, the latest earlier event of the frame in another node.
+      ``origin`` is the upstream of the first node. Counted once per frame for
+      each node and input topic.
+    * ``total <node>``: from the origin stamp to egress in the node, per output
+      topic
+
+    > [!NOTE] Downstream of the EKF
+    > The EKF publishes filtered odometry with the stamp of the latest fused
+    > measurement, which is the camera frame stamp only if the latest
+    > measurement came from :class:`.PoseNode`. Events without a trace ID are
+    > therefore only counted if an upstream event of the same frame has been
+    > collected, and only the first event of each node, input and output topic is
+    > counted for each frame.
+    """
+
+    MAX_TRACES: Final = 1000
+    """Number of latest camera frames whose trace events are kept for finding
+    upstream events"""
+
+    DIAGNOSTICS_PERIOD = 1.0
+    """Period in seconds at which :attr:`.diagnostics` are published"""
+
+    def __init__(self, *args, **kwargs) -> None:
+        """Class initializer
+
+        :param args: Positional arguments to parent :class:`.Node` constructor
+        :param kwargs: Keyword arguments to parent :class:`.Node` constructor
+        """
+        super().__init__(*args, **kwargs)
+
+        self._traces: "OrderedDict[int, List[TraceEvent]]" = OrderedDict()
+        self._latencies = StageTimer(True)
+
+        # Calling these decorated properties the first time will setup
+        # subscriptions and publishers
+        self.trace_event
+        self.diagnostics
+        self._diagnostics_timer = self.create_timer(
+            self.DIAGNOSTICS_PERIOD, lambda: self.diagnostics
+        )
+
+    def _trace_event_cb(self, msg: TraceEvent) -> None:
+        """Callback for :attr:`.trace_event` message"""
+        origin = nanoseconds(msg.origin_stamp)
+        events = self._traces.get(origin)
+        if events is None:
+            events = []
+            self._traces[origin] = events
+            while len(self._traces) > self.MAX_TRACES:
+                self._traces.popitem(last=False)
+
+        received = [
+            event
+            for event in events
+            if event.node == msg.node and event.input_topic == msg.input_topic
+        ]
+        if any(event.output_topic == msg.output_topic for event in received):
+            return
+
+        ingress = nanoseconds(msg.ingress_stamp)
+        upstream = self._upstream(events, msg, ingress)
+        if upstream is None and msg.trace_id == 0:
+            return
+        events.append(msg)
+
+        self._latencies.record(
+            ("hop", msg.node, msg.input_topic, "→", msg.output_topic),
+            (nanoseconds(msg.egress_stamp) - ingress) * 1e-9,
+        )
+        if not received:
+            # The frame has not already been counted as received by the node
+            upstream_egress = (
+                origin if upstream is None else nanoseconds(upstream.egress_stamp)
+            )
+            self._latencies.record(
+                ("hop", "origin" if upstream is None else upstream.node, "→", msg.node),
+                (ingress - upstream_egress) * 1e-9,
+            )
+        self._latencies.record(
+            ("total", msg.node, msg.output_topic),
+            (nanoseconds(msg.egress_stamp) - origin) * 1e-9,
+        )
+
+    @staticmethod
+    def _upstream(
+        events: List[TraceEvent], msg: TraceEvent, ingress: int
+    ) -> Optional[TraceEvent]:
+        """Returns the upstream trace event of the message, or None if not found
+
+        :param events: Collected trace events of the same camera frame
+        :param msg: Trace event
+        :param ingress: Ingress time of the trace event in nanoseconds
+        :return: The event that published to the input topic of the message, or
+            the latest event of another node that egressed before the ingress
+        """
+        candidates = [
+            event
+            for event in events
+            if event.node != msg.node and nanoseconds(event.egress_stamp) <= ingress
+        ]
+        linked = [
+            event for event in candidates if event.output_topic == msg.input_topic
+        ]
+        candidates = linked if linked else candidates
+        if not candidates:
+            return None
+        return max(candidates, key=lambda event: nanoseconds(event.egress_stamp))
+
+    @property
+    @ROS.subscribe(
+        ROS_TOPIC_TRACE,
+        QoSPresetProfiles.SYSTEM_DEFAULT.value,
+        callback=_trace_event_cb,
+    )
+    def trace_event(self) -> Optional[TraceEvent]:
+        """Subscribed latency trace event of a GISNav node, or None if unknown"""
+
+    @property
+    @ROS.publish(
+        ROS_TOPIC_RELATIVE_DIAGNOSTICS,
+        QoSPresetProfiles.SYSTEM_DEFAULT.value,
+    )
+    def diagnostics(self) -> Optional[DiagnosticArray]:
+        """Outgoing latency percentiles of the per-hop and total latencies of the
+        traced camera frames
+        """
+        diagnostics = DiagnosticArray()
+        diagnostics.header = tf_.create_header(self)
+        for stage, statistics in self._latencies.statistics().items():
+            diagnostics.status.append(
+                tf_.create_diagnostic_status(
+                    f"{self.get_name()}: {stage} latency [s]",
+                    self.get_name(),
+                    statistics,
+                )
+            )
+        return diagnostics
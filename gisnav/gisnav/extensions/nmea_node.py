@@ -18,9 +18,12 @@ from rcl_interfaces.msg import ParameterDescriptor
 from rclpy.node import Node
 from rclpy.qos import QoSPresetProfiles
 
+from gisnav_msgs.msg import TraceEvent  # type: ignore[attr-defined]
+
 from .. import _transformations as tf_
 from .._decorators import ROS, narrow_types
-from ..constants import ROS_TOPIC_ROBOT_LOCALIZATION_ODOMETRY
+from .._tracing import Tracer
+from ..constants import ROS_TOPIC_ROBOT_LOCALIZATION_ODOMETRY, ROS_TOPIC_TRACE
 
 _ROS_PARAM_DESCRIPTOR_READ_ONLY: Final = ParameterDescriptor(read_only=True)
 """A read only ROS parameter descriptor"""
@@ -38,6 +41,9 @@ class NMEANode(Node):
     ROS_D_BAUDRATE = 9600
     """Default for :attr:`.baudrate`"""
 
+    ROS_D_TRACING = False
+    """Default for :attr:`.tracing`"""
+
     # EPSG code for WGS 84 and a common mean sea level datum (e.g., EGM96)
     _EPSG_WGS84 = 4326
     _EPSG_MSL = 5773  # Example: EGM96
@@ -50,6 +56,9 @@ class NMEANode(Node):
         """
         super().__init__(*args, **kwargs)
 
+        # Odometry ingress and output egress for end-to-end latency tracing
+        self._tracer = Tracer(self, self.trace_event, bool(self.tracing))
+
         self._tf_buffer = tf2_ros.Buffer()
         self._tf_listener = tf2_ros.TransformListener(self._tf_buffer, self)
 
@@ -85,8 +94,23 @@ class NMEANode(Node):
     def baudrate(self) -> Optional[int]:
         """Baudrate for outgoing NMEA messages"""
 
+    @property
+    @ROS.parameter(ROS_D_TRACING, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
+    def tracing(self) -> Optional[bool]:
+        """Publish the ingress and egress times of the traced camera frames in
+        :meth:`.trace_event`
+        """
+
+    @ROS.publish(ROS_TOPIC_TRACE, QoSPresetProfiles.SYSTEM_DEFAULT.value)
+    def trace_event(self, event: TraceEvent) -> Optional[TraceEvent]:
+        """Outgoing latency trace event, published only if :attr:`.tracing` is
+        enabled
+        """
+        return event
+
     def _odometry_cb(self, msg: Odometry) -> None:
         """Callback for :attr:`.odometry`"""
+        self._tracer.ingress(ROS_TOPIC_ROBOT_LOCALIZATION_ODOMETRY, msg.header.stamp)
         self._publish(msg)
 
     @property
@@ -306,6 +330,11 @@ class NMEANode(Node):
             )
             if nmea_sentences is not None:
                 self._write_nmea_to_serial(nmea_sentences)
+                self._tracer.egress(
+                    ROS_TOPIC_ROBOT_LOCALIZATION_ODOMETRY,
+                    self.port,
+                    odometry.header.stamp,
+                )
 
         _publish_inner(odometry)
 
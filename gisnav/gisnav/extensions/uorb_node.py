@@ -16,9 +16,16 @@ from rcl_interfaces.msg import ParameterDescriptor
 from rclpy.node import Node
 from rclpy.qos import QoSPresetProfiles
 
+from gisnav_msgs.msg import TraceEvent  # type: ignore[attr-defined]
+
 from .. import _transformations as tf_
 from .._decorators import ROS, narrow_types
-from ..constants import ROS_TOPIC_ROBOT_LOCALIZATION_ODOMETRY, ROS_TOPIC_SENSOR_GPS
+from .._tracing import Tracer
+from ..constants import (
+    ROS_TOPIC_ROBOT_LOCALIZATION_ODOMETRY,
+    ROS_TOPIC_SENSOR_GPS,
+    ROS_TOPIC_TRACE,
+)
 
 _ROS_PARAM_DESCRIPTOR_READ_ONLY: Final = ParameterDescriptor(read_only=True)
 """A read only ROS parameter descriptor"""
@@ -31,6 +38,9 @@ class UORBNode(Node):
     ROS_D_DEM_VERTICAL_DATUM = 5703
     """Default for :attr:`.dem_vertical_datum`"""
 
+    ROS_D_TRACING = False
+    """Default for :attr:`.tracing`"""
+
     # EPSG code for WGS 84 and a common mean sea level datum (e.g., EGM96)
     _EPSG_WGS84 = 4326
     _EPSG_MSL = 5773  # Example: EGM96
@@ -43,6 +53,9 @@ class UORBNode(Node):
         """
         super().__init__(*args, **kwargs)
 
+        # Odometry ingress and output egress for end-to-end latency tracing
+        self._tracer = Tracer(self, self.trace_event, bool(self.tracing))
+
         self._mock_gps_pub = self.create_publisher(
             SensorGps,
             ROS_TOPIC_SENSOR_GPS,
@@ -74,8 +87,23 @@ class UORBNode(Node):
         > Must match DEM that is published in :attr:`.GISNode.orthoimage`
         """
 
+    @property
+    @ROS.parameter(ROS_D_TRACING, descriptor=_ROS_PARAM_DESCRIPTOR_READ_ONLY)
+    def tracing(self) -> Optional[bool]:
+        """Publish the ingress and egress times of the traced camera frames in
+        :meth:`.trace_event`
+        """
+
+    @ROS.publish(ROS_TOPIC_TRACE, QoSPresetProfiles.SYSTEM_DEFAULT.value)
+    def trace_event(self, event: TraceEvent) -> Optional[TraceEvent]:
+        """Outgoing latency trace event, published only if :attr:`.tracing` is
+        enabled
+        """
+        return event
+
     def _odometry_cb(self, msg: Odometry) -> None:
         """Callback for :attr:`.odometry`"""
+        self._tracer.ingress(ROS_TOPIC_ROBOT_LOCALIZATION_ODOMETRY, msg.header.stamp)
         self._publish(msg)
 
     @property
@@ -272,7 +300,7 @@ class UORBNode(Node):
                 vel_n_m_s, vel_e_m_s, vel_n_m_s_var, vel_e_m_s_var
             )
 
-            self.sensor_gps(
+            sensor_gps = self.sensor_gps(
                 int(lat * 1e7),
                 int(lon * 1e7),
                 alt_ellipsoid,
@@ -290,6 +318,12 @@ class UORBNode(Node):
                 epv,
                 satellites_visible,
             )
+            if sensor_gps is not None:
+                self._tracer.egress(
+                    ROS_TOPIC_ROBOT_LOCALIZATION_ODOMETRY,
+                    ROS_TOPIC_SENSOR_GPS,
+                    odometry.header.stamp,
+                )
 
         _publish_inner(odometry)
 
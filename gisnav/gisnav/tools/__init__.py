@@ -0,0 +1 @@
+"""Command line tools for preparing GISNav missions offline"""
@@ -0,0 +1,223 @@
+"""Builds the offline deep matching feature database of a mission corridor
+
+Parses a QGroundControl mission plan, buffers its waypoints into a corridor polygon
+and covers the corridor with the same tile grid as :mod:`.tools.preload_corridor`.
+Every tile is fetched once with a margin, and DISK features are extracted from it
+at every rotation step into the feature database that :class:`.PoseNode` reads
+reference features from (see :mod:`._feature_db`).
+
+.. code-block:: bash
+    :caption: Build the KSQL airport mission feature database
+
+    build_feature_db docker/qgc/ksql_airport_px4.plan \\
+        --url "http://localhost/cgi-bin/mapserv.cgi?map=/etc/mapserver/default.map"
+"""
+import argparse
+import sys
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+import torch
+from kornia.feature import DISK
+
+from .._corridor import (
+    _METERS_IN_DEGREE,
+    SUPPORTED_SRS,
+    corridor_polygon,
+    grid_tile_bbox,
+    grid_tile_indices,
+    load_plan_waypoints,
+)
+from .._feature_cache import rotation_matrix
+from .._feature_db import FeatureDatabaseWriter
+from .._raster_source import RasterSource
+from .._transformations import BBox
+from ..core.gis_node import GISNode
+from ..core.pose_node import PoseNode
+from .preload_corridor import add_raster_source_arguments, create_raster_source
+
+
+def _fetch_tile(
+    raster_source: RasterSource,
+    args: argparse.Namespace,
+    bbox: BBox,
+) -> Tuple[Optional[np.ndarray], BBox, float]:
+    """Returns the grayscale raster of the tile with a margin
+
+    The raster is square in meters and large enough for its inscribed circle to
+    cover the whole tile, so that the tile is never cropped when the raster is
+    rotated around its center.
+
+    :return: Tuple of raster or None if not available, bounding box of the
+        raster, and tile area in pixels
+    """
+    latitude = (bbox.bottom + bbox.top) / 2
+    meters_x = (
+        (bbox.right - bbox.left) * _METERS_IN_DEGREE * np.cos(np.radians(latitude))
+    )
+    meters_y = (bbox.top - bbox.bottom) * _METERS_IN_DEGREE
+    side = int(np.ceil(np.hypot(meters_x, meters_y) / args.gsd))
+
+    half_x = side * args.gsd / (2 * meters_x) * (bbox.right - bbox.left)
+    half_y = side * args.gsd / (2 * meters_y) * (bbox.top - bbox.bottom)
+    center_x, center_y = (bbox.left + bbox.right) / 2, latitude
+    raster_bbox = BBox(
+        center_x - half_x, center_y - half_y, center_x + half_x, center_y + half_y
+    )
+
+    raster = raster_source.get_map(
+        args.layers,
+        args.styles,
+        SUPPORTED_SRS,
+        raster_bbox,
+        (side, side),
+        args.format,
+        args.transparency,
+        grayscale=True,
+    )
+    return raster, raster_bbox, meters_x * meters_y / args.gsd**2
+
+
+def main() -> None:
+    """Parses command line arguments and builds the feature database"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("plan", help="QGroundControl mission plan (.plan) file.")
+    add_raster_source_arguments(parser)
+    parser.add_argument("--layers", nargs="+", default=GISNode.ROS_D_LAYERS)
+    parser.add_argument("--styles", nargs="+", default=GISNode.ROS_D_STYLES)
+    parser.add_argument("--format", default=GISNode.ROS_D_IMAGE_FORMAT)
+    parser.add_argument(
+        "--transparency",
+        action="store_true",
+        default=GISNode.ROS_D_IMAGE_TRANSPARENCY,
+    )
+    parser.add_argument(
+        "--buffer",
+        type=float,
+        default=GISNode.ROS_D_CORRIDOR_BUFFER,
+        help="Corridor half-width in meters.",
+    )
+    parser.add_argument(
+        "--step",
+        type=float,
+        default=GISNode.ROS_D_CORRIDOR_TILE_STEP,
+        help="Tile grid step in degrees.",
+    )
+    parser.add_argument(
+        "--gsd",
+        type=float,
+        default=GISNode.ROS_D_ORTHOIMAGE_GSD,
+        help="Ground sampling distance in meters per pixel, should match the "
+        "orthoimage GSD used in flight.",
+    )
+    parser.add_argument(
+        "--rotation-step",
+        type=float,
+        default=PoseNode.REFERENCE_FEATURE_ROTATION_STEP,
+        help="Rotation step in degrees, must divide a full turn.",
+    )
+    parser.add_argument(
+        "--keypoints",
+        type=int,
+        default=PoseNode.MAX_KEYPOINTS,
+        help="Approximate number of keypoints per tile and rotation step.",
+    )
+    parser.add_argument("--output-dir", default=PoseNode.ROS_D_FEATURE_DB_DIR)
+    args = parser.parse_args()
+
+    if args.gsd <= 0:
+        print("Ground sampling distance must be positive.", file=sys.stderr)
+        sys.exit(1)
+    rotations = int(round(360 / args.rotation_step))
+
+    try:
+        polygon = corridor_polygon(load_plan_waypoints(args.plan), args.buffer)
+    except (OSError, ValueError) as e:
+        print(f"Could not load mission plan: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    extractor = DISK.from_pretrained("depth").to(device).eval()
+
+    raster_source = create_raster_source(args, pool_size=1)
+    indices = grid_tile_indices(polygon, args.step)
+    print(
+        f"Extracting features from {len(indices)} tiles at {rotations} rotation "
+        f"steps into {args.output_dir}..."
+    )
+
+    writer: Optional[FeatureDatabaseWriter] = None
+    failed = 0
+    for i, (column, row) in enumerate(indices):
+        bbox = grid_tile_bbox(column, row, args.step)
+        try:
+            raster, raster_bbox, tile_area = _fetch_tile(raster_source, args, bbox)
+        except Exception as e:
+            print(f"Could not fetch tile {column, row}: {e}", file=sys.stderr)
+            raster = None
+        if raster is None:
+            failed += 1
+            continue
+
+        side = raster.shape[0]
+        max_keypoints = int(args.keypoints * side**2 / tile_area)
+        for rotation in range(rotations):
+            matrix, size = rotation_matrix(
+                raster.shape[:2], rotation * 360 / rotations, 1.0
+            )
+            rotated = cv2.warpAffine(raster, matrix, size)
+            tensor = torch.Tensor(rotated[None, None]).to(device) / 255.0
+            with torch.inference_mode():
+                features = extractor(
+                    tensor.expand(-1, 3, -1, -1),
+                    max_keypoints,
+                    pad_if_not_divisible=True,
+                )[0]
+
+            if writer is None:
+                writer = FeatureDatabaseWriter(
+                    args.output_dir,
+                    args.step,
+                    args.gsd,
+                    rotations,
+                    features.descriptors.shape[1],
+                )
+
+            # Rotated raster pixels to raster pixels to WGS 84 coordinates
+            inverse = cv2.invertAffineTransform(matrix)
+            pixels = features.keypoints.cpu().numpy() @ inverse[:, :2].T + inverse[:, 2]
+            longitude = raster_bbox.left + pixels[:, 0] * (
+                (raster_bbox.right - raster_bbox.left) / side
+            )
+            latitude = raster_bbox.top - pixels[:, 1] * (
+                (raster_bbox.top - raster_bbox.bottom) / side
+            )
+
+            # Keep only keypoints inside the tile, the margin belongs to other tiles
+            inside = (
+                (longitude >= bbox.left)
+                & (longitude < bbox.right)
+                & (latitude >= bbox.bottom)
+                & (latitude < bbox.top)
+            )
+            writer.add(
+                column,
+                row,
+                rotation,
+                np.column_stack((longitude, latitude))[inside],
+                features.detection_scores.cpu().numpy()[inside],
+                features.descriptors.cpu().numpy()[inside],
+            )
+
+        print(f"Tile {i + 1}/{len(indices)} done.")
+
+    if writer is not None:
+        writer.close()
+
+    print(f"Extracted {len(indices) - failed} tiles, {failed} failed.")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Exports the deep matching models for the TorchScript and ONNX Runtime runtimes
+
+Traces the DISK feature extractor backbone and saves it into the model directory
+that :class:`.PoseNode` loads the exported models from (see :mod:`._deep_matching`).
+The output of each exported model is compared against the eager mode model on a
+random input to catch export errors early.
+
+The ``compile`` and ``int8`` runtimes compile or quantize the models when
+:class:`.PoseNode` starts and do not need to be exported.
+
+.. code-block:: bash
+    :caption: Export the models for all runtimes
+
+    export_deep_matching_models --runtime torchscript onnx
+"""
+import argparse
+import sys
+
+import torch
+from kornia.feature import DISK
+
+from .._deep_matching import export_extractor_backbone, load_extractor_backbone
+from ..core.pose_node import PoseNode
+
+
+def main() -> None:
+    """Parses command line arguments and exports the models"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--runtime",
+        nargs="+",
+        choices=("torchscript", "onnx"),
+        default=["torchscript", "onnx"],
+    )
+    parser.add_argument("--output-dir", default=PoseNode.ROS_D_MODEL_DIR)
+    parser.add_argument(
+        "--height",
+        type=int,
+        default=480,
+        help="Example input height in pixels, must be divisible by 16.",
+    )
+    parser.add_argument(
+        "--width",
+        type=int,
+        default=640,
+        help="Example input width in pixels, must be divisible by 16.",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1e-3,
+        help="Maximum absolute difference to the eager mode backbone output.",
+    )
+    args = parser.parse_args()
+
+    if args.height % 16 or args.width % 16:
+        print("Example input size must be divisible by 16.", file=sys.stderr)
+        sys.exit(1)
+
+    eager = DISK.from_pretrained("depth").eval().unet
+    # Different size than the example input to check that the size is not fixed
+    images = torch.rand(1, 3, args.height + 16, args.width + 16)
+    with torch.inference_mode():
+        expected = eager(images)
+
+    failed = False
+    for runtime in args.runtime:
+        path = export_extractor_backbone(
+            args.output_dir, runtime, args.height, args.width
+        )
+        backbone = load_extractor_backbone(
+            args.output_dir, runtime, torch.device("cpu")
+        )
+        with torch.inference_mode():
+            output = backbone(images)
+        error = float((output - expected).abs().max())
+        print(f"Exported {runtime} model to {path}, maximum error {error:.2e}.")
+        if error > args.tolerance:
+            print(f"The {runtime} model output does not match.", file=sys.stderr)
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Preloads the orthoimagery and DEM rasters of a mission corridor
+
+Parses a QGroundControl mission plan, buffers its waypoints into a corridor polygon
+and fetches all imagery and DEM tiles that intersect the corridor in parallel into
+the mission corridor tile store that :class:`.GISNode` serves rasters from.
+
+.. code-block:: bash
+    :caption: Preload the KSQL airport mission corridor
+
+    preload_corridor docker/qgc/ksql_airport_px4.plan \\
+        --url "http://localhost/cgi-bin/mapserv.cgi?map=/etc/mapserver/default.map"
+"""
+import argparse
+import sys
+
+from .._corridor import CorridorTileStore, corridor_polygon, load_plan_waypoints
+from .._raster_source import GDALRasterSource, RasterSource, WMSRasterSource
+from .._wms_client import WMSClient
+from ..core.gis_node import GISNode
+
+
+def add_raster_source_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the command line arguments for :func:`.create_raster_source`"""
+    parser.add_argument("--url", default=GISNode.ROS_D_URL, help="WMS endpoint URL.")
+    parser.add_argument("--wms-version", default=GISNode.ROS_D_VERSION)
+    parser.add_argument("--timeout", type=int, default=GISNode.ROS_D_TIMEOUT)
+    parser.add_argument(
+        "--raster-source", choices=("wms", "gdal"), default=GISNode.ROS_D_RASTER_SOURCE
+    )
+    parser.add_argument("--gdal-data-dir", default=GISNode.ROS_D_GDAL_DATA_DIR)
+
+
+def create_raster_source(args: argparse.Namespace, pool_size: int) -> RasterSource:
+    """Returns the raster source to fetch the tiles from
+
+    :param args: Parsed command line arguments (see
+        :func:`.add_raster_source_arguments`)
+    :param pool_size: Maximum number of concurrent WMS connections
+    :return: Raster source
+    :raise requests.exceptions.RequestException: If the WMS endpoint cannot be
+        connected
+    """
+    if args.raster_source == "gdal":
+        return GDALRasterSource(args.gdal_data_dir)
+    wms_client = WMSClient(
+        args.url, args.wms_version, args.timeout, pool_size=pool_size
+    )
+    wms_client.connect()
+    return WMSRasterSource(wms_client)
+
+
+def main() -> None:
+    """Parses command line arguments and preloads the mission corridor"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("plan", help="QGroundControl mission plan (.plan) file.")
+    add_raster_source_arguments(parser)
+    parser.add_argument("--layers", nargs="+", default=GISNode.ROS_D_LAYERS)
+    parser.add_argument("--styles", nargs="+", default=GISNode.ROS_D_STYLES)
+    parser.add_argument("--dem-layers", nargs="+", default=GISNode.ROS_D_DEM_LAYERS)
+    parser.add_argument("--dem-styles", nargs="+", default=GISNode.ROS_D_DEM_STYLES)
+    parser.add_argument("--format", default=GISNode.ROS_D_IMAGE_FORMAT)
+    parser.add_argument(
+        "--transparency",
+        action="store_true",
+        default=GISNode.ROS_D_IMAGE_TRANSPARENCY,
+    )
+    parser.add_argument(
+        "--buffer",
+        type=float,
+        default=GISNode.ROS_D_CORRIDOR_BUFFER,
+        help="Corridor half-width in meters.",
+    )
+    parser.add_argument(
+        "--step",
+        type=float,
+        default=GISNode.ROS_D_CORRIDOR_TILE_STEP,
+        help="Tile grid step in degrees (ignored for an existing store).",
+    )
+    parser.add_argument(
+        "--tile-size",
+        type=int,
+        default=GISNode.ROS_D_CORRIDOR_TILE_SIZE,
+        help="Tile size in pixels (ignored for an existing store).",
+    )
+    parser.add_argument("--store-dir", default=GISNode.ROS_D_CORRIDOR_DIR)
+    parser.add_argument(
+        "--max-bytes", type=int, default=GISNode.ROS_D_CORRIDOR_MAX_BYTES
+    )
+    parser.add_argument("--max-workers", type=int, default=8)
+    args = parser.parse_args()
+
+    try:
+        polygon = corridor_polygon(load_plan_waypoints(args.plan), args.buffer)
+    except (OSError, ValueError) as e:
+        print(f"Could not load mission plan: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    raster_source = create_raster_source(args, args.max_workers)
+    store = CorridorTileStore(args.store_dir, args.step, args.tile_size, args.max_bytes)
+    try:
+        print(
+            f"Preloading {len(store.tile_indices(polygon))} tiles per layer into "
+            f"{args.store_dir}..."
+        )
+        failed = 0
+        for layers, styles, grayscale in (
+            (args.layers, args.styles, False),
+            (args.dem_layers, args.dem_styles, True),
+        ):
+            counts = store.preload(
+                raster_source,
+                polygon,
+                layers,
+                styles,
+                args.format,
+                args.transparency,
+                grayscale,
+                args.max_workers,
+            )
+            print(f"Layers {layers}: {counts}")
+            failed += counts["failed"]
+    finally:
+        store.close()
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -70,10 +70,12 @@ packages_ = [
     pdata.package_name,
     pdata.package_name + ".core",
     pdata.package_name + ".extensions",
+    pdata.package_name + ".tools",
     "test",
     "test.unit",
     "test.launch",
     "test.sitl",
+    "test.benchmark",
 ]
 
 setup(
@@ -122,6 +124,8 @@ setup(
     extras_require={
         "nmea_node": ["pynmea2"],
         "qgis_node": ["psycopg2"],
+        "gdal_raster_source": ["rasterio"],
+        "onnx_runtime": ["onnx", "onnxruntime"],
         "dev": [
             "aiohttp",
             "autodocsumm",
@@ -153,7 +157,12 @@ setup(
             "stereo_node = gisnav:run_stereo_node",
             "pose_node = gisnav:run_pose_node",
             "bbox_node = gisnav:run_bbox_node",
+            "trace_node = gisnav:run_trace_node",
             "qgis_node = gisnav:run_qgis_node",
+            "preload_corridor = gisnav.tools.preload_corridor:main",
+            "build_feature_db = gisnav.tools.build_feature_db:main",
+            "export_deep_matching_models = "
+            "gisnav.tools.export_deep_matching_models:main",
         ],
     },
 )
@@ -0,0 +1,6 @@
+"""This sub-package contains benchmark scripts for comparing the performance of
+alternative implementations
+
+The benchmarks are not run as part of the test suites. Each script is run manually
+and prints its results to standard output.
+"""
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Benchmarks deep matching throughput with increasing numbers of worker processes
+
+The same pair of query and reference images is matched repeatedly, first in the
+current process and then with :class:`.DeepMatchingPool` pools of increasing size.
+The pool is kept full like :class:`.PoseNode` does, and the results are consumed
+in submission order through a :class:`.ReorderBuffer`. The throughput and latency
+of each configuration are printed.
+
+If only one image is provided, the reference image is synthesized by shifting and
+slightly rotating the query image.
+
+.. code-block:: bash
+    :caption: Run deep matching pool benchmark
+
+    cd ~/colcon_ws/src/gisnav/gisnav
+    python test/benchmark/benchmark_deep_matching_pool.py frame.png --workers 1 2 4
+"""
+import argparse
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import List, Set, Tuple
+
+import cv2
+import numpy as np
+import torch
+
+from gisnav._deep_matching import DeepMatcher, DeepMatchingPool, ReorderBuffer
+from gisnav.core.pose_node import PoseNode
+
+
+def _benchmark_pool(
+    workers: int, qry: np.ndarray, ref: np.ndarray, frames: int
+) -> Tuple[float, List[float]]:
+    """Matches the image pair with a worker pool and returns the throughput in
+    frames per second and the latencies in seconds
+    """
+    pool = DeepMatchingPool(
+        workers, PoseNode.CONFIDENCE_THRESHOLD_DEEP_MATCH, PoseNode.MAX_KEYPOINTS
+    )
+    try:
+        # Warm up, wait until all workers have loaded their models
+        wait([pool.submit(qry, ref) for _ in range(workers)])
+
+        buffer: ReorderBuffer[float] = ReorderBuffer(workers)
+        in_flight: Set[Future] = set()
+        latencies = []
+        submitted = 0
+        start = time.perf_counter()
+        while len(latencies) < frames:
+            while submitted < frames and not buffer.full():
+                future = pool.submit(qry, ref)
+                buffer.push(future, time.perf_counter())
+                in_flight.add(future)
+                submitted += 1
+            _, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future, submit_time in buffer.pop_ready():
+                future.result()
+                latencies.append(time.perf_counter() - submit_time)
+        return frames / (time.perf_counter() - start), latencies
+    finally:
+        pool.close()
+
+
+def main() -> None:
+    """Parses command line arguments and runs the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("query", help="Query image")
+    parser.add_argument("reference", nargs="?", help="Reference image")
+    parser.add_argument("--frames", type=int, default=40)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    qry = cv2.imread(args.query, cv2.IMREAD_GRAYSCALE)
+    if args.reference is not None:
+        ref = cv2.imread(args.reference, cv2.IMREAD_GRAYSCALE)
+    else:
+        height, width = qry.shape
+        M = cv2.getRotationMatrix2D((width / 2, height / 2), 2.0, 1.0)
+        M[:, 2] += (8, 5)
+        ref = cv2.warpAffine(qry, M, (width, height))
+
+    matcher = DeepMatcher(
+        torch.device("cpu"),
+        PoseNode.CONFIDENCE_THRESHOLD_DEEP_MATCH,
+        PoseNode.MAX_KEYPOINTS,
+    )
+    matcher.match(qry, ref)
+    latencies = []
+    for _ in range(args.frames):
+        start = time.perf_counter()
+        matcher.match(qry, ref)
+        latencies.append(time.perf_counter() - start)
+    print(
+        f"in process: {1 / np.mean(latencies):.2f} frames/s, "
+        f"mean latency {np.mean(latencies) * 1000:.0f} ms"
+    )
+
+    for workers in args.workers:
+        throughput, latencies = _benchmark_pool(workers, qry, ref, args.frames)
+        print(
+            f"{workers} workers: {throughput:.2f} frames/s, "
+            f"mean latency {np.mean(latencies) * 1000:.0f} ms, "
+            f"p95 {np.percentile(latencies, 95) * 1000:.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
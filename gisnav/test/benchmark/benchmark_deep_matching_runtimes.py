@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""Benchmarks deep matching latency and accuracy with different inference runtimes
+
+The same pair of query and reference images is matched with each combination of
+DISK extractor and LightGlue matcher runtimes (see :mod:`._deep_matching`). The
+latency, number of matches, and agreement with the matches of the eager mode
+baseline are printed for each combination. Agreement is the fraction of baseline
+matches that are reproduced within the given pixel tolerance.
+
+If only one image is provided, the reference image is synthesized by shifting and
+slightly rotating the query image, and the reprojection error of the matches
+under the known transformation is printed as well.
+
+The script exits with a non-zero exit code if any combination cannot be built or
+its agreement is below the minimum. Combinations whose optional dependencies are
+not installed are skipped. The parity is also tested in
+:mod:`test.unit.test_deep_matching_runtimes`.
+
+.. code-block:: bash
+    :caption: Run deep matching runtimes benchmark
+
+    cd ~/colcon_ws/src/gisnav/gisnav
+    python test/benchmark/benchmark_deep_matching_runtimes.py frame.png \\
+        --runtimes eager:int8 torchscript:eager onnx:int8
+"""
+import argparse
+import sys
+import time
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+import torch
+
+from gisnav._deep_matching import DeepMatcher
+from gisnav.core.pose_node import PoseNode
+
+
+def _benchmark_runtime(
+    matcher: DeepMatcher, qry: np.ndarray, ref: np.ndarray, frames: int
+) -> Tuple[List[float], Tuple[np.ndarray, np.ndarray]]:
+    """Matches the image pair repeatedly and returns the latencies in seconds
+    and the matches of the last frame
+    """
+    matches = matcher.match(qry, ref)  # warm up, e.g. torch.compile
+    latencies = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        matches = matcher.match(qry, ref)
+        latencies.append(time.perf_counter() - start)
+    return latencies, matches
+
+
+def _agreement(
+    matches: Tuple[np.ndarray, np.ndarray],
+    baseline: Tuple[np.ndarray, np.ndarray],
+    tolerance: float,
+) -> float:
+    """Returns the fraction of baseline matches that have a match within the
+    tolerance in both the query and reference images
+    """
+    if len(baseline[0]) == 0:
+        return 1.0
+    if len(matches[0]) == 0:
+        return 0.0
+    points = np.hstack(matches)
+    baseline_points = np.hstack(baseline)
+    distances = np.abs(baseline_points[:, None, :] - points[None, :, :]).max(axis=2)
+    return float(np.mean(distances.min(axis=1) <= tolerance))
+
+
+def _reprojection_error(
+    matches: Tuple[np.ndarray, np.ndarray], M: np.ndarray
+) -> Optional[float]:
+    """Returns the median error of the matches in pixels under the known affine
+    transformation from the query to the reference image
+    """
+    mkp_qry, mkp_ref = matches
+    if len(mkp_qry) == 0:
+        return None
+    projected = mkp_qry @ M[:, :2].T + M[:, 2]
+    return float(np.median(np.linalg.norm(projected - mkp_ref, axis=1)))
+
+
+def main() -> None:
+    """Parses command line arguments and runs the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("query", help="Query image")
+    parser.add_argument("reference", nargs="?", help="Reference image")
+    parser.add_argument("--frames", type=int, default=20)
+    parser.add_argument(
+        "--runtimes",
+        nargs="+",
+        default=["eager:int8", "compile:compile", "torchscript:eager", "onnx:eager"],
+        help="Extractor and matcher runtime pairs separated by a colon.",
+    )
+    parser.add_argument("--model-dir", default=PoseNode.ROS_D_MODEL_DIR)
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1.0,
+        help="Maximum distance in pixels to a baseline match for agreement.",
+    )
+    parser.add_argument(
+        "--min-agreement",
+        type=float,
+        default=0.9,
+        help="Minimum agreement with the baseline matches for each runtime.",
+    )
+    args = parser.parse_args()
+
+    qry = cv2.imread(args.query, cv2.IMREAD_GRAYSCALE)
+    M = None
+    if args.reference is not None:
+        ref = cv2.imread(args.reference, cv2.IMREAD_GRAYSCALE)
+    else:
+        height, width = qry.shape
+        M = cv2.getRotationMatrix2D((width / 2, height / 2), 2.0, 1.0)
+        M[:, 2] += (8, 5)
+        ref = cv2.warpAffine(qry, M, (width, height))
+
+    def _print_result(
+        name: str, latencies: List[float], matches: Tuple[np.ndarray, np.ndarray]
+    ) -> None:
+        result = (
+            f"{name}: mean latency {np.mean(latencies) * 1000:.0f} ms, "
+            f"p95 {np.percentile(latencies, 95) * 1000:.0f} ms, "
+            f"{len(matches[0])} matches"
+        )
+        if M is not None:
+            error = _reprojection_error(matches, M)
+            if error is not None:
+                result += f", median error {error:.2f} px"
+        print(result)
+
+    baseline_matcher = DeepMatcher(
+        torch.device("cpu"),
+        PoseNode.CONFIDENCE_THRESHOLD_DEEP_MATCH,
+        PoseNode.MAX_KEYPOINTS,
+    )
+    latencies, baseline = _benchmark_runtime(baseline_matcher, qry, ref, args.frames)
+    _print_result("eager:eager", latencies, baseline)
+    del baseline_matcher
+
+    failed = False
+    for runtimes in args.runtimes:
+        extractor_runtime, matcher_runtime = runtimes.split(":")
+        try:
+            matcher = DeepMatcher(
+                torch.device("cpu"),
+                PoseNode.CONFIDENCE_THRESHOLD_DEEP_MATCH,
+                PoseNode.MAX_KEYPOINTS,
+                extractor_runtime=extractor_runtime,
+                matcher_runtime=matcher_runtime,
+                model_dir=args.model_dir,
+            )
+        except ModuleNotFoundError as e:
+            # Optional dependency of the runtime is not installed
+            print(f"{runtimes}: skipped, {e}", file=sys.stderr)
+            continue
+        except (OSError, ValueError) as e:
+            print(f"{runtimes}: could not be built, {e}", file=sys.stderr)
+            failed = True
+            continue
+
+        latencies, matches = _benchmark_runtime(matcher, qry, ref, args.frames)
+        agreement = _agreement(matches, baseline, args.tolerance)
+        _print_result(runtimes, latencies, matches)
+        print(f"{runtimes}: agreement with eager:eager {agreement:.1%}")
+        if agreement < args.min_agreement:
+            print(f"{runtimes}: agreement below minimum.", file=sys.stderr)
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""Benchmarks the PnP solver against the previous fixed RANSAC call
+
+A camera that moves slowly over terrain is simulated. For each frame,
+correspondences between reference image pixels with elevation and query image
+pixels are generated from the true camera pose, with pixel noise and a fraction
+of outliers. The correspondences are sorted by a synthetic match confidence that
+is on average higher for the inliers, like the matches from :class:`.DeepMatcher`.
+
+The previous call (:func:`cv2.solvePnPRansac` with 10 iterations on all
+correspondences) and :class:`.PnPSolver` with each robust method, both without
+and with warm start from the previous frame, are run on the same frames. The
+solve time, the pose error and the inlier ratio are printed for each. The inlier
+ratio of :class:`.PnPSolver` is relative to the correspondences that remain after
+budgeting.
+
+.. code-block:: bash
+    :caption: Run PnP benchmark
+
+    cd ~/colcon_ws/src/gisnav/gisnav
+    python test/benchmark/benchmark_pnp.py --correspondences 250 1000 4000
+"""
+import argparse
+import time
+from typing import Callable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from gisnav._pnp import PNP_METHODS, PnPSolver
+
+_Frame = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+"""Tuple of object points, image points, true rotation vector and true
+translation vector"""
+
+_Solution = Tuple[np.ndarray, np.ndarray, float]
+"""Tuple of rotation vector, translation vector and inlier ratio"""
+
+_Solve = Callable[[np.ndarray, np.ndarray], Optional[_Solution]]
+
+_K = np.array([[600.0, 0.0, 320.0], [0.0, 600.0, 240.0], [0.0, 0.0, 1.0]])
+"""Camera intrinsic matrix of a 640x480 camera"""
+
+
+def _frames(
+    count: int, correspondences: int, outlier_ratio: float, noise: float, seed: int
+) -> List[_Frame]:
+    """Returns the correspondences of consecutive frames of a slowly moving
+    nadir-looking camera
+    """
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i in range(count):
+        # Camera above the reference image center, looking down with some tilt,
+        # the field of view covers approximately the middle 530 x 400 pixels
+        rvec = np.array([[np.pi + 0.05 + 0.002 * i], [0.03], [0.1 + 0.004 * i]])
+        position = np.array([[400.0 + 2.0 * i], [300.0 + 1.0 * i], [500.0]])
+        r, _ = cv2.Rodrigues(rvec)
+        tvec = -r @ position
+
+        object_points = np.column_stack(
+            (
+                rng.uniform(140, 660, correspondences),
+                rng.uniform(110, 490, correspondences),
+                rng.uniform(0, 50, correspondences),
+            )
+        )
+        image_points, _ = cv2.projectPoints(object_points, rvec, tvec, _K, None)
+        image_points = image_points.reshape(-1, 2)
+        image_points += rng.normal(0, noise, image_points.shape)
+
+        outliers = rng.random(correspondences) < outlier_ratio
+        image_points[outliers] = rng.uniform(
+            (0, 0), (640, 480), (np.count_nonzero(outliers), 2)
+        )
+        confidence = rng.random(correspondences) + 0.5 * ~outliers
+        order = np.argsort(-confidence)
+        frames.append((object_points[order], image_points[order], rvec, tvec))
+    return frames
+
+
+def _current(
+    object_points: np.ndarray, image_points: np.ndarray
+) -> Optional[_Solution]:
+    """Solves the pose like :class:`.PoseNode` did before :class:`.PnPSolver`"""
+    success, rvec, tvec, inliers = cv2.solvePnPRansac(
+        object_points,
+        image_points,
+        _K,
+        np.zeros((4, 1)),
+        useExtrinsicGuess=False,
+        iterationsCount=10,
+    )
+    if not success or inliers is None:
+        return None
+    return rvec, tvec, len(inliers) / len(object_points)
+
+
+def _solver(method: str, warm_start: bool) -> _Solve:
+    """Returns a solve callable that uses :class:`.PnPSolver`, a new solver is
+    created for every frame if there is no warm start
+    """
+    solver = PnPSolver(method)
+
+    def _solve(
+        object_points: np.ndarray, image_points: np.ndarray
+    ) -> Optional[_Solution]:
+        result = (solver if warm_start else PnPSolver(method)).solve(
+            object_points, image_points, _K
+        )
+        if result is None:
+            return None
+        rvec, _ = cv2.Rodrigues(result.r)
+        return rvec, result.t, result.inlier_ratio
+
+    return _solve
+
+
+def _benchmark(name: str, solve: _Solve, frames: List[_Frame]) -> None:
+    """Solves the frames and prints the solve time and pose error statistics"""
+    latencies = []
+    position_errors = []
+    rotation_errors = []
+    inlier_ratios = []
+    for object_points, image_points, rvec_true, tvec_true in frames:
+        start = time.perf_counter()
+        pose = solve(object_points, image_points)
+        latencies.append(time.perf_counter() - start)
+        if pose is None:
+            continue
+        rvec, tvec, inlier_ratio = pose
+        inlier_ratios.append(inlier_ratio)
+        r, _ = cv2.Rodrigues(rvec)
+        r_true, _ = cv2.Rodrigues(rvec_true)
+        position_errors.append(
+            float(np.linalg.norm(-r.T @ tvec - (-r_true.T @ tvec_true)))
+        )
+        rotation_errors.append(
+            float(np.degrees(np.linalg.norm(cv2.Rodrigues(r @ r_true.T)[0])))
+        )
+
+    solved = len(position_errors)
+    result = (
+        f"{name}: median {np.median(latencies) * 1000:.2f} ms, "
+        f"p95 {np.percentile(latencies, 95) * 1000:.2f} ms, "
+        f"max {np.max(latencies) * 1000:.2f} ms, solved {solved}/{len(frames)}"
+    )
+    if solved:
+        result += (
+            f", median position error {np.median(position_errors):.2f} px, "
+            f"median rotation error {np.median(rotation_errors):.3f} deg, "
+            f"median inlier ratio {np.median(inlier_ratios):.2f}"
+        )
+    print(result)
+
+
+def main() -> None:
+    """Parses command line arguments and runs the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=50)
+    parser.add_argument(
+        "--correspondences", type=int, nargs="+", default=[250, 1000, 4000]
+    )
+    parser.add_argument("--outlier-ratio", type=float, default=0.3)
+    parser.add_argument("--noise", type=float, default=1.0, help="Pixel noise SD")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for correspondences in args.correspondences:
+        print(f"{correspondences} correspondences:")
+        frames = _frames(
+            args.frames, correspondences, args.outlier_ratio, args.noise, args.seed
+        )
+        _benchmark("  current", _current, frames)
+        for method in PNP_METHODS:
+            _benchmark(f"  {method}", _solver(method, False), frames)
+            _benchmark(f"  {method} warm", _solver(method, True), frames)
+
+
+if __name__ == "__main__":
+    main()
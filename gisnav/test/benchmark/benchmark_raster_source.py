@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Benchmarks the WMS and GDAL raster sources used by :class:`.GISNode`
+
+Both sources are asked for the same imagery and DEM rasters and the latency of each
+request is measured. The mean absolute difference between the rasters returned by
+the two sources is also printed to show the effect of lossy image encoding.
+
+Must be run where both the MapServer WMS endpoint and the raster datasets behind it
+are available, e.g. inside the MapServer container or on a host that mounts the same
+volume.
+
+.. code-block:: bash
+    :caption: Run raster source benchmark
+
+    cd ~/colcon_ws/src/gisnav/gisnav
+    python test/benchmark/benchmark_raster_source.py \\
+        --wms-url "http://gisnav-mapserver-1/cgi-bin/mapserv.cgi?map=/etc/mapserver/default.map" \\
+        --gdal-data-dir /etc/mapserver \\
+        --bbox -122.26 37.52 -122.25 37.53
+"""  # noqa: E501
+import argparse
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from gisnav._raster_source import GDALRasterSource, RasterSource, WMSRasterSource
+from gisnav._transformations import BBox
+from gisnav._wms_client import WMSClient
+
+
+def _benchmark(
+    source: RasterSource,
+    layer: str,
+    bbox: BBox,
+    size: Tuple[int, int],
+    grayscale: bool,
+    iterations: int,
+) -> Tuple[List[float], Optional[np.ndarray]]:
+    """Requests the same raster repeatedly and returns the latencies in seconds and
+    the last raster
+    """
+    latencies = []
+    raster = None
+    for _ in range(iterations):
+        start = time.monotonic()
+        raster = source.get_map(
+            [layer], [""], "EPSG:4326", bbox, size, "image/jpeg", False, grayscale
+        )
+        latencies.append(time.monotonic() - start)
+    return latencies, raster
+
+
+def _summary(latencies: List[float]) -> str:
+    """Returns latency statistics in milliseconds as a string"""
+    ms = np.array(latencies) * 1000
+    return (
+        f"mean {ms.mean():.1f} ms, p50 {np.percentile(ms, 50):.1f} ms, "
+        f"p95 {np.percentile(ms, 95):.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--wms-url", required=True, help="WMS endpoint URL")
+    parser.add_argument(
+        "--gdal-data-dir", default="/etc/mapserver", help="GDAL dataset directory"
+    )
+    parser.add_argument(
+        "--bbox",
+        nargs=4,
+        type=float,
+        required=True,
+        metavar=("LEFT", "BOTTOM", "RIGHT", "TOP"),
+        help="WGS 84 bounding box",
+    )
+    parser.add_argument("--size", type=int, default=1469, help="Raster side length")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    bbox = BBox(*args.bbox)
+    wms_client = WMSClient(args.wms_url, "1.3.0", 10)
+    wms_client.connect()
+    size = (args.size, args.size)
+    sources: Dict[str, RasterSource] = {
+        "wms": WMSRasterSource(wms_client),
+        "gdal": GDALRasterSource(args.gdal_data_dir),
+    }
+
+    for layer, grayscale in (("imagery", False), ("dem", True)):
+        rasters = {}
+        for name, source in sources.items():
+            # Warm up connections and dataset handles before measuring
+            source.get_map(
+                [layer], [""], "EPSG:4326", bbox, size, "image/jpeg", False, grayscale
+            )
+            latencies, rasters[name] = _benchmark(
+                source, layer, bbox, size, grayscale, args.iterations
+            )
+            print(f"{layer} ({name}): {_summary(latencies)}")
+
+        if rasters["wms"] is not None and rasters["gdal"] is not None:
+            diff = np.abs(
+                rasters["wms"].astype(np.float32) - rasters["gdal"].astype(np.float32)
+            )
+            print(f"{layer}: mean absolute difference {diff.mean():.2f}")
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Benchmarks shallow and deep keypoint matching for visual odometry (VO)
+
+All matching engines that :class:`.PoseNode` can use for VO are run on the same
+pair of subsequent camera frames, and the latency, throughput and number of
+matches of each engine are printed.
+
+If only one image is provided, the reference image is synthesized by shifting and
+slightly rotating the query image to simulate camera motion between frames.
+
+> [!NOTE]
+> The optical flow tracker is benchmarked on consecutive frames in steady state,
+> i.e. it keeps tracking the keypoints of the previous iteration back and forth
+> between the two images.
+
+.. code-block:: bash
+    :caption: Run VO matching benchmark
+
+    cd ~/colcon_ws/src/gisnav/gisnav
+    python test/benchmark/benchmark_vo_matching.py frame_0001.png frame_0002.png
+"""
+import argparse
+import time
+from typing import Callable, List, Tuple
+
+import cv2
+import numpy as np
+import torch
+
+from gisnav._deep_matching import DeepMatcher
+from gisnav._visual_odometry import KLTTracker, ORBMatcher
+from gisnav.core.pose_node import PoseNode
+
+_MatchCallable = Callable[[np.ndarray, np.ndarray], Tuple[np.ndarray, np.ndarray]]
+
+
+def _benchmark(
+    match: _MatchCallable, qry: np.ndarray, ref: np.ndarray, iterations: int
+) -> Tuple[List[float], int]:
+    """Matches the image pair repeatedly and returns the latencies in seconds and
+    the number of matches
+    """
+    # Warm up
+    mkp_qry, _ = match(qry, ref)
+
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        mkp_qry, _ = match(qry, ref)
+        latencies.append(time.perf_counter() - start)
+    return latencies, len(mkp_qry)
+
+
+def main() -> None:
+    """Parses command line arguments and runs the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("query", help="Query image (newer frame)")
+    parser.add_argument("reference", nargs="?", help="Reference image (older frame)")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--device", default="cpu")
+    args = parser.parse_args()
+
+    qry = cv2.imread(args.query, cv2.IMREAD_GRAYSCALE)
+    if args.reference is not None:
+        ref = cv2.imread(args.reference, cv2.IMREAD_GRAYSCALE)
+    else:
+        height, width = qry.shape
+        M = cv2.getRotationMatrix2D((width / 2, height / 2), 2.0, 1.0)
+        M[:, 2] += (8, 5)
+        ref = cv2.warpAffine(qry, M, (width, height))
+
+    tracker = KLTTracker()
+    engines = {
+        "shallow (KLT)": lambda qry, ref: tracker.match(qry, ref),
+        "shallow (ORB)": ORBMatcher(PoseNode.CONFIDENCE_THRESHOLD_SHALLOW_MATCH).match,
+        "deep (DISK + LightGlue)": DeepMatcher(
+            torch.device(args.device),
+            PoseNode.CONFIDENCE_THRESHOLD_DEEP_MATCH,
+            PoseNode.MAX_KEYPOINTS,
+        ).match,
+    }
+
+    for name, match in engines.items():
+        latencies, matches = _benchmark(match, qry, ref, args.iterations)
+        print(
+            f"{name}: mean {np.mean(latencies) * 1000:.1f} ms, "
+            f"p95 {np.percentile(latencies, 95) * 1000:.1f} ms, "
+            f"{1 / np.mean(latencies):.1f} frames/s, {matches} matches"
+        )
+
+
+if __name__ == "__main__":
+    main()
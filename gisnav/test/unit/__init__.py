@@ -1,5 +1,8 @@
 """This sub-package contains unit tests
 
-> [!NOTE] Not implemented
-> No unit test suites implemented yet.
+.. code-block:: bash
+    :caption: Run unit tests
+
+    cd ~/colcon_ws/src/gisnav/gisnav
+    make test-unit
 """
@@ -0,0 +1,121 @@
+"""Tests that the deep matching inference runtimes agree with eager mode
+
+The DISK backbone is exported for the ``torchscript`` and ``onnx`` extractor
+runtimes into a temporary model directory, so the tests do not depend on
+``export_deep_matching_models`` having been run.
+"""
+import importlib.util
+import tempfile
+import unittest
+from typing import Tuple
+
+import cv2
+import numpy as np
+import torch
+
+from gisnav._deep_matching import DeepMatcher, export_extractor_backbone
+
+_Matches = Tuple[np.ndarray, np.ndarray]
+
+_FILTER_THRESHOLD = 0.5
+"""LightGlue match confidence threshold"""
+
+_MAX_KEYPOINTS = 1024
+"""Maximum number of keypoints extracted from an image"""
+
+_TOLERANCE = 1.0
+"""Maximum distance in pixels to an eager mode match for agreement"""
+
+
+def _images() -> Tuple[np.ndarray, np.ndarray]:
+    """Returns a textured 480x640 query image and a shifted and slightly rotated
+    reference image of it
+    """
+    rng = np.random.default_rng(0)
+    qry = cv2.GaussianBlur(rng.integers(0, 256, (480, 640), dtype=np.uint8), (0, 0), 2)
+    for _ in range(60):
+        x, y = rng.integers(0, 640), rng.integers(0, 480)
+        w, h = rng.integers(10, 80, 2)
+        cv2.rectangle(qry, (x, y), (x + w, y + h), int(rng.integers(0, 256)), -1)
+    M = cv2.getRotationMatrix2D((320, 240), 2.0, 1.0)
+    M[:, 2] += (8, 5)
+    return qry, cv2.warpAffine(qry, M, (640, 480))
+
+
+def _agreement(matches: _Matches, baseline: _Matches) -> float:
+    """Returns the fraction of baseline matches that have a match within
+    :data:`._TOLERANCE` in both the query and reference images
+    """
+    if len(baseline[0]) == 0:
+        return 1.0
+    if len(matches[0]) == 0:
+        return 0.0
+    points = np.hstack(matches)
+    baseline_points = np.hstack(baseline)
+    distances = np.abs(baseline_points[:, None, :] - points[None, :, :]).max(axis=2)
+    return float(np.mean(distances.min(axis=1) <= _TOLERANCE))
+
+
+class TestDeepMatchingRuntimes(unittest.TestCase):
+    """Tests that each extractor and matcher runtime reproduces the matches of
+    the eager mode extractor and matcher on the CPU
+    """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls._model_dir = tempfile.TemporaryDirectory()
+        cls._qry, cls._ref = _images()
+        cls._baseline = cls._match("eager", "eager")
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls._model_dir.cleanup()
+
+    @classmethod
+    def _match(cls, extractor_runtime: str, matcher_runtime: str) -> _Matches:
+        """Returns the matches of the image pair with the runtimes"""
+        matcher = DeepMatcher(
+            torch.device("cpu"),
+            _FILTER_THRESHOLD,
+            _MAX_KEYPOINTS,
+            extractor_runtime=extractor_runtime,
+            matcher_runtime=matcher_runtime,
+            model_dir=cls._model_dir.name,
+        )
+        return matcher.match(cls._qry, cls._ref)
+
+    def _assert_agreement(
+        self, extractor_runtime: str, matcher_runtime: str, min_agreement: float
+    ) -> None:
+        """Asserts that the runtimes agree with eager mode"""
+        self.assertGreater(len(self._baseline[0]), 0, "No eager mode matches.")
+        matches = self._match(extractor_runtime, matcher_runtime)
+        agreement = _agreement(matches, self._baseline)
+        self.assertGreaterEqual(
+            agreement,
+            min_agreement,
+            f"{extractor_runtime}:{matcher_runtime} agreement with eager mode "
+            f"{agreement:.1%} is below {min_agreement:.0%}.",
+        )
+
+    def test_torchscript_extractor(self):
+        export_extractor_backbone(self._model_dir.name, "torchscript")
+        self._assert_agreement("torchscript", "eager", 0.9)
+
+    def test_onnx_extractor(self):
+        for module in ("onnx", "onnxruntime"):
+            if importlib.util.find_spec(module) is None:
+                self.skipTest(f"{module} is not installed.")
+        export_extractor_backbone(self._model_dir.name, "onnx")
+        self._assert_agreement("onnx", "eager", 0.9)
+
+    def test_compile_runtimes(self):
+        self._assert_agreement("compile", "compile", 0.9)
+
+    def test_int8_matcher(self):
+        # Quantized match confidences may move matches across the threshold
+        self._assert_agreement("eager", "int8", 0.75)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,183 @@
+"""Tests for :class:`.RasterMosaic`"""
+import unittest
+from typing import List, Tuple
+
+import numpy as np
+
+from gisnav._mosaic import RasterMosaic
+from gisnav._transformations import BBox
+
+_DEM_FACTOR = 4
+"""Downsampling factor of the DEM layer"""
+
+
+class _World:
+    """Imagery and DEM layers of a world with one unit per imagery pixel, where
+    each pixel value encodes its global pixel coordinates
+    """
+
+    def __init__(self) -> None:
+        self.requests: List[Tuple[BBox, Tuple[int, int]]] = []
+
+    @staticmethod
+    def _raster(x: int, y: int, size: Tuple[int, int], factor: int) -> np.ndarray:
+        """Returns the raster of a layer at the global pixel coordinates"""
+        width, height = size
+        columns = np.arange(x, x + width, factor) // factor
+        rows = np.arange(y, y + height, factor) // factor
+        return rows[:, None] * 10000 + columns[None, :] + factor * 100000000
+
+    def fetch(self, bbox: BBox, size: Tuple[int, int]) -> Tuple[np.ndarray, ...]:
+        """Returns the imagery and DEM rasters of the bounding box"""
+        self.requests.append((bbox, size))
+        x, y = int(round(bbox.left)), int(round(-bbox.top))
+        assert x % _DEM_FACTOR == 0 and y % _DEM_FACTOR == 0
+        return self._raster(x, y, size, 1), self._raster(x, y, size, _DEM_FACTOR)
+
+
+def _bbox(x: float, y: float, size: Tuple[int, int]) -> BBox:
+    """Returns the bounding box with the top left corner at the global pixel
+    coordinates
+    """
+    return BBox(x, -y - size[1], x + size[0], -y)
+
+
+class TestRasterMosaic(unittest.TestCase):
+    """Tests the full and incremental updates of an imagery layer and a coarser
+    DEM layer
+    """
+
+    _SIZE = (64, 48)
+
+    def setUp(self):
+        self._world = _World()
+        self._mosaic = RasterMosaic(factors=(1, _DEM_FACTOR))
+
+    def _assert_rasters(self, result, x: int, y: int, size=_SIZE):
+        """Asserts that the result is the full rasters at the global pixel
+        coordinates
+        """
+        self.assertIsNotNone(result)
+        bbox, rasters = result
+        self.assertEqual(bbox, _bbox(x, y, size))
+        expected = self._world.fetch(bbox, size)
+        self._world.requests.pop()
+        self.assertEqual(len(rasters), len(expected))
+        for raster, expected_raster in zip(rasters, expected):
+            np.testing.assert_array_equal(raster, expected_raster)
+
+    def test_full_update(self):
+        result = self._mosaic.update(
+            _bbox(8, 4, self._SIZE), self._SIZE, self._world.fetch
+        )
+        self._assert_rasters(result, 8, 4)
+        self.assertEqual(self._world.requests, [(_bbox(8, 4, self._SIZE), self._SIZE)])
+        self.assertEqual(self._mosaic.statistics()["full_updates"], 1)
+
+    def test_shift_and_fill(self):
+        width, height = self._SIZE
+        _, previous = self._mosaic.update(
+            _bbox(0, 0, self._SIZE), self._SIZE, self._world.fetch
+        )
+        previous_copies = [raster.copy() for raster in previous]
+
+        # The shift is snapped to whole DEM pixels
+        for x, y, snapped_x, snapped_y in (
+            (10.3, 0, 12, 0),
+            (5, -13.6, 4, -12),
+            (-1.5, 6.1, 0, 8),
+        ):
+            self._world.requests.clear()
+            result = self._mosaic.update(
+                _bbox(x, y, self._SIZE), self._SIZE, self._world.fetch
+            )
+            self._assert_rasters(result, snapped_x, snapped_y)
+            fetched = sum(w * h for _, (w, h) in self._world.requests)
+            self.assertEqual(
+                fetched,
+                width * height - (width - abs(snapped_x)) * (height - abs(snapped_y)),
+            )
+            self._mosaic.update(_bbox(0, 0, self._SIZE), self._SIZE, self._world.fetch)
+
+        # Returned rasters are not modified by later updates
+        for raster, copy in zip(previous, previous_copies):
+            np.testing.assert_array_equal(raster, copy)
+
+    def test_statistics(self):
+        width, height = self._SIZE
+        self._mosaic.update(_bbox(0, 0, self._SIZE), self._SIZE, self._world.fetch)
+        self._mosaic.update(_bbox(8, 4, self._SIZE), self._SIZE, self._world.fetch)
+        reused = (width - 8) * (height - 4)
+        self.assertEqual(
+            self._mosaic.statistics(),
+            {
+                "full_updates": 1,
+                "incremental_updates": 1,
+                "fetched_pixels": 2 * width * height - reused,
+                "reused_pixels": reused,
+                "reuse_ratio": reused / (2 * width * height),
+            },
+        )
+
+    def test_refetch(self):
+        self._mosaic.update(_bbox(0, 0, self._SIZE), self._SIZE, self._world.fetch)
+
+        # Resolution change
+        size = (32, 24)
+        self._mosaic.update(_bbox(0, 0, self._SIZE), size, self._world.fetch)
+        self.assertEqual(self._world.requests[-1], (_bbox(0, 0, self._SIZE), size))
+
+        # Size that is not a multiple of the DEM factor
+        size = (66, 48)
+        self._mosaic.update(_bbox(0, 0, size), size, self._world.fetch)
+        self._mosaic.update(_bbox(4, 0, size), size, self._world.fetch)
+        self.assertEqual(self._world.requests[-1], (_bbox(4, 0, size), size))
+
+        # Shift larger than the canvas
+        self._mosaic.update(_bbox(400, 0, self._SIZE), self._SIZE, self._world.fetch)
+        self.assertEqual(
+            self._world.requests[-1], (_bbox(400, 0, self._SIZE), self._SIZE)
+        )
+        self.assertEqual(self._mosaic.statistics()["full_updates"], 5)
+        self.assertEqual(self._mosaic.statistics()["incremental_updates"], 0)
+
+    def test_uncommitted_update(self):
+        self._mosaic.update(_bbox(0, 0, self._SIZE), self._SIZE, self._world.fetch)
+
+        # Shifted from the canvas but the canvas is not moved
+        self._assert_rasters(
+            self._mosaic.update(
+                _bbox(8, 0, self._SIZE), self._SIZE, self._world.fetch, lambda: False
+            ),
+            8,
+            0,
+        )
+        self._world.requests.clear()
+        self._assert_rasters(
+            self._mosaic.update(
+                _bbox(-4, 0, self._SIZE), self._SIZE, self._world.fetch
+            ),
+            -4,
+            0,
+        )
+        self.assertEqual(
+            self._world.requests,
+            [(_bbox(-4, 0, (4, self._SIZE[1])), (4, self._SIZE[1]))],
+        )
+
+    def test_failed_fetch(self):
+        self._mosaic.update(_bbox(0, 0, self._SIZE), self._SIZE, self._world.fetch)
+        self.assertIsNone(
+            self._mosaic.update(_bbox(8, 0, self._SIZE), self._SIZE, lambda *_: None)
+        )
+
+        # The canvas is unchanged
+        self._assert_rasters(
+            self._mosaic.update(_bbox(4, 0, self._SIZE), self._SIZE, self._world.fetch),
+            4,
+            0,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
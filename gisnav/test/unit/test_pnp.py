@@ -0,0 +1,183 @@
+"""Tests for :func:`.bucket_select` and :class:`.PnPSolver`"""
+import unittest
+from typing import Tuple
+
+import cv2
+import numpy as np
+
+from gisnav._pnp import PnPSolver, bucket_select
+
+_K = np.array([[600.0, 0.0, 320.0], [0.0, 600.0, 240.0], [0.0, 0.0, 1.0]])
+"""Camera intrinsic matrix of a 640x480 camera"""
+
+_RVEC = np.array([[np.pi + 0.05], [0.03], [0.1]])
+"""Ground truth rotation vector of a roughly nadir facing camera"""
+
+_POSITION = np.array([400.0, 300.0, 500.0])
+"""Ground truth camera position in the object frame"""
+
+
+def _pose(
+    rvec: np.ndarray = _RVEC, position: np.ndarray = _POSITION
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the rotation matrix and translation vector of the camera"""
+    r, _ = cv2.Rodrigues(rvec)
+    return r, -r @ position.reshape(3, 1)
+
+
+def _correspondences(
+    count: int = 200,
+    outlier_ratio: float = 0.0,
+    rvec: np.ndarray = _RVEC,
+    position: np.ndarray = _POSITION,
+    seed: int = 0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns object points on slightly uneven terrain below the camera and
+    their noisy projections, with the given ratio replaced by random image points
+    """
+    rng = np.random.default_rng(seed)
+    object_points = np.column_stack(
+        (
+            rng.uniform(140, 660, count),
+            rng.uniform(110, 490, count),
+            rng.uniform(0, 50, count),
+        )
+    )
+    r, t = _pose(rvec, position)
+    image_points, _ = cv2.projectPoints(object_points, r, t, _K, None)
+    image_points = image_points.reshape(-1, 2) + rng.normal(0, 0.5, (count, 2))
+    outliers = rng.choice(count, int(round(outlier_ratio * count)), replace=False)
+    image_points[outliers] = rng.uniform((0, 0), (640, 480), (len(outliers), 2))
+    return object_points, image_points
+
+
+class TestBucketSelect(unittest.TestCase):
+    """Tests the correspondence budget and the spread over the grid cells"""
+
+    def test_all_points_within_budget(self):
+        points = np.random.default_rng(0).uniform(0, 100, (50, 2))
+        np.testing.assert_array_equal(bucket_select(points, 50), np.arange(50))
+        np.testing.assert_array_equal(bucket_select(points, 100), np.arange(50))
+
+    def test_budget_cap(self):
+        points = np.random.default_rng(0).uniform(0, 640, (1000, 2))
+        selected = bucket_select(points, 100)
+        self.assertEqual(len(selected), 100)
+        self.assertEqual(len(np.unique(selected)), 100)
+        self.assertTrue(np.all(np.diff(selected) > 0))
+        self.assertTrue(np.all((selected >= 0) & (selected < len(points))))
+
+    def test_round_robin_cell_coverage(self):
+        # A dense cluster in the first cell followed by one point at the center
+        # of each cell of an 8x8 grid over [0, 800) x [0, 800)
+        cluster = np.random.default_rng(0).uniform(0, 100, (200, 2))
+        cluster[0] = (0, 0)
+        centers = np.stack(
+            np.meshgrid(np.arange(50, 800, 100), np.arange(50, 800, 100)), axis=-1
+        ).reshape(-1, 2)
+        centers[-1] = (800, 800)
+        points = np.vstack((cluster, centers))
+
+        # The first point of each cell is selected before any second point
+        selected = bucket_select(points, 64)
+        expected = np.r_[0, np.arange(len(cluster) + 1, len(points))]
+        np.testing.assert_array_equal(selected, expected)
+
+        # The remaining budget goes to the cluster in input order
+        selected = bucket_select(points, 66)
+        np.testing.assert_array_equal(selected, np.r_[0, 1, 2, expected[1:]])
+
+
+class TestPnPSolver(unittest.TestCase):
+    """Tests the solutions and the warm start of the solver against the ground
+    truth pose
+    """
+
+    def _assert_pose(self, result, rvec: np.ndarray = _RVEC, position=_POSITION):
+        """Asserts that the result is close to the ground truth pose"""
+        self.assertIsNotNone(result)
+        r, t = _pose(rvec, position)
+        np.testing.assert_allclose(result.r, r, atol=1e-2)
+        np.testing.assert_allclose(result.t, t, atol=2.0)
+
+    def test_solve(self):
+        solver = PnPSolver()
+        object_points, image_points = _correspondences(outlier_ratio=0.2)
+        result = solver.solve(object_points, image_points, _K)
+        self._assert_pose(result)
+        self.assertFalse(result.warm_started)
+        self.assertEqual(result.correspondences, 200)
+        self.assertAlmostEqual(result.inlier_ratio, 0.8, delta=0.02)
+        self.assertLess(result.reprojection_error, 2.0)
+
+    def test_correspondence_budget(self):
+        solver = PnPSolver(max_correspondences=64)
+        result = solver.solve(*_correspondences(), _K)
+        self._assert_pose(result)
+        self.assertEqual(result.correspondences, 64)
+
+    def test_too_few_correspondences(self):
+        object_points, image_points = _correspondences(PnPSolver.MIN_CORRESPONDENCES)
+        solver = PnPSolver()
+        self.assertIsNotNone(solver.solve(object_points, image_points, _K))
+        self.assertIsNone(solver.solve(object_points[:-1], image_points[:-1], _K))
+
+    def test_warm_start_accepted(self):
+        solver = PnPSolver(max_iterations=1000)
+        self.assertFalse(solver.solve(*_correspondences(), _K, key="a").warm_started)
+
+        # The camera has moved slightly and fewer than half of the
+        # correspondences are outliers under the previous pose
+        rvec = _RVEC + 0.002
+        position = _POSITION + (1.0, -1.0, 0.5)
+        result = solver.solve(
+            *_correspondences(outlier_ratio=0.45, rvec=rvec, position=position, seed=1),
+            _K,
+            key="a",
+        )
+        self._assert_pose(result, rvec, position)
+        self.assertTrue(result.warm_started)
+
+    def test_warm_start_rejected_on_low_inlier_ratio(self):
+        solver = PnPSolver(max_iterations=1000)
+        solver.solve(*_correspondences(), _K, key="a")
+
+        # Same pose, but more than half of the correspondences are outliers
+        result = solver.solve(
+            *_correspondences(outlier_ratio=0.55, seed=1), _K, key="a"
+        )
+        self._assert_pose(result)
+        self.assertFalse(result.warm_started)
+
+    def test_warm_start_rejected_on_pose_change(self):
+        solver = PnPSolver()
+        solver.solve(*_correspondences(), _K, key="a")
+
+        position = _POSITION + (100.0, 50.0, 0.0)
+        result = solver.solve(*_correspondences(position=position, seed=1), _K, key="a")
+        self._assert_pose(result, position=position)
+        self.assertFalse(result.warm_started)
+
+    def test_warm_start_per_key(self):
+        solver = PnPSolver()
+        solver.solve(*_correspondences(), _K, key="a")
+        correspondences = _correspondences(seed=1)
+        self.assertFalse(solver.solve(*correspondences, _K, key="b").warm_started)
+        self.assertTrue(solver.solve(*correspondences, _K, key="a").warm_started)
+
+    def test_failure_drops_warm_start(self):
+        solver = PnPSolver()
+        object_points, image_points = _correspondences()
+        for failing in (
+            (object_points[:5], image_points[:5]),
+            _correspondences(outlier_ratio=1.0, seed=1),
+        ):
+            solver.solve(object_points, image_points, _K, key="a")
+            self.assertIsNone(solver.solve(*failing, _K, key="a"))
+            result = solver.solve(object_points, image_points, _K, key="a")
+            self._assert_pose(result)
+            self.assertFalse(result.warm_started)
+
+
+if __name__ == "__main__":
+    unittest.main()
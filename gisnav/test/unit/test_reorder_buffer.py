@@ -0,0 +1,69 @@
+"""Tests for :class:`.ReorderBuffer`"""
+import unittest
+from concurrent.futures import Future
+
+from gisnav._deep_matching import ReorderBuffer
+
+
+class TestReorderBuffer(unittest.TestCase):
+    """Tests that futures are released in submission order"""
+
+    def _push(self, buffer: ReorderBuffer, count: int):
+        """Pushes pending futures with their index as the context"""
+        futures = [Future() for _ in range(count)]
+        for i, future in enumerate(futures):
+            buffer.push(future, i)
+        return futures
+
+    @staticmethod
+    def _released(buffer: ReorderBuffer):
+        """Returns the contexts of the released futures"""
+        return [context for _, context in buffer.pop_ready()]
+
+    def test_releases_in_submission_order(self):
+        buffer = ReorderBuffer(5)
+        futures = self._push(buffer, 5)
+
+        # Completes out of order, with gaps before the first future is done
+        for i in (3, 1, 4):
+            futures[i].set_result(i)
+            self.assertEqual(self._released(buffer), [])
+
+        futures[0].set_result(0)
+        self.assertEqual(self._released(buffer), [0, 1])
+
+        futures[2].set_result(2)
+        self.assertEqual(self._released(buffer), [2, 3, 4])
+        self.assertEqual(len(buffer), 0)
+
+    def test_released_futures_hold_their_results(self):
+        buffer = ReorderBuffer(3)
+        futures = self._push(buffer, 3)
+        futures[2].set_result("c")
+        futures[1].set_exception(RuntimeError("b"))
+        futures[0].set_result("a")
+
+        released = buffer.pop_ready()
+        self.assertEqual([context for _, context in released], [0, 1, 2])
+        self.assertEqual(released[0][0].result(), "a")
+        self.assertIsInstance(released[1][0].exception(), RuntimeError)
+        self.assertEqual(released[2][0].result(), "c")
+
+    def test_capacity(self):
+        buffer = ReorderBuffer(2)
+        futures = self._push(buffer, 2)
+        self.assertTrue(buffer.full())
+        with self.assertRaises(ValueError):
+            buffer.push(Future(), 2)
+
+        futures[1].set_result(1)
+        self.assertEqual(self._released(buffer), [])
+        self.assertTrue(buffer.full())
+
+        futures[0].set_result(0)
+        self.assertEqual(self._released(buffer), [0, 1])
+        self.assertFalse(buffer.full())
+
+
+if __name__ == "__main__":
+    unittest.main()
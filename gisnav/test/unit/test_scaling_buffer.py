@@ -0,0 +1,77 @@
+"""Tests for the visual odometry scaling buffer of :class:`.PoseNode`"""
+import unittest
+
+import numpy as np
+from scipy.interpolate import interp1d
+
+from gisnav.core.pose_node import PoseNode
+
+_ScalingBuffer = PoseNode._ScalingBuffer
+
+
+class TestScalingBuffer(unittest.TestCase):
+    """Tests the ring buffer window and the interpolation of the scaling"""
+
+    def _fill(self, buffer, count: int, seed: int = 0):
+        """Appends random scalings at increasing timestamps and returns them"""
+        rng = np.random.default_rng(seed)
+        timestamps = np.cumsum(rng.integers(1, 100_000, count))
+        scalings = rng.uniform(0.5, 2.0, count)
+        for timestamp, scaling in zip(timestamps, scalings):
+            buffer.append(int(timestamp), float(scaling))
+        return timestamps, scalings
+
+    def _assert_matches_interp1d(self, buffer, timestamps, scalings):
+        """Asserts that the buffer interpolates and extrapolates like
+        :class:`scipy.interpolate.interp1d` on the samples
+        """
+        reference = interp1d(timestamps, scalings, fill_value="extrapolate")
+        span = timestamps[-1] - timestamps[0]
+        queries = np.concatenate(
+            (
+                timestamps,
+                np.linspace(timestamps[0] - span, timestamps[-1] + span, 257),
+            )
+        )
+        for query in queries:
+            self.assertAlmostEqual(
+                buffer.interpolate(int(query)), float(reference(int(query))), places=6
+            )
+
+    def test_empty(self):
+        self.assertIsNone(_ScalingBuffer().interpolate(1000))
+
+    def test_one_sample(self):
+        buffer = _ScalingBuffer()
+        buffer.append(1000, 1.5)
+        self.assertIsNone(buffer.interpolate(1000))
+        self.assertIsNone(buffer.interpolate(2000))
+
+    def test_interpolate_and_extrapolate(self):
+        buffer = _ScalingBuffer()
+        timestamps, scalings = self._fill(buffer, 20)
+        self._assert_matches_interp1d(buffer, timestamps, scalings)
+
+    def test_window_bound(self):
+        buffer = _ScalingBuffer()
+        window = _ScalingBuffer._WINDOW_LENGTH
+        timestamps, scalings = self._fill(buffer, 2 * window + 37)
+
+        self.assertEqual(buffer._size, window)
+        # Only the latest samples are used, older ones are extrapolated to
+        self._assert_matches_interp1d(buffer, timestamps[-window:], scalings[-window:])
+
+    def test_reset_on_out_of_order_timestamp(self):
+        buffer = _ScalingBuffer()
+        self._fill(buffer, 50)
+
+        buffer.append(10, 1.0)
+        self.assertIsNone(buffer.interpolate(10))
+
+        buffer.append(20, 3.0)
+        self.assertAlmostEqual(buffer.interpolate(15), 2.0)
+        self.assertAlmostEqual(buffer.interpolate(30), 5.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
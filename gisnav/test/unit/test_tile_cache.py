@@ -0,0 +1,151 @@
+"""Tests for :class:`.TileCache` and :func:`.quantize_bbox`"""
+import os
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from gisnav._tile_cache import TileCache, quantize_bbox
+from gisnav._transformations import BBox
+
+_RASTER_BYTES = 1000
+"""Size of the test rasters in bytes"""
+
+
+def _raster(value: int) -> np.ndarray:
+    """Returns a test raster filled with the value"""
+    return np.full(_RASTER_BYTES, value, dtype=np.uint8)
+
+
+def _key(bbox: BBox, step: float = 0.01, **kwargs) -> str:
+    """Returns the cache key of a GetMap request for the quantized bounding box"""
+    arguments = {
+        "layers": ["imagery"],
+        "styles": [""],
+        "srs": "EPSG:4326",
+        "size": (256, 256),
+        "format_": "image/jpeg",
+        "grayscale": False,
+    }
+    arguments.update(kwargs)
+    return TileCache.key(bbox=quantize_bbox(bbox, step), **arguments)
+
+
+class TestQuantizeBBox(unittest.TestCase):
+    """Tests the bounding box quantization of the cache keys"""
+
+    def test_snaps_outwards(self):
+        bbox = quantize_bbox(BBox(24.0012, 60.0098, 24.0187, 60.0201), 0.01)
+        np.testing.assert_allclose(bbox, (24.0, 60.0, 24.02, 60.03))
+
+    def test_grid_bbox_unchanged(self):
+        bbox = BBox(24.0, 60.0, 24.02, 60.03)
+        np.testing.assert_allclose(quantize_bbox(bbox, 0.01), bbox)
+
+    def test_nearby_bboxes_share_key(self):
+        key = _key(BBox(24.0012, 60.0012, 24.0087, 60.0087))
+        self.assertEqual(key, _key(BBox(24.0023, 60.0001, 24.0099, 60.0095)))
+        self.assertNotEqual(key, _key(BBox(24.0023, 60.0001, 24.0101, 60.0095)))
+
+    def test_key_arguments(self):
+        bbox = BBox(24.0, 60.0, 24.01, 60.01)
+        key = _key(bbox)
+        self.assertNotEqual(key, _key(bbox, layers=["dem"]))
+        self.assertNotEqual(key, _key(bbox, styles=["default"]))
+        self.assertNotEqual(key, _key(bbox, srs="EPSG:3857"))
+        self.assertNotEqual(key, _key(bbox, size=(512, 512)))
+        self.assertNotEqual(key, _key(bbox, format_="image/png"))
+        self.assertNotEqual(key, _key(bbox, grayscale=True))
+
+
+class TestTileCache(unittest.TestCase):
+    """Tests the cache lookups, counters and LRU eviction under the byte budget"""
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self._cache = TileCache(self._dir.name, 3 * _RASTER_BYTES)
+
+    def tearDown(self):
+        self._cache.close()
+        self._dir.cleanup()
+
+    def _put(self, key: str, value: int) -> None:
+        """Stores a test raster and waits so that access times are distinct"""
+        self._cache.put(key, _raster(value))
+        time.sleep(0.01)
+
+    def _get(self, key: str):
+        """Returns a cached raster and waits so that access times are distinct"""
+        raster = self._cache.get(key)
+        time.sleep(0.01)
+        return raster
+
+    def test_hit_and_miss(self):
+        self.assertIsNone(self._get("a"))
+        self._put("a", 1)
+        raster = self._get("a")
+        np.testing.assert_array_equal(raster, _raster(1))
+        self.assertFalse(raster.flags.writeable)
+        self.assertIsNone(self._get("b"))
+
+        statistics = self._cache.statistics()
+        self.assertEqual(statistics["hits"], 1)
+        self.assertEqual(statistics["misses"], 2)
+        self.assertEqual(statistics["evictions"], 0)
+        self.assertEqual(statistics["size_bytes"], _RASTER_BYTES)
+        self.assertEqual(statistics["max_bytes"], 3 * _RASTER_BYTES)
+
+    def test_lru_eviction(self):
+        for i, key in enumerate("abc"):
+            self._put(key, i)
+        self.assertEqual(self._cache.size_bytes, 3 * _RASTER_BYTES)
+
+        # Accessing "a" makes "b" the least recently used raster
+        self.assertIsNotNone(self._get("a"))
+        self._put("d", 3)
+        self.assertIsNone(self._get("b"))
+        for i, key in ((0, "a"), (2, "c"), (3, "d")):
+            np.testing.assert_array_equal(self._get(key), _raster(i))
+
+        # "a" is now the least recently used raster
+        self._put("e", 4)
+        self.assertIsNone(self._get("a"))
+        self.assertEqual(self._cache.statistics()["evictions"], 2)
+        self.assertEqual(self._cache.size_bytes, 3 * _RASTER_BYTES)
+
+        # Evicted raster files are removed
+        files = [name for name in os.listdir(self._dir.name) if name.endswith(".npy")]
+        self.assertEqual(len(files), 3)
+
+    def test_replace(self):
+        self._put("a", 1)
+        self._put("a", 2)
+        np.testing.assert_array_equal(self._get("a"), _raster(2))
+        self.assertEqual(self._cache.size_bytes, _RASTER_BYTES)
+
+    def test_raster_larger_than_budget_not_cached(self):
+        self._put("a", 1)
+        self._cache.put("b", np.zeros(4 * _RASTER_BYTES, dtype=np.uint8))
+        self.assertIsNone(self._get("b"))
+        self.assertIsNotNone(self._get("a"))
+        self.assertEqual(self._cache.statistics()["evictions"], 0)
+
+    def test_missing_file_is_a_miss(self):
+        self._put("a", 1)
+        for name in os.listdir(self._dir.name):
+            if name.endswith(".npy"):
+                os.remove(os.path.join(self._dir.name, name))
+        self.assertIsNone(self._get("a"))
+        self.assertEqual(self._cache.size_bytes, 0)
+        self.assertEqual(self._cache.statistics()["misses"], 1)
+
+    def test_persistent(self):
+        self._put("a", 1)
+        self._cache.close()
+        self._cache = TileCache(self._dir.name, 3 * _RASTER_BYTES)
+        np.testing.assert_array_equal(self._get("a"), _raster(1))
+
+
+if __name__ == "__main__":
+    unittest.main()
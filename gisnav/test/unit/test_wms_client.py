@@ -0,0 +1,87 @@
+"""Tests for :class:`.WMSClient` GetMap retries"""
+import unittest
+from typing import List, Union
+from unittest import mock
+
+import requests
+
+from gisnav._transformations import BBox
+from gisnav._wms_client import WMSClient
+
+_IMAGE = b"image"
+"""Encoded image returned by a successful GetMap request"""
+
+
+def _response(status_code: int) -> requests.Response:
+    """Returns a GetMap response with the status code"""
+    response = requests.Response()
+    response.status_code = status_code
+    response.url = "http://localhost/wms"
+    response.headers["Content-Type"] = "image/jpeg"
+    response._content = _IMAGE if status_code == 200 else b""
+    return response
+
+
+class TestWMSClientGetMap(unittest.TestCase):
+    """Tests that transient GetMap errors are retried a bounded number of times"""
+
+    def setUp(self):
+        self._client = WMSClient("http://localhost/wms", "1.3.0", 1.0)
+        # Connected without a GetCapabilities request
+        self._client._getmap_url = "http://localhost/wms"
+        self._sleep = mock.patch("gisnav._wms_client.time.sleep").start()
+        self.addCleanup(mock.patch.stopall)
+
+    def tearDown(self):
+        self._client.close()
+
+    def _getmap(self, outcomes: List[Union[int, Exception]]) -> mock.Mock:
+        """Sends a GetMap request with the session returning the outcomes in order
+
+        :return: Mock of the session get method
+        """
+        get = mock.patch.object(
+            self._client._session,
+            "get",
+            side_effect=[
+                outcome if isinstance(outcome, Exception) else _response(outcome)
+                for outcome in outcomes
+            ],
+        ).start()
+        self._result = self._client.getmap(
+            ["imagery"], [""], "EPSG:4326", BBox(0, 0, 1, 1), (8, 8), "image/jpeg"
+        )
+        return get
+
+    def test_success(self):
+        get = self._getmap([200])
+        self.assertEqual(self._result, _IMAGE)
+        self.assertEqual(get.call_count, 1)
+        self._sleep.assert_not_called()
+
+    def test_transient_errors_retried(self):
+        get = self._getmap([503, requests.exceptions.ConnectionError(), 200])
+        self.assertEqual(self._result, _IMAGE)
+        self.assertEqual(get.call_count, 3)
+        self.assertEqual(self._sleep.call_count, 2)
+
+    def test_retries_bounded(self):
+        with self.assertRaises(requests.exceptions.HTTPError):
+            self._getmap([500, 502, 504, 200])
+        self.assertEqual(self._client._session.get.call_count, 3)
+
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self._getmap([requests.exceptions.ConnectionError()] * 3)
+
+    def test_client_errors_not_retried(self):
+        with self.assertRaises(requests.exceptions.HTTPError):
+            self._getmap([404, 200])
+        self.assertEqual(self._client._session.get.call_count, 1)
+
+        with self.assertRaises(requests.exceptions.ReadTimeout):
+            self._getmap([requests.exceptions.ReadTimeout(), 200])
+        self._sleep.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()